@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Benchmark traceback normalization throughput.
+
+Usage:
+    ./scripts/benchmark_normalize.py [MEGABYTES]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+from pytest_markdown_report.normalize import (
+    NORMALIZE_RULES,
+    TracebackNormalizer,
+)
+
+# One noisy traceback, repeated to build the corpus
+TRACEBACK = """\
+/work/project/tests/test_api.py:12: in test_get
+    response = client.get(url)
+/home/ci/.venv/lib/python3.12/site-packages/httpx/_client.py:1054: in get
+    return self.request("GET", url)
+E   \x1b[31mValueError\x1b[0m: <Client object at 0x7f3a2b1c0d10> rejected
+E   path: '/tmp/pytest-of-ci/pytest-42/test_get0/config.toml'
+E   assert {'id': 1, 'name': 'widget', 'tags': ['a', 'b']} == {'id': 2}
+"""
+
+
+def measure(normalizer: TracebackNormalizer, corpus: list[str]) -> float:
+    """Normalize the corpus, returning megabytes per second."""
+    size = sum(len(text) for text in corpus)
+    start = time.perf_counter()
+    for text in corpus:
+        normalizer.normalize(text)
+    elapsed = time.perf_counter() - start
+    return size / elapsed / 1e6
+
+
+def main() -> None:
+    """Print throughput with all rules, each rule alone and none."""
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 20
+    corpus = [TRACEBACK] * int(megabytes * 1e6 / len(TRACEBACK))
+    root = Path("/work/project")
+
+    configurations = [("all", NORMALIZE_RULES)]
+    configurations += [(rule, (rule,)) for rule in NORMALIZE_RULES]
+    configurations.append(("none", ()))
+    print(f"{'Rules':<10}  {'MB/s':>8}")
+    print("-" * 20)
+    for name, rules in configurations:
+        throughput = measure(TracebackNormalizer(rules, root), corpus)
+        print(f"{name:<10}  {throughput:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
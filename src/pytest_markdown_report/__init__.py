@@ -3,11 +3,13 @@
 from importlib.metadata import PackageNotFoundError, version
 
 from pytest_markdown_report.plugin import (
+    pytest_addhooks,
     pytest_addoption,
     pytest_configure,
     pytest_load_initial_conftests,
     pytest_unconfigure,
 )
+from pytest_markdown_report.sections import ReportSection
 
 try:
     __version__ = version("pytest-markdown-report")
@@ -15,6 +17,8 @@ except PackageNotFoundError:
     __version__ = "unknown"
 
 __all__ = [
+    "ReportSection",
+    "pytest_addhooks",
     "pytest_addoption",
     "pytest_configure",
     "pytest_load_initial_conftests",
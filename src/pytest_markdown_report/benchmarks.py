@@ -0,0 +1,126 @@
+"""Compact table of pytest-benchmark results, with regressions as failures.
+
+pytest-benchmark prints its tables in the terminal summary, which the
+redirected output swallows. Its session object is read at session end
+instead, after it compared the results with the baseline given by
+``--benchmark-compare``. Its internals are read defensively: anything
+missing leaves the section out.
+"""
+
+from collections.abc import Mapping
+from typing import TYPE_CHECKING
+
+import pytest
+from _pytest.config import Config
+
+if TYPE_CHECKING:
+    from pytest_markdown_report.plugin import MarkdownReport
+
+
+def format_seconds(seconds: float) -> str:
+    """Format a duration with the unit that suits its magnitude."""
+    for unit, scale in (("s", 1), ("ms", 1e3), ("µs", 1e6)):
+        if seconds * scale >= 1:
+            return f"{seconds * scale:.2f}{unit}"
+    return f"{seconds * 1e9:.2f}ns"
+
+
+def baseline_stats(session: object) -> dict[str, Mapping[str, float]]:
+    """Get the baseline stats of each benchmark, from the latest saved run."""
+    compared = getattr(session, "compared_mapping", None) or {}
+    baseline: dict[str, Mapping[str, float]] = {}
+    # Runs are loaded oldest first: later runs override
+    for benchmarks in compared.values():
+        for fullname, data in benchmarks.items():
+            stats = data.get("stats") if isinstance(data, Mapping) else None
+            if stats:
+                baseline[fullname] = stats
+    return baseline
+
+
+class BenchmarkTable:
+    """Render pytest-benchmark results (pytest plugin).
+
+    Attributes:
+        report: Report failure blocks of regressions are added to
+        threshold: Mean increase over the baseline, in percent, failing a
+            benchmark
+        rows: ``(name, mean, stddev, ops, delta)`` of each benchmark, delta
+            in percent or None without a baseline
+    """
+
+    def __init__(self, report: "MarkdownReport", threshold: float) -> None:
+        """Initialize the table.
+
+        Args:
+            report: Report failure blocks of regressions are added to
+            threshold: Mean increase over the baseline, in percent, failing
+                a benchmark
+        """
+        self.report = report
+        self.threshold = threshold
+        self.rows: list[tuple[str, float, float, float, float | None]] = []
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        """Read the results before the report is built."""
+        self.read_results(session.config)
+
+    def read_results(self, config: Config) -> None:
+        """Read the benchmark results and flag regressions."""
+        session = getattr(config, "_benchmarksession", None)
+        baseline = baseline_stats(session)
+        for bench in getattr(session, "benchmarks", None) or ():
+            stats = getattr(bench, "stats", None)
+            fullname = getattr(bench, "fullname", None)
+            try:
+                mean, stddev, ops = stats.mean, stats.stddev, stats.ops
+            except (AttributeError, ArithmeticError, ValueError):
+                continue  # Errored or never ran
+            delta = None
+            previous = baseline.get(fullname, {}).get("mean")
+            if previous:
+                delta = (mean - previous) / previous * 100
+                if delta > self.threshold:
+                    self.report.regressions.append(
+                        self._format_regression(fullname, mean, previous, delta)
+                    )
+            self.rows.append((fullname, mean, stddev, ops, delta))
+
+    def _format_regression(
+        self, fullname: str, mean: float, previous: float, delta: float
+    ) -> list[str]:
+        """Format the failure block of a regressed benchmark."""
+        return [
+            f"### {fullname} REGRESSED",
+            "",
+            (
+                f"**Mean:** {format_seconds(mean)} vs {format_seconds(previous)} "
+                f"baseline ({delta:+.1f}%, threshold {self.threshold:g}%)"
+            ),
+            "",
+        ]
+
+    def generate_section(self) -> list[str]:
+        """Generate the benchmarks table."""
+        if not self.rows:
+            return []
+        # The baseline column is left out when nothing was compared
+        compared = any(delta is not None for *_, delta in self.rows)
+        header = "| Benchmark | Mean | StdDev | Ops/s |"
+        lines = [
+            "## Benchmarks",
+            "",
+            f"{header} vs baseline |" if compared else header,
+            "|---|---|---|---|---|" if compared else "|---|---|---|---|",
+        ]
+        for fullname, mean, stddev, ops, delta in self.rows:
+            row = (
+                f"| {fullname} | {format_seconds(mean)} | {format_seconds(stddev)} "
+                f"| {ops:,.1f} |"
+            )
+            if compared:
+                row += " |" if delta is None else f" {delta:+.1f}% |"
+            lines.append(row)
+        lines.append("")
+        return lines
@@ -0,0 +1,106 @@
+"""Per-thread collection buffers, merged when read.
+
+Threaded runners (pytest-parallel, free-threaded builds) can log reports from
+several threads at once. Each thread appends to its own shard, so collecting
+takes no lock; readers concatenate the shards.
+"""
+
+import threading
+from collections.abc import Iterator
+
+from _pytest.reports import TestReport
+
+from pytest_markdown_report.subtests import SubtestRecord
+
+# Outcome category lists of MarkdownReport, in report section order
+CATEGORIES = ("errors", "failed", "xfailed", "xpassed", "skipped", "passed")
+# Collections kept per shard, readable on the report as merged views
+SHARDED = (*CATEGORIES, "passed_with_output", "warnings", "pending", "durations")
+_MAPPINGS = ("pending", "durations")
+
+
+class ReportShard:
+    """Collection buffers appended to by a single thread.
+
+    Attributes:
+        pending: Reports of tests still running, per nodeid
+        durations: Seconds spent in all phases, per nodeid
+        subtests: Subtest aggregates of tests still running, per nodeid
+        passed_with_output: ``(report, stdout, stderr)`` of passed tests
+        warnings: ``(message, nodeid, location)`` of recorded warnings
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty buffers, one list per category."""
+        for category in CATEGORIES:
+            setattr(self, category, [])
+        self.pending: dict[str, list[TestReport]] = {}
+        self.durations: dict[str, float] = {}
+        self.subtests: dict[str, SubtestRecord] = {}
+        self.passed_with_output: list[tuple[TestReport, str, str]] = []
+        self.warnings: list[tuple[str, str, str]] = []
+
+
+class ShardSet:
+    """Shards of all threads that collected reports, in creation order."""
+
+    def __init__(self) -> None:
+        """Initialize without shards, each thread creates its own."""
+        # Replaced rather than mutated, so readers need no lock
+        self._shards: tuple[ReportShard, ...] = ()
+        self._local = threading.local()
+        # Only taken the first time a thread collects
+        self._lock = threading.Lock()
+        self._frozen: dict[str, list | dict] | None = None
+
+    def current(self) -> ReportShard:
+        """Get the shard of the calling thread, created on first use."""
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = ReportShard()
+            with self._lock:
+                self._shards = (*self._shards, shard)
+            self._local.shard = shard
+        return shard
+
+    def __iter__(self) -> Iterator[ReportShard]:
+        """Iterate over the shards created so far."""
+        return iter(self._shards)
+
+    def merged(self, name: str) -> list | dict:
+        """Read one collection across shards.
+
+        With a single shard its own collection is returned, so the common
+        single-threaded run copies nothing.
+        """
+        if self._frozen is not None:
+            return self._frozen[name]
+        shards = self._shards
+        if len(shards) == 1:
+            return getattr(shards[0], name)
+        if name in _MAPPINGS:
+            mapping = {}
+            for shard in shards:
+                # A single update() call, safe while the owner thread appends
+                mapping.update(getattr(shard, name))
+            return mapping
+        return [item for shard in shards for item in getattr(shard, name)]
+
+    def freeze(self) -> None:
+        """Merge once for the rest of the session, after collection ended."""
+        self._frozen = None  # merge from the shards, not a previous freeze
+        self._frozen = {name: self.merged(name) for name in SHARDED}
+
+
+class MergedView:
+    """Expose a sharded collection as a report attribute."""
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        """Read the shard collection of the same name."""
+        self.name = name
+
+    def __get__(self, report: object, owner: type | None = None) -> list | dict:
+        """Merge the collection of the report's shards."""
+        if report is None:
+            return self
+        return report.shards.merged(self.name)
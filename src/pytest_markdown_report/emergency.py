@@ -0,0 +1,100 @@
+"""Best-effort partial report when the session is killed before it finishes.
+
+``pytest_sessionfinish`` never runs when CI terminates pytest, and the output
+stays redirected into the capture buffer. SIGTERM, a second SIGINT (the first
+one already ends the session through ``KeyboardInterrupt``) and an exit
+before the session finished write a partial report of the state collected so
+far instead, within a time budget so it completes before SIGKILL follows.
+"""
+
+import atexit
+import contextlib
+import os
+import signal
+import time
+from types import FrameType
+from typing import TYPE_CHECKING
+
+from _pytest.config import Config
+
+if TYPE_CHECKING:
+    from pytest_markdown_report.plugin import MarkdownReport
+
+_SIGNALS = ("SIGTERM", "SIGINT")
+
+
+class EmergencyFlush:
+    """Signal handlers and atexit hook writing the partial report once.
+
+    Attributes:
+        report: Report to write
+        budget: Seconds allowed to build and write the partial report
+        flushed: Whether the partial report was written
+    """
+
+    def __init__(self, report: "MarkdownReport", config: Config, budget: float) -> None:
+        """Initialize without installing anything.
+
+        Args:
+            report: Report to write
+            config: pytest Config object, to suspend output capture
+            budget: Seconds allowed to build and write the partial report
+        """
+        self.report = report
+        self.config = config
+        self.budget = budget
+        self.flushed = False
+        self._previous: dict[int, object] = {}
+        self._interrupts = 0
+
+    def install(self) -> None:
+        """Install the handlers; signals are only handled in the main thread."""
+        for name in _SIGNALS:
+            signum = getattr(signal, name, None)
+            if signum is None:
+                continue
+            try:
+                self._previous[signum] = signal.signal(signum, self._on_signal)
+            except ValueError:
+                return  # Not the main thread
+        atexit.register(self._at_exit)
+
+    def uninstall(self) -> None:
+        """Restore the previous handlers (idempotent)."""
+        atexit.unregister(self._at_exit)
+        for signum, previous in self._previous.items():
+            with contextlib.suppress(ValueError, TypeError):
+                signal.signal(signum, previous)
+        self._previous = {}
+
+    def _on_signal(self, signum: int, frame: FrameType | None) -> None:
+        """Flush, then let the previous handler deal with the signal."""
+        previous = self._previous.get(signum, signal.SIG_DFL)
+        if signum == signal.SIGINT:
+            self._interrupts += 1
+        if signum != signal.SIGINT or self._interrupts > 1:
+            self.flush(f"{signal.Signals(signum).name} received")
+            self.uninstall()
+        if callable(previous):
+            previous(signum, frame)
+        elif previous == signal.SIG_DFL:
+            # Terminate with the status of the signal
+            signal.signal(signum, signal.SIG_DFL)
+            os.kill(os.getpid(), signum)
+
+    def _at_exit(self) -> None:
+        """Flush when the interpreter exits before the session finished."""
+        self.flush("process exited before the session finished")
+
+    def flush(self, reason: str) -> None:
+        """Write the partial report once, within the time budget."""
+        if self.flushed:
+            return
+        self.flushed = True
+        deadline = time.monotonic() + self.budget
+        capture = self.config.pluginmanager.getplugin("capturemanager")
+        if capture:
+            # A test may be running with stdout redirected to pytest's capture
+            with contextlib.suppress(Exception):
+                capture.suspend()
+        self.report.write_partial_report(reason, deadline)
@@ -0,0 +1,142 @@
+"""Fixture setup and teardown cost accounting, per fixture definition."""
+
+import time
+from collections import Counter
+from collections.abc import Generator
+from pathlib import Path
+
+import pytest
+from _pytest.fixtures import FixtureDef, SubRequest
+
+
+class FixtureStats:
+    """Accumulated cost of one fixture definition.
+
+    Attributes:
+        scope: Fixture scope name
+        setups: Number of instances set up
+        setup_time: Total setup seconds
+        teardown_time: Total teardown seconds
+        params: Instances set up per parameter index
+        widenable: False for fixtures that cannot take a wider scope as they
+            are: defined outside rootdir, or using function-scoped fixtures
+    """
+
+    def __init__(self, scope: str) -> None:
+        """Initialize empty stats for a fixture of the given scope."""
+        self.scope = scope
+        self.setups = 0
+        self.setup_time = 0.0
+        self.teardown_time = 0.0
+        self.params: Counter[int] = Counter()
+        self.widenable = True
+
+    @property
+    def total_time(self) -> float:
+        """Setup plus teardown seconds."""
+        return self.setup_time + self.teardown_time
+
+    @property
+    def repeats_params(self) -> bool:
+        """Check whether instances were set up again with identical params."""
+        return self.setups > len(self.params)
+
+
+class FixtureCostTracker:
+    """Time fixture setup and teardown, aggregated per definition.
+
+    Setup is timed by wrapping ``pytest_fixture_setup``. Teardown starts with
+    a finalizer added right after setup, which runs before the fixture's own
+    finalizers, and ends with ``pytest_fixture_post_finalizer``.
+
+    Attributes:
+        top: Number of fixtures listed
+        stats: Stats per ``name (location)`` of each fixture definition
+    """
+
+    def __init__(self, top: int, rootpath: Path) -> None:
+        """Initialize the tracker.
+
+        Args:
+            top: Number of fixtures listed
+            rootpath: Directory locations are shown relative to
+        """
+        self.top = top
+        self.rootpath = rootpath
+        self.stats: dict[str, FixtureStats] = {}
+        self._teardown_started: dict[FixtureDef, float] = {}
+        self._by_fixturedef: dict[FixtureDef, FixtureStats] = {}
+        # Scope of the fixtures set up so far, per name; a fixture's
+        # dependencies are set up before it
+        self._scopes: dict[str, str] = {}
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(
+        self, fixturedef: FixtureDef, request: SubRequest
+    ) -> Generator[None]:
+        """Time the setup of one fixture instance."""
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+        stats = self._stats_for(fixturedef)
+        stats.setups += 1
+        stats.setup_time += elapsed
+        stats.params[getattr(request, "param_index", 0)] += 1
+        self._scopes[fixturedef.argname] = fixturedef.scope
+        if any(self._scopes.get(name) == "function" for name in fixturedef.argnames):
+            stats.widenable = False
+        fixturedef.addfinalizer(lambda: self._start_teardown(fixturedef))
+
+    def pytest_fixture_post_finalizer(self, fixturedef: FixtureDef) -> None:
+        """Account the teardown that just finished."""
+        start = self._teardown_started.pop(fixturedef, None)
+        if start is not None:
+            elapsed = time.perf_counter() - start
+            self._stats_for(fixturedef).teardown_time += elapsed
+
+    def generate_section(self) -> list[str]:
+        """Generate the fixture costs section, costliest first."""
+        ranked = sorted(
+            self.stats.items(), key=lambda item: item[1].total_time, reverse=True
+        )[: self.top]
+        if not ranked:
+            return []
+        lines = ["## Fixture costs", ""]
+        for name, stats in ranked:
+            average = stats.total_time / stats.setups * 1000
+            line = (
+                f"- {stats.total_time:.2f}s {name}, {stats.scope} scope, "
+                f"{stats.setups} setups ({average:.1f}ms avg)"
+            )
+            if stats.scope == "function" and stats.widenable and stats.repeats_params:
+                line += ", candidate for wider scope"
+            lines.append(line)
+        lines.append("")
+        return lines
+
+    def _start_teardown(self, fixturedef: FixtureDef) -> None:
+        """Note when the teardown of a fixture instance starts."""
+        self._teardown_started[fixturedef] = time.perf_counter()
+
+    def _stats_for(self, fixturedef: FixtureDef) -> FixtureStats:
+        """Find or create the stats of a fixture definition."""
+        if fixturedef in self._by_fixturedef:
+            return self._by_fixturedef[fixturedef]
+        code = getattr(fixturedef.func, "__code__", None)
+        location = ""
+        outside = code is None
+        if code is not None:
+            path = Path(code.co_filename)
+            try:
+                filename = path.relative_to(self.rootpath).as_posix()
+            except ValueError:
+                filename = path.name
+                outside = True
+            location = f" ({filename}:{code.co_firstlineno})"
+        key = f"{fixturedef.argname}{location}"
+        if key not in self.stats:
+            self.stats[key] = FixtureStats(fixturedef.scope)
+            # Fixtures of pytest or plugins are not the project's to change
+            self.stats[key].widenable = not outside
+        self._by_fixturedef[fixturedef] = self.stats[key]
+        return self.stats[key]
@@ -0,0 +1,224 @@
+"""Local SQLite history of test outcomes and durations, with a query CLI.
+
+Rows are only written at session end, in one transaction of batched
+``executemany`` calls, so the run itself does no I/O. Nodeids are stored once
+in ``tests`` and results refer to them by id, which keeps rows compact.
+"""
+
+import argparse
+import heapq
+import itertools
+import sqlite3
+import sys
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from pathlib import Path
+
+from pytest_markdown_report.collection import CATEGORIES
+
+# Rows per executemany call, bounding memory whatever the suite size
+BATCH_SIZE = 10_000
+# Categories counted as failures, as in the summary line
+FAILING = ("errors", "failed", "xpassed")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_started ON sessions (started);
+CREATE TABLE IF NOT EXISTS tests (
+    id INTEGER PRIMARY KEY,
+    nodeid TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS results (
+    session INTEGER NOT NULL REFERENCES sessions (id),
+    test INTEGER NOT NULL REFERENCES tests (id),
+    outcome INTEGER NOT NULL,
+    duration REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_test ON results (test, session);
+CREATE INDEX IF NOT EXISTS results_session ON results (session);
+"""
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    """Open the history database, creating it if needed, in WAL mode."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(_SCHEMA)
+    return connection
+
+
+def _batches(rows: Iterable[tuple], size: int = BATCH_SIZE) -> Iterator[list[tuple]]:
+    """Split rows into lists of at most size rows."""
+    iterator = iter(rows)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def record_session(
+    path: Path, started: float, results: Iterable[tuple[str, str, float]]
+) -> int:
+    """Append the results of one session.
+
+    Args:
+        path: History database
+        started: Session start, seconds since the epoch
+        results: ``(nodeid, category, duration)`` of every finished test
+
+    Returns:
+        Id of the recorded session
+    """
+    codes = {category: code for code, category in enumerate(CATEGORIES)}
+    connection = connect(path)
+    try:
+        with connection:
+            session = connection.execute(
+                "INSERT INTO sessions (started) VALUES (?)", (started,)
+            ).lastrowid
+            for batch in _batches(results):
+                connection.executemany(
+                    "INSERT OR IGNORE INTO tests (nodeid) VALUES (?)",
+                    [(nodeid,) for nodeid, _, _ in batch],
+                )
+                connection.executemany(
+                    "INSERT INTO results (session, test, outcome, duration) "
+                    "SELECT ?, id, ?, ? FROM tests WHERE nodeid = ?",
+                    [
+                        (session, codes[category], duration, nodeid)
+                        for nodeid, category, duration in batch
+                    ],
+                )
+    finally:
+        connection.close()
+    return session
+
+
+def failure_trends(
+    connection: sqlite3.Connection, top: int, match: str = ""
+) -> list[tuple[str, int, int, float]]:
+    """Rank tests by failure rate.
+
+    Only tests whose nodeid contains ``match`` literally are ranked.
+
+    Returns:
+        ``(nodeid, runs, failures, first failed at)`` of failing tests
+    """
+    failing = ",".join(str(CATEGORIES.index(c)) for c in FAILING)
+    return connection.execute(
+        f"""
+        SELECT tests.nodeid, COUNT(*), SUM(outcome IN ({failing})),
+            MIN(CASE WHEN outcome IN ({failing}) THEN sessions.started END)
+        FROM results
+        JOIN tests ON tests.id = results.test
+        JOIN sessions ON sessions.id = results.session
+        WHERE instr(tests.nodeid, ?) > 0
+        GROUP BY results.test
+        HAVING SUM(outcome IN ({failing})) > 0
+        ORDER BY 1.0 * SUM(outcome IN ({failing})) / COUNT(*) DESC, COUNT(*) DESC
+        LIMIT ?
+        """,  # noqa: S608 - only integer codes are interpolated
+        (match, top),
+    ).fetchall()
+
+
+def duration_trends(
+    connection: sqlite3.Connection, top: int, match: str = ""
+) -> list[tuple[str, int, float, float, float]]:
+    """Rank tests by median duration.
+
+    Durations are streamed sorted per test, so only one test's durations are
+    held in memory at a time. Only tests whose nodeid contains ``match``
+    literally are ranked.
+
+    Returns:
+        ``(nodeid, runs, p50, p90, p99)`` of the slowest tests
+    """
+    rows = connection.execute(
+        """
+        SELECT tests.nodeid, results.duration
+        FROM results JOIN tests ON tests.id = results.test
+        WHERE instr(tests.nodeid, ?) > 0
+        ORDER BY results.test, results.duration
+        """,
+        (match,),
+    )
+    return heapq.nlargest(top, _duration_stats(rows), key=lambda row: row[2])
+
+
+def _duration_stats(
+    rows: Iterable[tuple[str, float]],
+) -> Iterator[tuple[str, int, float, float, float]]:
+    """Compute runs and percentiles per test from rows sorted by test."""
+    for nodeid, group in itertools.groupby(rows, key=lambda row: row[0]):
+        durations = [duration for _, duration in group]
+        percentiles = (_percentile(durations, q) for q in (0.5, 0.9, 0.99))
+        yield (nodeid, len(durations), *percentiles)
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _format_time(timestamp: float) -> str:
+    """Format a timestamp in local time, to the minute."""
+    return datetime.fromtimestamp(timestamp).astimezone().strftime("%Y-%m-%d %H:%M")
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Print failure or duration trends from a history database."""
+    parser = argparse.ArgumentParser(
+        prog="pytest-markdown-history",
+        description="Query the history recorded with --markdown-history.",
+    )
+    parser.add_argument("database", type=Path, help="History database file")
+    parser.add_argument(
+        "query", choices=("failures", "durations"), help="Trend to show"
+    )
+    parser.add_argument("--top", type=int, default=20, help="Number of tests shown")
+    parser.add_argument(
+        "--match", default="", help="Only tests whose nodeid contains this text"
+    )
+    args = parser.parse_args(argv)
+    if not args.database.exists():
+        parser.error(f"no history database at {args.database}")
+
+    connection = sqlite3.connect(args.database)
+    lines = []
+    try:
+        sessions = connection.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        lines.extend([f"**Sessions:** {sessions}", ""])
+        if args.query == "failures":
+            lines.extend(
+                [
+                    "| Test | Runs | Failed | Rate | First failed |",
+                    "|---|---|---|---|---|",
+                ]
+            )
+            for nodeid, runs, failures, first in failure_trends(
+                connection, args.top, args.match
+            ):
+                lines.append(
+                    f"| {nodeid} | {runs} | {failures} | {failures / runs:.0%} "
+                    f"| {_format_time(first)} |"
+                )
+        else:
+            lines.extend(["| Test | Runs | p50 | p90 | p99 |", "|---|---|---|---|---|"])
+            for nodeid, runs, p50, p90, p99 in duration_trends(
+                connection, args.top, args.match
+            ):
+                lines.append(
+                    f"| {nodeid} | {runs} | {p50:.2f}s | {p90:.2f}s | {p99:.2f}s |"
+                )
+    finally:
+        connection.close()
+    sys.stdout.write("\n".join(lines) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
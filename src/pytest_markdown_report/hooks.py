@@ -0,0 +1,37 @@
+"""Hooks other plugins implement to contribute to the markdown report.
+
+Output printed by plugins is swallowed by the redirected streams, so these
+hooks are the way to add content: whole sections, rendered only if they fit
+in the report's size limit, and compact metadata shown in test blocks.
+"""
+
+import pytest
+from _pytest.config import Config
+from _pytest.reports import TestReport
+
+from pytest_markdown_report.sections import ReportSection
+
+
+@pytest.hookspec
+def pytest_markdown_report_sections(config: Config) -> list[ReportSection] | None:
+    """Declare sections to add after the built-in ones.
+
+    Called once the session finished, when the report is built. Sections are
+    rendered lazily: those that do not fit the size limit are never rendered.
+
+    Args:
+        config: pytest Config object
+    """
+
+
+@pytest.hookspec
+def pytest_markdown_report_test_metadata(report: TestReport) -> dict[str, str] | None:
+    """Give compact metadata shown under the heading of a test's block.
+
+    Called only for tests whose block is rendered (failures, errors, skips),
+    so it costs nothing for the other tests. Results of all implementations
+    are shown on one line.
+
+    Args:
+        report: Report of the test, the one its block is rendered from
+    """
@@ -0,0 +1,110 @@
+"""Wall-clock vs CPU time of each test, to find tests stuck waiting.
+
+Process and thread CPU time are read around the setup, call and teardown
+phases, and compared with the phases' ``report.duration``. The difference is
+time spent waiting: sleeps, polling, I/O, locks, subprocesses (whose CPU time
+is not the process's own). Tests waiting the most are the cheapest to speed
+up. Process CPU time includes other threads, so with threaded runners the
+thread CPU time is the one to compare.
+"""
+
+import time
+from collections.abc import Generator
+
+import pytest
+from _pytest.reports import TestReport
+
+from pytest_markdown_report.ranking import push_top
+from pytest_markdown_report.subtests import is_subtest_report
+
+# Idle time below this is what any test shows between its phases (timer
+# resolution, context switches), not time spent waiting
+MIN_IDLE_SECONDS = 0.01
+
+
+class IdleTimeTracker:
+    """Rank tests by the time they spend waiting rather than computing.
+
+    Attributes:
+        top: Number of tests listed
+        idle: Min-heap of ``(idle, nodeid, wall, process_cpu, thread_cpu)``,
+            in seconds
+        wall_total: Wall-clock seconds of all tests
+        idle_total: Idle seconds of all tests
+    """
+
+    def __init__(self, top: int) -> None:
+        """Initialize the tracker.
+
+        Args:
+            top: Number of tests listed
+        """
+        self.top = top
+        self.idle: list[tuple[float, str, float, float, float]] = []
+        self.wall_total = 0.0
+        self.idle_total = 0.0
+        # ``[wall, process_cpu, thread_cpu]`` of tests still running
+        self._running: dict[str, list[float]] = {}
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_setup(self, item: pytest.Item) -> Generator[None]:
+        """Measure the CPU time of the setup phase."""
+        yield from self._measure(item.nodeid)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item: pytest.Item) -> Generator[None]:
+        """Measure the CPU time of the call phase."""
+        yield from self._measure(item.nodeid)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_teardown(self, item: pytest.Item) -> Generator[None]:
+        """Measure the CPU time of the teardown phase."""
+        yield from self._measure(item.nodeid)
+
+    def _measure(self, nodeid: str) -> Generator[None]:
+        """Add the CPU time spent in a phase to its test."""
+        process, thread = time.process_time(), time.thread_time()
+        yield
+        times = self._running.setdefault(nodeid, [0.0, 0.0, 0.0])
+        times[1] += time.process_time() - process
+        times[2] += time.thread_time() - thread
+
+    def pytest_runtest_logreport(self, report: TestReport) -> None:
+        """Add the phase duration, and rank the test after its teardown."""
+        if is_subtest_report(report):
+            return  # Its duration is part of the parent's call phase
+        times = self._running.setdefault(report.nodeid, [0.0, 0.0, 0.0])
+        times[0] += report.duration
+        if report.when != "teardown":
+            return
+        wall, process, thread = self._running.pop(report.nodeid)
+        idle = max(0.0, wall - process)
+        self.wall_total += wall
+        self.idle_total += idle
+        if idle < MIN_IDLE_SECONDS:
+            return
+        push_top(self.idle, (idle, report.nodeid, wall, process, thread), self.top)
+
+    def generate_section(self) -> list[str]:
+        """Generate the idle time table."""
+        if not self.idle:
+            return []
+        share = self.idle_total / self.wall_total
+        lines = [
+            "## Idle Time",
+            "",
+            (
+                f"**Idle:** {self.idle_total:.2f}s of {self.wall_total:.2f}s "
+                f"wall-clock ({share:.0%}) spent waiting rather than on CPU"
+            ),
+            "",
+            "| Test | Wall | CPU | Thread CPU | Idle |",
+            "|---|---|---|---|---|",
+        ]
+        for idle, nodeid, wall, process, thread in sorted(self.idle, reverse=True):
+            lines.append(
+                f"| {nodeid} | {wall:.2f}s | {process:.2f}s | {thread:.2f}s "
+                f"| {idle:.2f}s ({idle / wall:.0%}) |"
+            )
+        lines.append("")
+        return lines
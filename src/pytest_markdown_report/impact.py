@@ -0,0 +1,270 @@
+"""Per-test file dependency map for selecting tests affected by an edit.
+
+Each test records the project files whose code it executed, with a digest
+of their content. A later run with ``--markdown-affected`` keeps only tests
+that are new, failed last time, or depend on a file that changed since.
+
+Recording uses ``sys.monitoring`` on Python 3.12+: a ``PY_START`` callback
+notes the code object's file, in every thread, then returns ``DISABLE`` so
+that a function costs one callback per test. After each test, the functions
+it disabled are re-armed through their local events, which only concern
+this tool: ``sys.monitoring.restart_events()`` would re-arm the events of
+every tool, coverage included. Older versions fall back to a
+``sys.settrace`` call tracer, main thread only, that does not trace lines.
+"""
+
+import hashlib
+import sys
+from collections.abc import Generator, Iterable
+from pathlib import Path
+from types import CodeType, FrameType
+
+import pytest
+from _pytest.config import Config
+from _pytest.reports import TestReport
+
+CACHE_KEY = "markdown_report/impact"
+# Command suggested for rerunning when a dependency map is maintained
+AFFECTED_RERUN_CMD = "pytest --markdown-affected"
+# sys.monitoring tool ids not reserved for debuggers, coverage or profilers
+_FREE_TOOL_IDS = (3, 4)
+
+
+def file_digest(path: Path) -> str:
+    """Digest a file's content, empty string if it cannot be read."""
+    try:
+        return hashlib.blake2b(path.read_bytes(), digest_size=8).hexdigest()
+    except OSError:
+        return ""
+
+
+class ImpactMap:
+    """Tests, the file versions they depend on, and the last failures.
+
+    File versions are interned: ``files`` holds ``[path, digest]`` pairs and
+    each test lists indexes into it, which keeps the cached JSON compact.
+
+    Attributes:
+        files: Distinct ``[path, digest]`` pairs, paths relative to rootdir
+        tests: Indexes into ``files`` for each nodeid
+        failed: Nodeids that failed when last run
+    """
+
+    def __init__(
+        self,
+        files: list[list[str]] | None = None,
+        tests: dict[str, list[int]] | None = None,
+        failed: Iterable[str] = (),
+    ) -> None:
+        """Initialize from the cached representation."""
+        self.files = files or []
+        self.tests = tests or {}
+        self.failed = set(failed)
+
+    @classmethod
+    def load(cls, config: Config) -> "ImpactMap":
+        """Load the map from the pytest cache (empty if absent)."""
+        data = config.cache.get(CACHE_KEY, None) if config.cache else None
+        if not isinstance(data, dict):
+            return cls()
+        return cls(data.get("files"), data.get("tests"), data.get("failed", ()))
+
+    def save(self, config: Config) -> None:
+        """Store the map in the pytest cache."""
+        if config.cache:
+            data = {
+                "files": self.files,
+                "tests": self.tests,
+                "failed": sorted(self.failed),
+            }
+            config.cache.set(CACHE_KEY, data)
+
+    def update(self, recorded: dict[str, dict[str, str]], failed: set[str]) -> None:
+        """Replace the entries of the tests that ran, drop unused versions.
+
+        Args:
+            recorded: Dependencies (path to digest) of each test that ran
+            failed: Nodeids among them that failed
+        """
+        tests = {
+            nodeid: {tuple(self.files[i]) for i in indexes}
+            for nodeid, indexes in self.tests.items()
+            if nodeid not in recorded
+        }
+        for nodeid, deps in recorded.items():
+            tests[nodeid] = set(deps.items())
+        versions = sorted({version for deps in tests.values() for version in deps})
+        index = {version: i for i, version in enumerate(versions)}
+        self.files = [list(version) for version in versions]
+        self.tests = {
+            nodeid: sorted(index[version] for version in deps)
+            for nodeid, deps in tests.items()
+        }
+        self.failed = (self.failed - recorded.keys()) | failed
+
+    def affected(self, nodeids: Iterable[str], rootpath: Path) -> set[str]:
+        """Select the tests that may behave differently since recording.
+
+        Args:
+            nodeids: Collected tests
+            rootpath: Directory recorded paths are relative to
+
+        Returns:
+            Nodeids that are unknown, failed last time, or have a changed
+            dependency
+        """
+        digests: dict[str, str] = {}
+
+        def changed(path: str, digest: str) -> bool:
+            if path not in digests:
+                digests[path] = file_digest(rootpath / path)
+            return digests[path] != digest
+
+        selected = set()
+        for nodeid in nodeids:
+            indexes = self.tests.get(nodeid)
+            if (
+                indexes is None
+                or nodeid in self.failed
+                or any(changed(*self.files[i]) for i in indexes)
+            ):
+                selected.add(nodeid)
+        return selected
+
+
+class ImpactRecorder:
+    """Record the project files each test executes (pytest plugin).
+
+    Attributes:
+        recorded: Dependencies (path to digest) of each test run so far
+        failed: Nodeids that failed in this session
+    """
+
+    def __init__(self, config: Config, *, select_affected: bool) -> None:
+        """Initialize the recorder.
+
+        Args:
+            config: pytest Config object
+            select_affected: Deselect tests not affected since the last map
+        """
+        self.config = config
+        self.rootpath = config.rootpath
+        self.select_affected = select_affected
+        self.recorded: dict[str, dict[str, str]] = {}
+        self.failed: set[str] = set()
+        self._filenames: set[str] = set()
+        # Code objects whose PY_START event the running test disabled
+        self._disabled: list[CodeType] = []
+        self._digests: dict[str, str] = {}
+        self._tool_id: int | None = None
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(
+        self, config: Config, items: list[pytest.Item]
+    ) -> None:
+        """Deselect tests whose recorded dependencies did not change."""
+        if not self.select_affected:
+            return
+        impact_map = ImpactMap.load(config)
+        if not impact_map.tests:
+            return  # Nothing recorded yet: run everything
+        selected = impact_map.affected([item.nodeid for item in items], self.rootpath)
+        deselected = [item for item in items if item.nodeid not in selected]
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = [item for item in items if item.nodeid in selected]
+
+    def pytest_sessionstart(self) -> None:
+        """Claim a sys.monitoring tool id when available."""
+        monitoring = getattr(sys, "monitoring", None)
+        if monitoring is None:
+            return
+        for tool_id in _FREE_TOOL_IDS:
+            if monitoring.get_tool(tool_id) is None:
+                monitoring.use_tool_id(tool_id, "pytest-markdown-report")
+                monitoring.register_callback(
+                    tool_id, monitoring.events.PY_START, self._on_py_start
+                )
+                self._tool_id = tool_id
+                return
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item: pytest.Item) -> Generator[None]:
+        """Record the files executed by one test, all phases included."""
+        self._filenames = set()
+        recording = self._start()
+        yield
+        if recording:
+            self._stop()
+            self.recorded[item.nodeid] = self._dependencies(self._filenames)
+
+    def pytest_runtest_logreport(self, report: TestReport) -> None:
+        """Remember failures, always selected on the next affected run."""
+        if report.failed:
+            self.failed.add(report.nodeid)
+
+    def pytest_sessionfinish(self) -> None:
+        """Release the tool id and merge the recording into the cache."""
+        if self._tool_id is not None:
+            monitoring = sys.monitoring
+            monitoring.register_callback(
+                self._tool_id, monitoring.events.PY_START, None
+            )
+            monitoring.free_tool_id(self._tool_id)
+            self._tool_id = None
+        if self.recorded:
+            impact_map = ImpactMap.load(self.config)
+            impact_map.update(self.recorded, self.failed)
+            impact_map.save(self.config)
+
+    def _start(self) -> bool:
+        """Start recording, False if another tracer owns the hook."""
+        if self._tool_id is not None:
+            monitoring = sys.monitoring
+            monitoring.set_events(self._tool_id, monitoring.events.PY_START)
+            return True
+        if sys.gettrace() is not None:
+            return False  # Debugger or coverage: unrecorded tests stay selected
+        sys.settrace(self._on_call)
+        return True
+
+    def _stop(self) -> None:
+        """Stop recording."""
+        if self._tool_id is None:
+            sys.settrace(None)
+            return
+        monitoring = sys.monitoring
+        monitoring.set_events(self._tool_id, 0)
+        # Setting local events re-instruments the code object for this tool
+        # only, which also drops its disabled state
+        for code in self._disabled:
+            monitoring.set_local_events(self._tool_id, code, monitoring.events.PY_START)
+            monitoring.set_local_events(self._tool_id, code, 0)
+        self._disabled = []
+
+    def _on_py_start(self, code: CodeType, _offset: int) -> object:
+        """Note the file of a starting function, once per test."""
+        self._filenames.add(code.co_filename)
+        self._disabled.append(code)
+        return sys.monitoring.DISABLE
+
+    def _on_call(self, frame: FrameType, event: str, _arg: object) -> None:
+        """Note the file of each called function (settrace fallback)."""
+        if event == "call":
+            self._filenames.add(frame.f_code.co_filename)
+
+    def _dependencies(self, filenames: set[str]) -> dict[str, str]:
+        """Map executed project files to their digests."""
+        deps = {}
+        for filename in filenames:
+            path = Path(filename)
+            if not path.is_absolute() or "site-packages" in path.parts:
+                continue
+            try:
+                relpath = path.relative_to(self.rootpath).as_posix()
+            except ValueError:
+                continue  # Outside the project: stdlib, tools
+            if relpath not in self._digests:
+                self._digests[relpath] = file_digest(path)
+            deps[relpath] = self._digests[relpath]
+        return deps
@@ -0,0 +1,215 @@
+"""Streaming JUnit XML writer fed by the categorized reports.
+
+Each ``<testcase>`` is written as soon as its test is categorized, so memory
+does not grow with the session. The counts of the ``<testsuite>`` element
+are only known at the end: its start tag reserves a fixed-width region of
+spaces that is overwritten in place when the file is closed.
+
+When failures are rerun (``--markdown-auto-rerun``), failing testcases are
+held until the file is closed: those that passed on rerun are written as
+passing with a ``<flakyFailure>`` or ``<flakyError>`` element, as Maven
+Surefire does, so they are not counted as failures.
+"""
+
+import platform
+import re
+import time
+from collections.abc import Container
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO
+from xml.sax.saxutils import escape, quoteattr
+
+from _pytest.reports import CollectReport, TestReport
+
+# Bytes reserved in the <testsuite> start tag for the final counts
+HEADER_WIDTH = 128
+
+# Characters XML 1.0 does not allow, even escaped
+_ILLEGAL_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+def _replace_illegal(text: str) -> str:
+    """Replace characters XML cannot hold by their code."""
+    return _ILLEGAL_XML.sub(lambda m: f"#x{ord(m.group()):02X}", text)
+
+
+def xml_text(text: str) -> str:
+    """Escape text for XML."""
+    return escape(_replace_illegal(text))
+
+
+def xml_attr(text: str) -> str:
+    """Quote and escape an attribute value."""
+    return quoteattr(_replace_illegal(text))
+
+
+def junit_names(nodeid: str) -> tuple[str, str]:
+    """Derive JUnit classname and name from a nodeid, as pytest does.
+
+    ``tests/test_x.py::TestA::test_b`` gives ``("tests.test_x.TestA", "test_b")``.
+    """
+    path, *scopes = nodeid.split("::")
+    module = path.removesuffix(".py").replace("/", ".")
+    if not scopes:
+        return "", module
+    return ".".join([module, *scopes[:-1]]), scopes[-1]
+
+
+def _message(report: TestReport | CollectReport) -> str:
+    """Short failure message: the crash line, else the last traceback line."""
+    crash = getattr(report.longrepr, "reprcrash", None)
+    if crash is not None:
+        return crash.message.splitlines()[0] if crash.message else ""
+    lines = report.longreprtext.strip().splitlines()
+    return lines[-1] if lines else ""
+
+
+def _skip_reason(report: TestReport) -> str:
+    """Reason of a skip or xfail."""
+    if hasattr(report, "wasxfail"):
+        return report.wasxfail
+    if isinstance(report.longrepr, tuple):
+        return report.longrepr[2].removeprefix("Skipped: ")
+    return ""
+
+
+class JUnitXMLWriter:
+    """Write JUnit XML incrementally, one testcase per finished test.
+
+    Attributes:
+        path: Output file
+        counts: Number of tests, failures, errors and skips written so far
+    """
+
+    def __init__(self, path: Path, *, hold_failures: bool = False) -> None:
+        """Initialize the writer, the file is created by open().
+
+        Args:
+            path: Output file
+            hold_failures: Write failures and errors when closing, once
+                reruns told which ones are flaky
+        """
+        self.path = path
+        self.counts = {"tests": 0, "failures": 0, "errors": 0, "skipped": 0}
+        # (report, category, duration) of the failures held until closing
+        self._held: list[tuple[TestReport, str, float]] | None = (
+            [] if hold_failures else None
+        )
+        # Phase durations of tests not written yet
+        self._durations: dict[str, float] = {}
+        self._file: BinaryIO | None = None
+        self._header_offset = 0
+        self._start = 0.0
+
+    def open(self) -> None:
+        """Create the file and write the document start."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open("wb")
+        self._start = time.perf_counter()
+        timestamp = datetime.now().astimezone().isoformat(timespec="seconds")
+        self._write(
+            '<?xml version="1.0" encoding="utf-8"?>\n<testsuites>\n'
+            f'<testsuite name="pytest" hostname={xml_attr(platform.node())} '
+            f'timestamp="{timestamp}" '
+        )
+        self._header_offset = self._file.tell()
+        self._write(" " * HEADER_WIDTH + ">\n")
+
+    def add_duration(self, report: TestReport) -> None:
+        """Account the duration of one phase of a test."""
+        self._durations[report.nodeid] = (
+            self._durations.get(report.nodeid, 0.0) + report.duration
+        )
+
+    def write_testcase(self, report: TestReport, category: str | None) -> None:
+        """Write the testcase of a categorized test.
+
+        Args:
+            report: Worst report of the test
+            category: Markdown report category (xpassed counts as a failure,
+                failures outside the call phase as errors)
+        """
+        duration = self._durations.pop(report.nodeid, report.duration)
+        if self._held is not None and category in ("errors", "failed"):
+            self._held.append((report, category, duration))
+            return
+        self._write_categorized(report, category, duration)
+
+    def _write_categorized(
+        self, report: TestReport, category: str | None, duration: float
+    ) -> None:
+        """Write the testcase of a test, with the element of its category."""
+        body = ""
+        if category == "errors":
+            self.counts["errors"] += 1
+            body = self._element("error", _message(report), report.longreprtext)
+        elif category == "failed":
+            self.counts["failures"] += 1
+            body = self._element("failure", _message(report), report.longreprtext)
+        elif category == "xpassed":
+            self.counts["failures"] += 1
+            body = self._element("failure", f"[XPASS] {_skip_reason(report)}", "")
+        elif category == "skipped":
+            self.counts["skipped"] += 1
+            body = self._element("skipped", _skip_reason(report), "", "pytest.skip")
+        elif category == "xfailed":
+            self.counts["skipped"] += 1
+            body = self._element("skipped", _skip_reason(report), "", "pytest.xfail")
+        self._write_testcase(report.nodeid, duration, body)
+
+    def write_collection_error(self, report: CollectReport) -> None:
+        """Write a collection error as an errored testcase."""
+        self.counts["errors"] += 1
+        body = self._element("error", "collection failure", report.longreprtext)
+        self._write_testcase(report.nodeid, 0.0, body)
+
+    def close(self, flaky: Container[str] = ()) -> None:
+        """Write held failures, close the document, fill in the counts.
+
+        Idempotent.
+
+        Args:
+            flaky: Nodeids of the failures that passed on rerun
+        """
+        if self._file is None:
+            return
+        for report, category, duration in self._held or ():
+            if report.nodeid in flaky:
+                tag = "flakyError" if category == "errors" else "flakyFailure"
+                body = self._element(tag, _message(report), report.longreprtext)
+                self._write_testcase(report.nodeid, duration, body)
+            else:
+                self._write_categorized(report, category, duration)
+        self._held = None
+        self._write("</testsuite>\n</testsuites>\n")
+        elapsed = time.perf_counter() - self._start
+        attributes = " ".join(f'{key}="{value}"' for key, value in self.counts.items())
+        self._file.seek(self._header_offset)
+        self._write(f'{attributes} time="{elapsed:.3f}"'.ljust(HEADER_WIDTH))
+        self._file.close()
+        self._file = None
+
+    def _write_testcase(self, nodeid: str, duration: float, body: str) -> None:
+        """Write one testcase element."""
+        self.counts["tests"] += 1
+        classname, name = junit_names(nodeid)
+        start = (
+            f"<testcase classname={xml_attr(classname)} name={xml_attr(name)} "
+            f'time="{duration:.3f}"'
+        )
+        self._write(f"{start}>{body}</testcase>\n" if body else f"{start} />\n")
+
+    @staticmethod
+    def _element(tag: str, message: str, text: str, kind: str = "") -> str:
+        """Format a failure, error or skipped element."""
+        attributes = f"message={xml_attr(message)}"
+        if kind:
+            attributes = f"type={xml_attr(kind)} {attributes}"
+        if not text:
+            return f"<{tag} {attributes} />"
+        return f"<{tag} {attributes}>{xml_text(text)}</{tag}>"
+
+    def _write(self, text: str) -> None:
+        """Write text to the file, UTF-8 encoded."""
+        self._file.write(text.encode())
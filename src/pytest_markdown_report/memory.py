@@ -0,0 +1,132 @@
+"""Per-test memory high-water and retention tracking.
+
+Two sources are available:
+
+- ``tracemalloc``: exact Python allocations, but every allocation is traced,
+  which slows allocation-heavy suites by an order of magnitude
+- ``rss``: process resident set size, read around each test at negligible
+  cost; the peak is how much a test raised the process high-water mark, so
+  tests peaking below an earlier high-water show no peak
+"""
+
+import os
+import sys
+import tracemalloc
+from collections.abc import Generator
+from pathlib import Path
+
+import pytest
+
+from pytest_markdown_report.ranking import push_top
+
+# Retained bytes below this are allocator noise, not worth reporting
+RETAINED_THRESHOLD = 256 * 1024
+MEMORY_SOURCES = ("tracemalloc", "rss")
+
+
+def rss_bytes() -> int:
+    """Read the resident set size, 0 where /proc is unavailable."""
+    try:
+        pages = int(Path("/proc/self/statm").read_text().split()[1])
+    except (OSError, IndexError, ValueError):
+        return 0
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def max_rss_bytes() -> int:
+    """Read the resident set size high-water mark of the process."""
+    import resource  # noqa: PLC0415 - Unix only, imported for the rss source
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def format_bytes(size: float) -> str:
+    """Format a byte count with a binary unit."""
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+class MemoryTracker:
+    """Measure the allocation peak and retained memory of each test.
+
+    Peaks are relative to the memory in use when the test started, and
+    retained memory is what is still allocated after its teardown. Only the
+    top entries are kept, in bounded min-heaps.
+
+    Attributes:
+        top: Number of tests listed per ranking
+        source: ``tracemalloc`` or ``rss``
+        peaks: Min-heap of ``(peak_bytes, nodeid)``
+        retained: Min-heap of ``(retained_bytes, nodeid)``
+    """
+
+    def __init__(self, top: int, source: str = "tracemalloc") -> None:
+        """Initialize the tracker.
+
+        Args:
+            top: Number of tests listed per ranking
+            source: ``tracemalloc`` or ``rss``
+        """
+        self.top = top
+        self.source = source
+        self.peaks: list[tuple[int, str]] = []
+        self.retained: list[tuple[int, str]] = []
+        self._started = False
+
+    def pytest_sessionstart(self) -> None:
+        """Start tracing allocations unless something else already does."""
+        if self.source == "tracemalloc" and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started = True
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item: pytest.Item) -> Generator[None]:
+        """Measure one test, setup and teardown included."""
+        if self.source == "rss":
+            before, max_before = rss_bytes(), max_rss_bytes()
+            yield
+            retained = rss_bytes() - before
+            peak = max_rss_bytes() - max_before
+        else:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            yield
+            current, peak = tracemalloc.get_traced_memory()
+            retained = current - before
+            peak -= before
+        if peak > 0:
+            push_top(self.peaks, (peak, item.nodeid), self.top)
+        if retained >= RETAINED_THRESHOLD:
+            push_top(self.retained, (retained, item.nodeid), self.top)
+
+    def pytest_sessionfinish(self) -> None:
+        """Stop tracing if this plugin started it."""
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    def generate_section(self) -> list[str]:
+        """Generate the memory section."""
+        if not self.peaks:
+            return []
+        lines = ["## Memory", "", "**Peak allocation:**", ""]
+        lines.extend(self._format_ranking(self.peaks))
+        if self.retained:
+            lines.extend(["**Retained after teardown:**", ""])
+            lines.extend(self._format_ranking(self.retained))
+        return lines
+
+    @staticmethod
+    def _format_ranking(heap: list[tuple[int, str]]) -> list[str]:
+        """Format a heap from largest to smallest."""
+        lines = [
+            f"- {format_bytes(size)} {nodeid}"
+            for size, nodeid in sorted(heap, reverse=True)
+        ]
+        lines.append("")
+        return lines
@@ -0,0 +1,362 @@
+"""Merge the markdown reports of several shards into one report.
+
+Each input is memory-mapped and indexed once: its summary counts and the
+offsets of its sections. Sections are then written one at a time, with a
+k-way ``heapq.merge`` of the inputs' entries (``### nodeid`` blocks and
+``- `` list items) keyed by their first line. Only one entry per input is in
+memory at a time, whatever the number and size of the reports. Inputs in
+nodeid order (pytest collects files alphabetically) merge into nodeid order;
+others still merge completely, in a stable interleaving.
+
+Rankings (``- 1.2 MiB nodeid``, ``- 0.50s fixture``) are merged by their
+value, largest first, each label once. The roll-up, a few lines per report,
+is parsed and its counts summed per container.
+"""
+
+import argparse
+import heapq
+import mmap
+import re
+import sys
+from collections import Counter
+from collections.abc import Iterator
+from pathlib import Path
+from typing import BinaryIO
+
+from pytest_markdown_report import rollup
+
+# Summary parts in the order the plugin writes them, after "N/M passed"
+SUMMARY_PARTS = ("failed", "flaky", "skipped", "xfail", "regressed")
+COLLECTION_ERRORS = "Collection Errors"
+# Sections whose identical entries are listed once across shards
+DEDUPLICATED = ("Warnings",)
+# Sections listing values largest first, in lists under bold subheadings
+RANKINGS = ("Memory", "Fixture costs", "Slow collection")
+ROLLUP = "Roll-up"
+
+_SUMMARY = b"**Summary:** "
+_FENCE = b"```"
+_PART = re.compile(r"(\d+)(?:/(\d+))? (\w+)")
+_COLLECTION_COUNT = re.compile(rb"\*\*\d+ collection errors?\*\*")
+_SUBHEADING = re.compile(rb"\*\*[^*]+:\*\*")
+# Value and label of a ranking entry; sizes are in memory.format_bytes units
+_RANKED = re.compile(rb"- (\d+(?:\.\d+)?) ?(B|KiB|MiB|GiB|s) (.*)")
+_UNITS = {b"B": 1, b"KiB": 1024, b"MiB": 1024**2, b"GiB": 1024**3, b"s": 1}
+
+# Merge key, first line and text of an entry
+_Keyed = tuple[tuple, bytes, bytes]
+
+
+def _is_entry(line: bytes, *, blocks: bool, ranked: bool = False) -> bool:
+    """Check whether a line starts a section entry.
+
+    In a section of ``###`` blocks, list items belong to the block they are
+    in (subtests, profiles), so only headings start entries. In rankings,
+    subheadings start entries too, so that each one starts its own list.
+    """
+    if blocks:
+        return line.startswith(b"### ")
+    if ranked and _SUBHEADING.fullmatch(line):
+        return True
+    return line.startswith((b"### ", b"- "))
+
+
+class ShardReport:
+    """One memory-mapped input report, indexed by section.
+
+    Attributes:
+        path: Report file
+        title: First-level heading, without the ``# `` prefix
+        passed: Passed tests, from the summary
+        total: Tests, from the summary
+        counts: Other summary counts, per part name
+        notes: Lines between the summary and the first section
+        sections: ``(start, end)`` byte offsets of each section body
+        entries: Number of entries of each section
+        block_sections: Sections made of ``###`` blocks rather than list items
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Map and index a report.
+
+        Args:
+            path: Report file, not empty
+        """
+        self.path = path
+        with path.open("rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.title = ""
+        self.passed = 0
+        self.total = 0
+        self.counts: Counter[str] = Counter()
+        self.notes: list[bytes] = []
+        self.sections: dict[str, tuple[int, int]] = {}
+        self.entries: Counter[str] = Counter()
+        self.block_sections: set[str] = set()
+        self._items: Counter[str] = Counter()
+        self._index()
+
+    def close(self) -> None:
+        """Unmap the report."""
+        self._map.close()
+
+    def _lines(self, start: int, end: int) -> Iterator[tuple[int, bytes, bool]]:
+        """Iterate over ``(offset, line, is code block)`` in a byte range.
+
+        A code block is yielded whole, found with a single search, so the
+        lines of long tracebacks are never iterated over.
+        """
+        data = self._map
+        position = start
+        while position < end:
+            is_block = data[position : position + len(_FENCE)] == _FENCE
+            if is_block:
+                closing = data.find(b"\n" + _FENCE, position + len(_FENCE), end)
+                position_end = end if closing == -1 else closing + 1
+            else:
+                position_end = position
+            newline = data.find(b"\n", position_end, end)
+            stop = end if newline == -1 else newline
+            yield position, data[position:stop], is_block
+            position = stop + 1
+
+    def _index(self) -> None:
+        """Read the summary and locate sections, outside of code blocks."""
+        name = None
+        for position, line, in_fence in self._lines(0, len(self._map)):
+            if in_fence:
+                continue
+            if line.startswith(b"# ") and not self.title:
+                self.title = line[2:].decode()
+                if self.title == COLLECTION_ERRORS:
+                    name = self._start_section(COLLECTION_ERRORS, position, line)
+            elif line.startswith(b"## "):
+                name = self._start_section(line[3:].decode(), position, line)
+            elif name is None:
+                self._read_header(line)
+            else:
+                self._count_entry(name, line)
+        if name is not None:
+            start, _ = self.sections[name]
+            self.sections[name] = (start, len(self._map))
+        # List items are entries only outside of ``###`` blocks
+        for section in self.sections.keys() - self.block_sections:
+            self.entries[section] = self._items[section]
+
+    def _count_entry(self, name: str, line: bytes) -> None:
+        """Count a line of a section if it is a block heading or list item."""
+        if line.startswith(b"### "):
+            self.block_sections.add(name)
+            self.entries[name] += 1
+        elif line.startswith(b"- "):
+            self._items[name] += 1
+
+    def _start_section(self, name: str, position: int, heading: bytes) -> str:
+        """End the previous section at a heading and start the next one."""
+        if self.sections:
+            last = next(reversed(self.sections))
+            self.sections[last] = (self.sections[last][0], position)
+        self.sections[name] = (position + len(heading) + 1, position)
+        return name
+
+    def _read_header(self, line: bytes) -> None:
+        """Read a line before the first section: summary or note."""
+        if not line.startswith(_SUMMARY):
+            if line.strip():
+                self.notes.append(line)
+            return
+        for count, total, part in _PART.findall(line[len(_SUMMARY) :].decode()):
+            if part == "passed" and total:
+                self.passed += int(count)
+                self.total += int(total)
+            else:
+                self.counts[part] += int(count)
+
+    def preamble(self, name: str) -> bytes:
+        """Get the text of a section before its first entry."""
+        start, end = self.sections[name]
+        lines = []
+        blocks = name in self.block_sections
+        ranked = name in RANKINGS
+        for _, line, in_fence in self._lines(start, end):
+            if not in_fence and _is_entry(line, blocks=blocks, ranked=ranked):
+                break
+            if name != COLLECTION_ERRORS or not _COLLECTION_COUNT.fullmatch(line):
+                lines.append(line)
+        return b"\n".join(lines).strip()
+
+    def iter_entries(self, name: str) -> Iterator[tuple[bytes, bytes]]:
+        """Iterate over ``(first line, text)`` of the entries of a section."""
+        start, end = self.sections[name]
+        entry_start, first = None, b""
+        blocks = name in self.block_sections
+        ranked = name in RANKINGS
+        for position, line, in_fence in self._lines(start, end):
+            if in_fence or not _is_entry(line, blocks=blocks, ranked=ranked):
+                continue
+            if entry_start is not None:
+                yield first, self._map[entry_start:position].rstrip()
+            entry_start, first = position, line
+        if entry_start is not None:
+            yield first, self._map[entry_start:end].rstrip()
+
+    def section_lines(self, name: str) -> list[str]:
+        """Get the lines of a section, for sections read whole."""
+        start, end = self.sections[name]
+        return self._map[start:end].decode().splitlines()
+
+
+def section_order(reports: list[ShardReport]) -> list[str]:
+    """Order the sections of all reports, keeping each report's order."""
+    order: list[str] = []
+    for report in reports:
+        previous = -1
+        for name in report.sections:
+            if name in order:
+                previous = order.index(name)
+            else:
+                previous += 1
+                order.insert(previous, name)
+    if COLLECTION_ERRORS in order:
+        order.remove(COLLECTION_ERRORS)
+        order.insert(0, COLLECTION_ERRORS)
+    return order
+
+
+def summary_line(reports: list[ShardReport]) -> str:
+    """Recompute the summary line from the summaries of all reports."""
+    counts: Counter[str] = Counter()
+    for report in reports:
+        counts.update(report.counts)
+    passed = sum(report.passed for report in reports)
+    total = sum(report.total for report in reports)
+    parts = [f"{passed}/{total} passed"]
+    parts.extend(f"{counts[part]} {part}" for part in SUMMARY_PARTS if counts[part])
+    parts.extend(
+        f"{count} {part}" for part, count in counts.items() if part not in SUMMARY_PARTS
+    )
+    # Every shard collects the same files, and reports the same errors
+    errors = len(
+        {
+            first
+            for report in reports
+            if COLLECTION_ERRORS in report.sections
+            for first, _ in report.iter_entries(COLLECTION_ERRORS)
+        }
+    )
+    if errors:
+        parts.append(f"{errors} collection error{'s' if errors > 1 else ''}")
+    return f"**Summary:** {', '.join(parts)}"
+
+
+def write_merged(reports: list[ShardReport], out: BinaryIO) -> None:
+    """Write the merged report of several shards.
+
+    Args:
+        reports: Indexed input reports
+        out: Binary stream to write to
+    """
+    partial = any(report.title.endswith("(partial)") for report in reports)
+    title = "# Test Report (partial)" if partial else "# Test Report"
+    out.write(f"{title}\n\n{summary_line(reports)}".encode())
+    out.write(f"\n\n**Merged:** {len(reports)} reports".encode())
+    notes = dict.fromkeys(note for report in reports for note in report.notes)
+    out.writelines(b"\n\n" + note for note in notes)
+    for name in section_order(reports):
+        with_section = [report for report in reports if name in report.sections]
+        out.write(f"\n\n## {name}".encode())
+        if name == ROLLUP:
+            sections = (report.section_lines(name) for report in with_section)
+            lines = rollup.merge_sections(sections)
+            out.write("\n\n{}".format("\n".join(lines)).encode())
+            continue
+        for preamble in dict.fromkeys(r.preamble(name) for r in with_section):
+            if preamble:
+                out.write(b"\n\n" + preamble)
+        _write_entries(name, with_section, out)
+    out.write(b"\n")
+
+
+def _by_first_line(entries: Iterator[tuple[bytes, bytes]]) -> Iterator[_Keyed]:
+    """Key entries by their first line."""
+    for first, text in entries:
+        yield (first,), first, text
+
+
+def _by_value(entries: Iterator[tuple[bytes, bytes]]) -> Iterator[_Keyed]:
+    """Key ranking entries by subheading, then by value, largest first."""
+    subheading = 0
+    for first, text in entries:
+        match = _RANKED.fullmatch(first)
+        if match:
+            value = float(match[1]) * _UNITS[match[2]]
+            yield (subheading, -value, match[3]), first, text
+        elif _SUBHEADING.fullmatch(first):
+            subheading += 1
+            yield (subheading, float("-inf"), first), first, text
+        else:
+            yield (subheading, 0.0, first), first, text
+
+
+def _write_entries(name: str, reports: list[ShardReport], out: BinaryIO) -> None:
+    """Write the k-way merge of one section's entries."""
+    seen: set[object] = set()
+    previous = None
+    keyed = _by_value if name in RANKINGS else _by_first_line
+    merged = heapq.merge(
+        *(keyed(report.iter_entries(name)) for report in reports),
+        key=lambda e: e[0],
+    )
+    for key, first, text in merged:
+        if first == previous or (name in DEDUPLICATED and text in seen):
+            continue  # Same test in two shards, or a repeated warning
+        if name in DEDUPLICATED:
+            seen.add(text)
+        if name in RANKINGS:
+            # Files are collected, fixtures set up, in several shards: keep
+            # the largest value, listed first. Keyed by subheading and label
+            ranked = (key[0], key[2])
+            if ranked in seen:
+                continue
+            seen.add(ranked)
+        # List items follow each other, blocks are separated by a blank line
+        in_list = (
+            previous is not None
+            and previous.startswith(b"- ")
+            and first.startswith(b"- ")
+        )
+        out.write((b"\n" if in_list else b"\n\n") + text)
+        previous = first
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Merge shard reports into one markdown report."""
+    parser = argparse.ArgumentParser(
+        prog="pytest-markdown-merge",
+        description="Merge --markdown-report files of several shards.",
+    )
+    parser.add_argument("reports", nargs="+", type=Path, help="Shard reports")
+    parser.add_argument(
+        "-o", "--output", type=Path, help="Merged report file (default: stdout)"
+    )
+    args = parser.parse_args(argv)
+    missing = [str(path) for path in args.reports if not path.is_file()]
+    if missing:
+        parser.error(f"no such report: {', '.join(missing)}")
+
+    reports = [ShardReport(path) for path in args.reports if path.stat().st_size]
+    try:
+        if args.output:
+            with args.output.open("wb") as out:
+                write_merged(reports, out)
+        else:
+            write_merged(reports, sys.stdout.buffer)
+            sys.stdout.flush()
+    finally:
+        for report in reports:
+            report.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""Traceback normalization: strip noise that costs tokens and defeats caching.
+
+All enabled rules are compiled into one alternation, so a traceback is
+scanned once whatever the number of rules:
+
+- ``ansi``: color and cursor escape sequences (``--color=yes``)
+- ``paths``: the rootdir prefix is dropped, virtualenv and stdlib prefixes
+  become ``<site-packages>/`` and ``<stdlib>/``
+- ``tmp``: pytest temporary directories become ``<tmp>``
+- ``addresses``: object addresses in reprs become ``0x…``
+"""
+
+import argparse
+import os
+import re
+import sysconfig
+from pathlib import Path
+
+NORMALIZE_RULES = ("ansi", "paths", "tmp", "addresses")
+
+# Each pattern is split into its first character (as a character set) and the
+# rest. The combined pattern starts with the union of the first characters, so
+# the scan skips fast to the few positions worth trying.
+_ANSI = (r"\x1b", r"\[[0-9;?]*[A-Za-z]")
+_SEPARATORS = r"/\\"
+# Characters that end a path inside a traceback line
+_PATH_CHAR = r"[^\s\"'<>()\[\],:]"
+# After a separator: check it is where an absolute path starts
+_PATH_START = rf"(?<!{_PATH_CHAR}[/\\])"
+_SITE_PACKAGES = (
+    _SEPARATORS,
+    rf"{_PATH_START}{_PATH_CHAR}*?[/\\](?:site|dist)-packages[/\\]",
+)
+# <system temp>/pytest-of-<user>/pytest-<n>/<test dir>
+_PYTEST_TMP = (
+    _SEPARATORS,
+    (
+        rf"{_PATH_START}(?:{_PATH_CHAR}*?[/\\])?(?:pytest-of-{_PATH_CHAR}+?[/\\])?"
+        rf"pytest-\d+[/\\]{_PATH_CHAR}+?\d+(?=[/\\\s\"')\],:]|$)"
+    ),
+)
+_ADDRESS = ("0", r"(?<= at 0)x[0-9a-fA-F]+")
+
+
+def _literal_path(path: Path, suffix: str = "") -> tuple[str, str]:
+    """Split pattern matching a literal absolute path where a path starts."""
+    text = f"{path}{suffix}"
+    if text[0] in "/\\":
+        return _SEPARATORS, _PATH_START + re.escape(text[1:])
+    # Windows drive letter
+    return re.escape(text[0]), re.escape(text[1:])
+
+
+def parse_rules(value: str) -> tuple[str, ...]:
+    """Parse the ``--markdown-normalize`` value.
+
+    Args:
+        value: Comma-separated rule names, ``all`` or ``none``
+
+    Raises:
+        argparse.ArgumentTypeError: For an unknown rule name
+    """
+    if value == "all":
+        return NORMALIZE_RULES
+    if value == "none":
+        return ()
+    rules = tuple(rule.strip() for rule in value.split(",") if rule.strip())
+    unknown = [rule for rule in rules if rule not in NORMALIZE_RULES]
+    if unknown:
+        msg = (
+            f"unknown rule {', '.join(unknown)} "
+            f"(choose from all, none, {', '.join(NORMALIZE_RULES)})"
+        )
+        raise argparse.ArgumentTypeError(msg)
+    return rules
+
+
+class TracebackNormalizer:
+    """Rewrite noisy traceback fragments to short stable placeholders."""
+
+    def __init__(
+        self, rules: tuple[str, ...], rootpath: Path, basetemp: Path | None = None
+    ) -> None:
+        """Compile the enabled rules into a single pattern.
+
+        Args:
+            rules: Enabled rule names, from NORMALIZE_RULES
+            rootpath: Project root, dropped from absolute paths
+            basetemp: Custom ``--basetemp`` directory, if any
+        """
+        # (group name, (first characters, rest), replacement), most specific first
+        alternatives = []
+        if "ansi" in rules:
+            alternatives.append(("ansi", _ANSI, ""))
+        if "tmp" in rules:
+            if basetemp:
+                base = _literal_path(basetemp.resolve())
+                alternatives.append(("basetemp", base, "<tmp>"))
+            alternatives.append(("tmp", _PYTEST_TMP, "<tmp>"))
+        if "paths" in rules:
+            stdlib = Path(sysconfig.get_paths()["stdlib"])
+            alternatives.extend(
+                [
+                    ("site", _SITE_PACKAGES, "<site-packages>/"),
+                    ("root", _literal_path(rootpath.resolve(), os.sep), ""),
+                    ("stdlib", _literal_path(stdlib, os.sep), "<stdlib>/"),
+                ]
+            )
+        if "addresses" in rules:
+            alternatives.append(("address", _ADDRESS, "0x…"))
+        self._replacements = {name: repl for name, _, repl in alternatives}
+        self._pattern = None
+        if alternatives:
+            # The first character is consumed up front, each branch checks it
+            firsts = "".join(dict.fromkeys(first for _, (first, _), _ in alternatives))
+            branches = "|".join(
+                f"(?P<{name}>(?<=[{first}]){rest})"
+                for name, (first, rest), _ in alternatives
+            )
+            self._pattern = re.compile(f"[{firsts}](?:{branches})")
+
+    def normalize(self, text: str) -> str:
+        """Normalize text in a single pass."""
+        if self._pattern is None:
+            return text
+        return self._pattern.sub(self._replace, text)
+
+    def _replace(self, match: re.Match[str]) -> str:
+        """Return the replacement of whichever rule matched."""
+        return self._replacements[match.lastgroup]
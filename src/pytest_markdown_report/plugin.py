@@ -2,13 +2,57 @@
 
 import io
 import re
+import sqlite3
 import sys
+import threading
+import time
+from collections import Counter
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import pytest
 from _pytest.config import Config
 from _pytest.reports import TestReport
 
+from pytest_markdown_report import hooks
+from pytest_markdown_report.benchmarks import BenchmarkTable
+from pytest_markdown_report.collection import (
+    CATEGORIES,
+    MergedView,
+    ReportShard,
+    ShardSet,
+)
+from pytest_markdown_report.emergency import EmergencyFlush
+from pytest_markdown_report.fixture_costs import FixtureCostTracker
+from pytest_markdown_report.history import record_session
+from pytest_markdown_report.idle import IdleTimeTracker
+from pytest_markdown_report.impact import AFFECTED_RERUN_CMD, ImpactRecorder
+from pytest_markdown_report.junit import JUnitXMLWriter
+from pytest_markdown_report.memory import MEMORY_SOURCES, MemoryTracker
+from pytest_markdown_report.normalize import (
+    NORMALIZE_RULES,
+    TracebackNormalizer,
+    parse_rules,
+)
+from pytest_markdown_report.profiling import SlowTestProfiler
+from pytest_markdown_report.query import QueryServer
+from pytest_markdown_report.rerun import FailureRerunner
+from pytest_markdown_report.rollup import RollupTree
+from pytest_markdown_report.saturation import FailureSaturation
+from pytest_markdown_report.sections import layout_sections
+from pytest_markdown_report.sharding import ShardSelector, parse_shard, save_durations
+from pytest_markdown_report.shared_report import summary_parts, write_shared_report
+from pytest_markdown_report.slow_collection import CollectionTimer
+from pytest_markdown_report.soak import SoakRotation
+from pytest_markdown_report.subtests import SubtestRecord, is_subtest_report
+
+if TYPE_CHECKING:
+    import pluggy
+
+DEFAULT_RERUN_CMD = "pytest --lf"
+# Length of the metadata line of a test block
+METADATA_MAX_CHARS = 200
+
 
 def escape_markdown(text: str) -> str:
     """Escape markdown special characters in user-provided text.
@@ -45,22 +89,265 @@ def pytest_addoption(parser: object) -> None:
         default=None,
         help="Also save markdown test report to specified file",
     )
+    group.addoption(
+        "--markdown-report-shared",
+        action="store",
+        dest="markdown_report_shared",
+        metavar="LABEL",
+        default=None,
+        help="Share the --markdown-report file with other pytest processes: add "
+        "or replace this process's section under LABEL",
+    )
     group.addoption(
         "--markdown-rerun-cmd",
         action="store",
         dest="markdown_rerun_cmd",
         metavar="cmd",
-        default="pytest --lf",
+        default=DEFAULT_RERUN_CMD,
         help="Command to suggest for rerunning failed tests (empty to disable)",
     )
+    group.addoption(
+        "--markdown-live",
+        action="store_true",
+        dest="markdown_live",
+        default=False,
+        help="Stream each failure to the terminal as soon as its test finishes",
+    )
+    group.addoption(
+        "--markdown-stop-after-distinct",
+        action="store",
+        type=int,
+        dest="markdown_stop_after_distinct",
+        metavar="N",
+        default=0,
+        help="Stop the session once N distinct failure causes were seen",
+    )
+    group.addoption(
+        "--markdown-stop-after-repeats",
+        action="store",
+        type=int,
+        dest="markdown_stop_after_repeats",
+        metavar="M",
+        default=0,
+        help="Stop the session after M consecutive failures with no new cause",
+    )
+    group.addoption(
+        "--markdown-query-socket",
+        action="store",
+        dest="markdown_query_socket",
+        metavar="address",
+        default=None,
+        help="Answer report queries during the run on a Unix socket path or HOST:PORT",
+    )
+    group.addoption(
+        "--markdown-record-impact",
+        action="store_true",
+        dest="markdown_record_impact",
+        default=False,
+        help="Record the project files each test executes in the pytest cache",
+    )
+    group.addoption(
+        "--markdown-affected",
+        action="store_true",
+        dest="markdown_affected",
+        default=False,
+        help="Only run tests that are new, failed last time, or depend on a "
+        "file changed since recording (implies --markdown-record-impact)",
+    )
+    group.addoption(
+        "--markdown-profile-slow",
+        action="store",
+        type=float,
+        dest="markdown_profile_slow",
+        metavar="seconds",
+        default=None,
+        help="Sample tests and show the hottest functions of tests slower than this",
+    )
+    group.addoption(
+        "--markdown-memory",
+        action="store",
+        type=int,
+        dest="markdown_memory",
+        metavar="N",
+        default=0,
+        help="Trace allocations and list the N tests with the highest memory "
+        "peak and retention",
+    )
+    group.addoption(
+        "--markdown-memory-source",
+        action="store",
+        dest="markdown_memory_source",
+        choices=MEMORY_SOURCES,
+        default="tracemalloc",
+        help="Measure Python allocations (tracemalloc, exact but slow) or "
+        "resident set size (rss, cheap)",
+    )
+    group.addoption(
+        "--markdown-idle-time",
+        action="store",
+        type=int,
+        dest="markdown_idle_time",
+        metavar="N",
+        default=0,
+        help="List the N tests spending the most time waiting rather than "
+        "computing (wall-clock minus CPU time)",
+    )
+    group.addoption(
+        "--markdown-fixture-costs",
+        action="store",
+        type=int,
+        dest="markdown_fixture_costs",
+        metavar="N",
+        default=0,
+        help="Time fixture setup and teardown and list the N costliest fixtures",
+    )
+    group.addoption(
+        "--markdown-rollup",
+        action="store",
+        type=int,
+        dest="markdown_rollup",
+        metavar="DEPTH",
+        default=0,
+        help="Add per-directory/module outcome counts, expanding subtrees "
+        "with failures up to DEPTH levels",
+    )
+    group.addoption(
+        "--markdown-junitxml",
+        action="store",
+        dest="markdown_junitxml",
+        metavar="path",
+        default=None,
+        help="Also stream a JUnit XML report with the markdown categorization "
+        "to the specified file",
+    )
+    group.addoption(
+        "--markdown-normalize",
+        action="store",
+        type=parse_rules,
+        dest="markdown_normalize",
+        metavar="RULES",
+        default=NORMALIZE_RULES,
+        help="Traceback noise to rewrite: comma-separated ansi, paths, tmp, "
+        "addresses, or all (default) or none",
+    )
+    group.addoption(
+        "--markdown-slow-collection",
+        action="store",
+        type=int,
+        dest="markdown_slow_collection",
+        metavar="N",
+        default=0,
+        help="Time collection and list the N slowest modules, directories and "
+        "conftests",
+    )
+    group.addoption(
+        "--markdown-auto-rerun",
+        action="store",
+        type=int,
+        dest="markdown_auto_rerun",
+        metavar="N",
+        default=0,
+        help="Rerun failures up to N times at the end of the session and report "
+        "the ones that pass as flaky",
+    )
+    group.addoption(
+        "--markdown-history",
+        action="store",
+        dest="markdown_history",
+        metavar="path",
+        default=None,
+        help="Append outcomes and durations to a SQLite history database at "
+        "session end (query with pytest-markdown-history)",
+    )
+    group.addoption(
+        "--markdown-shard",
+        action="store",
+        type=parse_shard,
+        dest="markdown_shard",
+        metavar="i/n",
+        default=None,
+        help="Run shard i of n, balanced on the test durations recorded in the "
+        "pytest cache",
+    )
+    group.addoption(
+        "--markdown-crash-budget",
+        action="store",
+        type=float,
+        dest="markdown_crash_budget",
+        metavar="SECONDS",
+        default=2.0,
+        help="Time allowed to write a partial report when pytest is terminated "
+        "(default: 2.0, 0 disables)",
+    )
+    group.addoption(
+        "--markdown-benchmark-threshold",
+        action="store",
+        type=float,
+        dest="markdown_benchmark_threshold",
+        metavar="PCT",
+        default=10.0,
+        help="With pytest-benchmark, report benchmarks whose mean grew more than "
+        "PCT percent over the --benchmark-compare baseline as failures "
+        "(default: 10)",
+    )
+    group.addoption(
+        "--markdown-soak-tests",
+        action="store",
+        type=int,
+        dest="markdown_soak_tests",
+        metavar="N",
+        default=0,
+        help="Soak mode: rotate the report file every N tests, keeping only "
+        "counts and the first occurrence of each failure cause",
+    )
+    group.addoption(
+        "--markdown-soak-minutes",
+        action="store",
+        type=float,
+        dest="markdown_soak_minutes",
+        metavar="T",
+        default=0,
+        help="Soak mode: rotate the report file every T minutes (checked as "
+        "tests finish)",
+    )
+    group.addoption(
+        "--markdown-soak-keep",
+        action="store",
+        type=int,
+        dest="markdown_soak_keep",
+        metavar="K",
+        default=10,
+        help="Rotated report files to keep, 0 for all (default: 10)",
+    )
+    group.addoption(
+        "--markdown-section-limit",
+        action="store",
+        type=int,
+        dest="markdown_section_limit",
+        metavar="BYTES",
+        default=8192,
+        help="Size limit of the sections added by other plugins (default: 8192)",
+    )
+
+
+def pytest_addhooks(pluginmanager: pytest.PytestPluginManager) -> None:
+    """Declare the hooks other plugins implement to contribute sections."""
+    pluginmanager.add_hookspecs(hooks)
 
 
 def pytest_configure(config: Config) -> None:
     """Register the plugin."""
+    soak = config.getoption("markdown_soak_tests") or config.getoption(
+        "markdown_soak_minutes"
+    )
+    if soak and not config.getoption("markdown_report_path"):
+        msg = "--markdown-soak-tests/--markdown-soak-minutes need --markdown-report"
+        raise pytest.UsageError(msg)
     # Always register markdown reporter
     # Pytest-recommended pattern for storing plugin state on config object
     config._markdown_report = MarkdownReport(config)  # noqa: SLF001
     config.pluginmanager.register(config._markdown_report)  # noqa: SLF001
+    _register_feature_plugins(config, config._markdown_report)  # noqa: SLF001
 
     # Don't suppress output for special pytest modes (--help, --version)
     if not (config.option.help or config.option.version):
@@ -68,24 +355,100 @@ def pytest_configure(config: Config) -> None:
         config._markdown_report._redirect_output()  # noqa: SLF001
 
 
+def _register_feature_plugins(
+    config: Config, markdown_report: "MarkdownReport"
+) -> None:
+    """Register the opt-in helper plugins, unregistered with the report."""
+    plugins = markdown_report.feature_plugins
+    affected = config.getoption("markdown_affected")
+    if affected or config.getoption("markdown_record_impact"):
+        plugins.append(ImpactRecorder(config, select_affected=affected))
+    measurements = _measurement_plugins(config)
+    plugins.extend(measurements)
+    reruns = config.getoption("markdown_auto_rerun")
+    if reruns:
+        plugins.append(FailureRerunner(markdown_report, reruns, measurements))
+    if config.pluginmanager.hasplugin("benchmark"):
+        threshold = config.getoption("markdown_benchmark_threshold")
+        plugins.append(BenchmarkTable(markdown_report, threshold))
+    shard = config.getoption("markdown_shard")
+    if shard:
+        plugins.append(ShardSelector(markdown_report, *shard))
+    plugins.extend(_soak_plugins(config, markdown_report))
+    for plugin in plugins:
+        config.pluginmanager.register(plugin)
+
+
+def _measurement_plugins(config: Config) -> list[object]:
+    """Create the plugins measuring where time and memory go."""
+    plugins: list[object] = []
+    profile_threshold = config.getoption("markdown_profile_slow")
+    if profile_threshold is not None:
+        plugins.append(SlowTestProfiler(profile_threshold, config.rootpath))
+    memory_top = config.getoption("markdown_memory")
+    if memory_top:
+        source = config.getoption("markdown_memory_source")
+        plugins.append(MemoryTracker(memory_top, source))
+    fixture_top = config.getoption("markdown_fixture_costs")
+    if fixture_top:
+        plugins.append(FixtureCostTracker(fixture_top, config.rootpath))
+    collection_top = config.getoption("markdown_slow_collection")
+    if collection_top:
+        plugins.append(CollectionTimer(collection_top, config.rootpath))
+    idle_top = config.getoption("markdown_idle_time")
+    if idle_top:
+        plugins.append(IdleTimeTracker(idle_top))
+    return plugins
+
+
+def _soak_plugins(
+    config: Config, markdown_report: "MarkdownReport"
+) -> list[SoakRotation]:
+    """Create the soak mode plugin, if a rotation period is set."""
+    every_tests = config.getoption("markdown_soak_tests")
+    every_minutes = config.getoption("markdown_soak_minutes")
+    if not (every_tests or every_minutes):
+        return []
+    keep = config.getoption("markdown_soak_keep")
+    path = markdown_report.markdown_path
+    return [SoakRotation(markdown_report, path, every_tests, every_minutes, keep)]
+
+
 def pytest_unconfigure(config: Config) -> None:
     """Unregister the plugin."""
     markdown_report = getattr(config, "_markdown_report", None)
     if markdown_report:
         # Restore output before cleaning up (handles crashes/interrupts)
         markdown_report._restore_output()  # noqa: SLF001
+        markdown_report.stop_emergency_flush()
+        markdown_report.stop_query_server()
+        markdown_report.close_junit_xml()
 
         # Close buffer after all hooks complete
         markdown_report._close_buffer()  # noqa: SLF001
 
         # Clean up plugin state stored on config object
         del config._markdown_report  # noqa: SLF001
+        for plugin in markdown_report.feature_plugins:
+            config.pluginmanager.unregister(plugin)
         config.pluginmanager.unregister(markdown_report)
 
 
 class MarkdownReport:
     """Generate token-efficient markdown test reports."""
 
+    # Collected per thread, see collection.py
+    errors = MergedView()
+    failed = MergedView()
+    xfailed = MergedView()
+    xpassed = MergedView()
+    skipped = MergedView()
+    passed = MergedView()
+    passed_with_output = MergedView()
+    warnings = MergedView()
+    pending = MergedView()
+    durations = MergedView()
+
     def __init__(self, config: Config) -> None:
         """Initialize markdown report generator.
 
@@ -95,7 +458,44 @@ class MarkdownReport:
         self.config = config
         markdown_path = config.getoption("markdown_report_path")
         self.markdown_path = Path(markdown_path) if markdown_path else None
+        self.shared_label = config.getoption("markdown_report_shared")
         self.rerun_cmd = config.getoption("markdown_rerun_cmd")
+        if self.rerun_cmd == DEFAULT_RERUN_CMD and (
+            config.getoption("markdown_record_impact")
+            or config.getoption("markdown_affected")
+        ):
+            # The dependency map also reselects last failures
+            self.rerun_cmd = AFFECTED_RERUN_CMD
+        self.live = bool(config.getoption("markdown_live"))
+        max_distinct = config.getoption("markdown_stop_after_distinct")
+        max_repeats = config.getoption("markdown_stop_after_repeats")
+        self.saturation = (
+            FailureSaturation(max_distinct, max_repeats)
+            if max_distinct or max_repeats
+            else None
+        )
+        self.stop_reason: str | None = None
+        # Set when the session ends early on an interrupt or a signal
+        self.interrupted: str | None = None
+        # Nodeid and start time of the tests being run, per thread
+        self.running: dict[int, tuple[str, float]] = {}
+        self.emergency: EmergencyFlush | None = None
+        # Hooks of other plugins, set once the session starts
+        self.hook: pluggy.HookRelay | None = None
+        self.session: pytest.Session | None = None
+        self.query_address = config.getoption("markdown_query_socket")
+        self.query_server: QueryServer | None = None
+        rollup_depth = config.getoption("markdown_rollup")
+        self.rollup = RollupTree(rollup_depth) if rollup_depth else None
+        junit_path = config.getoption("markdown_junitxml")
+        self.junit_path = Path(junit_path) if junit_path else None
+        self.junit: JUnitXMLWriter | None = None
+        self.normalizer: TracebackNormalizer | None = None
+        history_path = config.getoption("markdown_history")
+        self.history_path = Path(history_path) if history_path else None
+        self.started = time.time()
+        # Opt-in helper plugins registered alongside the report
+        self.feature_plugins: list[object] = []
         self.verbosity = config.option.verbose
         self.quiet = config.option.verbose < 0
 
@@ -103,18 +503,29 @@ class MarkdownReport:
         # The -r flag is stored in the reportchars option
         self.report_flags = getattr(config.option, "reportchars", "")
 
-        self.reports = []
-        self.passed = []
-        self.failed = []
-        self.errors = []
-        self.skipped = []
-        self.xfailed = []
-        self.xpassed = []
-        self.passed_with_output: list[tuple[TestReport, str, str]] = []
-        self.warnings: list[
-            tuple[str, str, str]
-        ] = []  # (warning_message, nodeid, location)
+        # Category lists, pending reports (finalized when teardown is logged),
+        # passed tests with output and warnings, appended per thread
+        self.shards = ShardSet()
+        # Subtest aggregates of failing tests, kept past finalization
+        self.subtests: dict[str, SubtestRecord] = {}
         self.collection_errors = []
+        # Nodeids of all collected tests, deselected ones included
+        self.collected: list[str] = []
+        # Nodeids of the deselected tests
+        self.deselected: list[str] = []
+        # Failures that passed on rerun number N (--markdown-auto-rerun)
+        self.flaky: dict[str, int] = {}
+        # Reports logged while a failure is rerun, None outside reruns
+        self.rerun_reports: list[TestReport] | None = None
+        # Failure blocks of benchmarks slower than their baseline
+        self.regressions: list[list[str]] = []
+        # Nodeids whose failure block was already streamed (--markdown-live)
+        self.live_emitted: set[str] = set()
+        # Tests rotated out of the category lists (soak mode), per category
+        self.retired: Counter[str] = Counter()
+        # Guards the shared opt-in sinks (saturation, roll-up, JUnit XML, live
+        # output); collection itself is lock-free
+        self.lock = threading.Lock()
 
         # For output redirection
         self._original_stdout = None
@@ -168,10 +579,85 @@ class MarkdownReport:
             self._capture_buffer.close()
             self._capture_buffer = None
 
+    def pytest_sessionstart(self, session: pytest.Session) -> None:
+        """Keep the session to request an early stop, start optional services."""
+        self.session = session
+        self.hook = self.config.hook
+        self.started = time.time()
+        rules = self.config.getoption("markdown_normalize")
+        if rules:
+            basetemp = self.config.option.basetemp
+            self.normalizer = TracebackNormalizer(
+                rules, self.config.rootpath, Path(basetemp) if basetemp else None
+            )
+        if self.query_address:
+            self.query_server = QueryServer(self, self.query_address)
+            try:
+                self.query_server.start()
+            except (OSError, ValueError) as e:
+                self.query_server = None
+                # Output is redirected until the session ends
+                (self._original_stderr or sys.stderr).write(
+                    f"\nWarning: Could not serve queries on {self.query_address}: {e}\n"
+                )
+        if self.junit_path:
+            self.junit = JUnitXMLWriter(
+                self.junit_path,
+                hold_failures=bool(self.config.getoption("markdown_auto_rerun")),
+            )
+            try:
+                self.junit.open()
+            except OSError as e:
+                self.junit = None
+                (self._original_stderr or sys.stderr).write(
+                    f"\nWarning: Could not write to {self.junit_path}: {e}\n"
+                )
+        budget = self.config.getoption("markdown_crash_budget")
+        if budget > 0:
+            self.emergency = EmergencyFlush(self, self.config, budget)
+            self.emergency.install()
+
+    def stop_emergency_flush(self) -> None:
+        """Uninstall the crash path, the session ended normally (idempotent)."""
+        if self.emergency:
+            self.emergency.uninstall()
+            self.emergency = None
+
+    def stop_query_server(self) -> None:
+        """Stop answering queries (idempotent)."""
+        if self.query_server:
+            self.query_server.stop()
+            self.query_server = None
+
+    def close_junit_xml(self) -> None:
+        """Finish the JUnit XML report (idempotent)."""
+        if self.junit:
+            self.junit.close(self.flaky)
+            self.junit = None
+
+    def snapshot(self) -> dict[str, list[TestReport]]:
+        """Copy the category lists.
+
+        Safe to call from another thread while tests run; a test finishing
+        meanwhile may or may not be included.
+        """
+        return {category: list(getattr(self, category)) for category in CATEGORIES}
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_collection_modifyitems(self, items: list[pytest.Item]) -> None:
+        """Note the collected tests, before any deselection."""
+        self.collected = [item.nodeid for item in items]
+
+    def pytest_deselected(self, items: list[pytest.Item]) -> None:
+        """Note the deselected tests, their files were not run whole."""
+        self.deselected.extend(item.nodeid for item in items)
+
     def pytest_collectreport(self, report: TestReport) -> None:
         """Capture collection errors."""
         if report.failed:
             self.collection_errors.append(report)
+            if self.junit:
+                self.junit.write_collection_error(report)
 
     def pytest_warning_recorded(
         self,
@@ -188,49 +674,220 @@ class MarkdownReport:
             msg = str(warning_message.message)
         else:
             msg = str(warning_message)
-        self.warnings.append((msg, nodeid, loc))
+        self.shards.current().warnings.append((msg, nodeid, loc))
+
+    def pytest_runtest_logstart(self, nodeid: str) -> None:
+        """Note the test the current thread runs, for interrupted sessions."""
+        self.running[threading.get_ident()] = (nodeid, time.monotonic())
+
+    def pytest_runtest_logfinish(self) -> None:
+        """Forget the test the current thread ran."""
+        self.running.pop(threading.get_ident(), None)
+
+    def pytest_keyboard_interrupt(self) -> None:
+        """Name the tests the interrupt stopped."""
+        running = [nodeid for nodeid, _ in list(self.running.values())]
+        self.interrupted = "KeyboardInterrupt" + (
+            f" during {', '.join(running)}" if running else ""
+        )
 
     def pytest_runtest_logreport(self, report: TestReport) -> None:
         """Collect test reports."""
+        if self.rerun_reports is not None:
+            # Subtests log their reports even when the rerun does not
+            self.rerun_reports.append(report)
+            return
+        # All phases of a test are logged from the thread running it
+        shard = self.shards.current()
+        if is_subtest_report(report):
+            # Extra call reports with the parent's nodeid: fold into counts
+            shard.subtests.setdefault(report.nodeid, SubtestRecord()).add(report)
+            if report.failed and self.saturation and not self.stop_reason:
+                self._check_saturation(report)
+            return
+        shard.durations[report.nodeid] = (
+            shard.durations.get(report.nodeid, 0.0) + report.duration
+        )
+        if self.junit:
+            with self.lock:
+                self.junit.add_duration(report)
+
         # Capture call phase (actual test execution)
         # Also capture all non-passing outcomes from any phase (setup/teardown)
         if report.when == "call" or report.outcome in ("skipped", "failed", "error"):
-            self.reports.append(report)
+            shard.pending.setdefault(report.nodeid, []).append(report)
 
         # Track passed tests with captured output for -rP flag
         if report.when == "call" and report.passed:
             capstdout = getattr(report, "capstdout", "")
             capstderr = getattr(report, "capstderr", "")
             if capstdout or capstderr:
-                self.passed_with_output.append((report, capstdout, capstderr))
+                shard.passed_with_output.append((report, capstdout, capstderr))
+
+        if report.failed and self.saturation and not self.stop_reason:
+            self._check_saturation(report)
+
+        # Teardown is the last phase: the test's worst outcome is now known
+        if report.when == "teardown":
+            self.finalize_test(report.nodeid, shard)
+
+    def _check_saturation(self, report: TestReport) -> None:
+        """Stop the session once failures stop bringing new causes."""
+        with self.lock:
+            self.stop_reason = self.saturation.add(report)
+        if self.stop_reason and self.session:
+            # Same mechanism as -x/--maxfail: stops after the current test
+            self.session.shouldstop = f"markdown-report: {self.stop_reason}"
 
     def pytest_sessionfinish(
         self,
         session: object,  # noqa: ARG002 - Required by pytest hook spec
     ) -> None:
         """Generate markdown report at session end."""
+        self.stop_emergency_flush()
         self._restore_output()
         self._categorize_reports()
+        self.shards.freeze()
         lines = self._build_report_lines()
-        self._write_report(lines)
+        console_lines = lines
+        if self.live_emitted:
+            # Streamed blocks are omitted from the console, the file stays whole
+            console_lines = self._build_report_lines(hidden=self.live_emitted)
+        self._write_report(console_lines, file_lines=lines)
+        self.stop_query_server()
+        self.close_junit_xml()
+        save_durations(self.config, self.durations, self.collected, self.deselected)
+        if self.history_path:
+            self._record_history()
+
+    def write_partial_report(self, reason: str, deadline: float) -> None:
+        """Write the report of a session that will not finish.
+
+        Built from the state collected so far: the summary, the tests still
+        running and as many failure blocks as the deadline allows.
+
+        Args:
+            reason: Why the session ends, shown in the report
+            deadline: ``time.monotonic()`` value to stop rendering blocks at
+        """
+        self._restore_output()
+        now = time.monotonic()
+        self.interrupted = reason
+        running = [
+            f"- {nodeid} (running for {now - start:.1f}s)"
+            for nodeid, start in list(self.running.values())
+        ]
+        if self.quiet:
+            lines = [*self._generate_quiet(), ""]
+        else:
+            lines = self._generate_summary()
+            lines[0] = "# Test Report (partial)"
+        if running:
+            lines.extend(["**Running:**", "", *running, ""])
+        if not self.quiet:
+            blocks = []
+            omitted = 0
+            for category in ("errors", "failed", "xpassed"):
+                for report in list(getattr(self, category)):
+                    if time.monotonic() < deadline:
+                        blocks.extend(self.format_block(report, category))
+                    else:
+                        omitted += 1
+            if blocks or omitted:
+                lines.extend(["## Failures", "", *blocks])
+            if omitted:
+                lines.extend([f"{omitted} more not shown (out of time)", ""])
+        # Another process holding the shared report's lock must not make the
+        # flush outlast its budget
+        self._write_report(lines, blocking=False)
+        sys.stdout.flush()
+
+    def _record_history(self) -> None:
+        """Append this session's outcomes and durations to the history."""
+        durations = self.durations
+        results = (
+            (report.nodeid, category, durations.get(report.nodeid, report.duration))
+            for category in CATEGORIES
+            for report in getattr(self, category)
+        )
+        try:
+            record_session(self.history_path, self.started, results)
+        except (OSError, sqlite3.Error) as e:
+            # History is a side channel, the report was already written
+            sys.stderr.write(
+                f"\nWarning: Could not record history in {self.history_path}: {e}\n"
+            )
 
     def _categorize_reports(self) -> None:
-        """Categorize test reports by outcome."""
-        reports_by_nodeid = self._group_reports_by_nodeid()
-
-        for reports_for_test in reports_by_nodeid.values():
-            worst_report = self._find_worst_report(reports_for_test)
-            self._categorize_single_report(worst_report)
-
-    def _group_reports_by_nodeid(self) -> dict[str, list[TestReport]]:
-        """Group reports by nodeid to handle multiple phases."""
-        reports_by_nodeid: dict[str, list[TestReport]] = {}
-        for report in self.reports:
-            nodeid = report.nodeid
-            if nodeid not in reports_by_nodeid:
-                reports_by_nodeid[nodeid] = []
-            reports_by_nodeid[nodeid].append(report)
-        return reports_by_nodeid
+        """Categorize reports of tests that never logged a teardown phase."""
+        for shard in self.shards:
+            for nodeid in list(shard.pending):
+                self.finalize_test(nodeid, shard)
+
+    def finalize_test(self, nodeid: str, shard: ReportShard) -> None:
+        """Categorize a finished test by its worst phase outcome."""
+        reports = shard.pending.pop(nodeid, None)
+        record = shard.subtests.pop(nodeid, None)
+        if record and record.failed:
+            self.subtests[nodeid] = record
+        if not reports:
+            return
+        worst_report = self._find_worst_report(reports)
+        if record and record.failed and worst_report.when == "call":
+            worst_report = self._merge_subtests(worst_report, record)
+        category = self._categorize_single_report(worst_report, shard)
+        # Output is restored at session end, anything left goes in the report
+        if self.live and self._original_stdout:
+            self._emit_live(worst_report, category)
+
+    @staticmethod
+    def _merge_subtests(report: TestReport, record: SubtestRecord) -> TestReport:
+        """Pick the report to show for a test whose subtests failed.
+
+        The parent call report either passed (pytest-subtests) or only states
+        how many subtests failed (pytest >= 9), so the first failing subtest
+        provides the traceback. A parent failing on its own is kept.
+        """
+        if report.passed or isinstance(report.longrepr, str):
+            return record.first_failure
+        return report
+
+    def _emit_live(self, report: TestReport, category: str | None) -> None:
+        """Write a failure block to the real terminal while tests still run."""
+        lines = self._format_live(report, category)
+        if not lines:
+            return
+        with self.lock:
+            self._original_stdout.write("\n".join(lines) + "\n")
+            self._original_stdout.flush()
+        self.live_emitted.add(report.nodeid)
+
+    def _format_live(self, report: TestReport, category: str | None) -> list[str]:
+        """Format the block the final report would show for a finished test.
+
+        Returns an empty list when the report's section is hidden by the
+        verbosity or -r flags.
+        """
+        if self.quiet or category not in ("errors", "failed", "xpassed", "xfailed"):
+            return []
+        flag = {"errors": "E", "failed": "f", "xpassed": "f", "xfailed": "x"}[category]
+        if self.verbosity > 0 or self._should_show_section(flag):
+            return self.format_block(report, category)
+        return []
+
+    def format_block(self, report: TestReport, category: str | None) -> list[str]:
+        """Format one test as in its report section, whatever the flags."""
+        if category == "errors":
+            return self._format_failure(report, symbol="ERROR")
+        if category == "failed":
+            return self._format_failure(report)
+        if category == "xpassed":
+            return self._format_xpass(report)
+        if category == "xfailed":
+            return self._format_xfail(report)
+        if category == "skipped":
+            return self._format_skip(report)
+        return [f"### {report.nodeid} PASSED", ""]
 
     def _find_worst_report(self, reports: list[TestReport]) -> TestReport:
         """Find the report with the worst outcome from a list.
@@ -246,26 +903,45 @@ class MarkdownReport:
                 worst_report = report
         return worst_report
 
-    def _categorize_single_report(self, report: TestReport) -> None:
-        """Categorize a single report by outcome."""
+    def _categorize_single_report(
+        self, report: TestReport, shard: ReportShard
+    ) -> str | None:
+        """Categorize a single report by outcome.
+
+        Args:
+            report: Worst report of a finished test
+            shard: Buffers of the thread that ran the test
+
+        Returns:
+            Name of the category list the report was added to, if any
+        """
+        category = self._category(report)
+        if category:
+            getattr(shard, category).append(report)
+        if self.rollup or self.junit:
+            with self.lock:
+                if self.rollup and category:
+                    self.rollup.add(report.nodeid, category)
+                if self.junit:
+                    self.junit.write_testcase(report, category)
+        return category
+
+    @staticmethod
+    def _category(report: TestReport) -> str | None:
+        """Name the category list a report belongs to."""
         # Check wasxfail first, as xfail tests also have skipped=True
         if hasattr(report, "wasxfail"):
-            if report.outcome == "passed":
-                self.xpassed.append(report)
-            else:
-                self.xfailed.append(report)
-        elif report.skipped:
-            self.skipped.append(report)
-        elif report.passed:
-            self.passed.append(report)
-        elif report.failed:
+            return "xpassed" if report.outcome == "passed" else "xfailed"
+        if report.skipped:
+            return "skipped"
+        if report.passed:
+            return "passed"
+        if report.failed:
             # Separate call-phase failures from setup/teardown errors
-            if report.when == "call":
-                self.failed.append(report)
-            else:
-                self.errors.append(report)
+            return "failed" if report.when == "call" else "errors"
+        return None
 
-    def _build_report_lines(self) -> list[str]:
+    def _build_report_lines(self, hidden: set[str] | None = None) -> list[str]:
         """Build report lines based on test results and verbosity mode.
 
         In default mode, respects -r flag for what to show:
@@ -273,7 +949,12 @@ class MarkdownReport:
         - 'x' in flags: show xfailed section
         - Verbose mode (-v) always shows all sections
         - Quiet mode (-q) shows minimal output
+
+        Args:
+            hidden: Nodeids to leave out of the failures and errors sections
         """
+        # Flaky failures are listed in their own compact section
+        hidden = (hidden or set()) | self.flaky.keys()
         # Collection errors take priority
         if self.collection_errors:
             return self._generate_collection_errors()
@@ -281,22 +962,59 @@ class MarkdownReport:
             return self._generate_quiet()
 
         lines = self._generate_summary()
+        if self.rollup:
+            lines.extend(self.rollup.generate_section())
         if self.verbosity > 0:
-            lines.extend(self._build_verbose_sections())
+            lines.extend(self._build_verbose_sections(hidden))
         else:
-            lines.extend(self._build_default_sections())
+            lines.extend(self._build_default_sections(hidden))
+        lines.extend(self._build_feature_sections())
+        lines.extend(self._build_plugin_sections())
         return lines
 
-    def _build_verbose_sections(self) -> list[str]:
+    def _build_feature_sections(self) -> list[str]:
+        """Build the sections of the opt-in helper plugins, in option order."""
+        lines = []
+        for plugin in self.feature_plugins:
+            generate_section = getattr(plugin, "generate_section", None)
+            if generate_section:
+                lines.extend(generate_section())
+        return lines
+
+    def _build_plugin_sections(self) -> list[str]:
+        """Build the sections other plugins declared, within the size limit."""
+        if self.hook is None:
+            return []
+        declared = self.hook.pytest_markdown_report_sections(config=self.config)
+        sections = [section for result in declared for section in result or ()]
+        if not sections:
+            return []
+        limit = self.config.getoption("markdown_section_limit")
+        return layout_sections(sections, limit)
+
+    def _metadata_lines(self, report: TestReport) -> list[str]:
+        """Format the metadata other plugins give for a test, on one line."""
+        if self.hook is None:
+            return []
+        results = self.hook.pytest_markdown_report_test_metadata(report=report)
+        pairs = [f"{k}={v}" for result in results for k, v in result.items()]
+        if not pairs:
+            return []
+        text = ", ".join(pairs)
+        if len(text) > METADATA_MAX_CHARS:
+            text = text[: METADATA_MAX_CHARS - 1] + "…"
+        return [f"**Metadata:** {escape_markdown(text)}", ""]
+
+    def _build_verbose_sections(self, hidden: set[str]) -> list[str]:
         """Build all sections for verbose mode.
 
         Verbose mode shows all sections regardless of -r flags.
         """
         lines = []
         if self.errors:
-            lines.extend(self._generate_errors())
-        if self.failed or self.xfailed or self.xpassed:
-            lines.extend(self._generate_failures())
+            lines.extend(self._generate_errors(hidden))
+        if self.failed or self.xfailed or self.xpassed or self.regressions:
+            lines.extend(self._generate_failures(hidden=hidden))
         if self.skipped:
             lines.extend(self._generate_skipped())
         lines.extend(self._generate_passes())
@@ -306,7 +1024,7 @@ class MarkdownReport:
             lines.extend(self._generate_warnings())
         return lines
 
-    def _build_default_sections(self) -> list[str]:
+    def _build_default_sections(self, hidden: set[str]) -> list[str]:
         """Build sections for default mode based on -r flags.
 
         Respects -r flags: 'E' for errors, 'f' for failures/xpassed, 's' for skipped,
@@ -318,20 +1036,22 @@ class MarkdownReport:
         show_failures = self._should_show_section("f")
 
         if self._should_show_section("E") and self.errors:
-            lines.extend(self._generate_errors())
+            lines.extend(self._generate_errors(hidden))
 
         # Show failures section if we have:
         # - Regular failures and f flag, OR
         # - XFailed tests and x flag, OR
         # - XPassed tests and f flag
         if (
-            (self.failed and show_failures)
+            ((self.failed or self.regressions) and show_failures)
             or (self.xfailed and show_xfailed)
             or (self.xpassed and show_failures)
         ):
             lines.extend(
                 self._generate_failures(
-                    show_xfailed=show_xfailed, show_failed=show_failures
+                    show_xfailed=show_xfailed,
+                    show_failed=show_failures,
+                    hidden=hidden,
                 )
             )
 
@@ -345,24 +1065,60 @@ class MarkdownReport:
             lines.extend(self._generate_warnings())
         return lines
 
-    def _write_report(self, lines: list[str]) -> None:
-        """Write report to stdout and optionally to file."""
-        # Remove trailing empty line if present
-        if lines and lines[-1] == "":
-            lines = lines[:-1]
-        report_text = "\n".join(lines) + "\n"
-        sys.stdout.write(report_text)
+    def _write_report(
+        self,
+        lines: list[str],
+        file_lines: list[str] | None = None,
+        *,
+        blocking: bool = True,
+    ) -> None:
+        """Write report to stdout and optionally to file.
+
+        Args:
+            lines: Report lines for the console
+            file_lines: Report lines for the file, if different from the console
+            blocking: Wait for other processes updating a shared report, else
+                skip the file
+        """
+        sys.stdout.write(self._join_lines(lines))
 
         # Also write to file if specified
         if self.markdown_path:
+            file_lines = lines if file_lines is None else file_lines
             try:
-                self.markdown_path.write_text(report_text)
+                if self.shared_label:
+                    counts = self._counts()
+                    counts["collection_errors"] = len(self.collection_errors)
+                    write_shared_report(
+                        self.markdown_path,
+                        self.shared_label,
+                        counts,
+                        file_lines,
+                        blocking=blocking,
+                    )
+                else:
+                    self.markdown_path.write_text(self._join_lines(file_lines))
             except OSError as e:
                 # Print error but don't crash - console output is more important
                 sys.stderr.write(
                     f"\nWarning: Could not write to {self.markdown_path}: {e}\n"
                 )
 
+    def write_report_file(self, path: Path) -> None:
+        """Write the report of the tests finished so far to a file.
+
+        Raises:
+            OSError: If the file cannot be written
+        """
+        path.write_text(self._join_lines(self._build_report_lines()))
+
+    @staticmethod
+    def _join_lines(lines: list[str]) -> str:
+        """Join report lines, dropping a trailing empty line."""
+        if lines and lines[-1] == "":
+            lines = lines[:-1]
+        return "\n".join(lines) + "\n"
+
     def _generate_collection_errors(self) -> list[str]:
         """Generate collection errors report."""
         lines = ["# Collection Errors", ""]
@@ -384,66 +1140,58 @@ class MarkdownReport:
 
             # Add error details
             if report.longreprtext:
-                lines.extend(["```python", report.longreprtext.strip(), "```", ""])
+                lines.extend(["```python", self._traceback(report), "```", ""])
 
         return lines
 
     def _generate_summary(self) -> list[str]:
         """Generate summary line."""
-        total_passed = len(self.passed)
-        total_failed = len(self.failed) + len(self.errors) + len(self.xpassed)
-        total_skipped = len(self.skipped)
-        total_xfailed = len(self.xfailed)
-        total = total_passed + total_failed + total_skipped + total_xfailed
-
-        # Build summary parts
-        parts = [f"{total_passed}/{total} passed"]
-        # Count errors + failures + xpassed as "failed" for summary (backward compat)
-        if len(self.failed) + len(self.errors) + len(self.xpassed) > 0:
-            parts.append(
-                f"{len(self.failed) + len(self.errors) + len(self.xpassed)} failed"
-            )
-        if total_skipped > 0:
-            parts.append(f"{total_skipped} skipped")
-        if total_xfailed > 0:
-            parts.append(f"{total_xfailed} xfail")
-
-        return [
+        lines = [
             "# Test Report",
             "",
-            f"**Summary:** {', '.join(parts)}",
+            f"**Summary:** {', '.join(self._summary_parts())}",
             "",
         ]
+        if self.stop_reason:
+            lines.extend([f"**Stopped:** after {self.stop_reason}", ""])
+        if self.interrupted:
+            lines.extend([f"**Interrupted:** {self.interrupted}", ""])
+        return lines
 
     def _generate_quiet(self) -> list[str]:
         """Generate quiet mode output."""
-        total_passed = len(self.passed)
-        total_failed = len(self.failed) + len(self.errors) + len(self.xpassed)
-        total_skipped = len(self.skipped)
-        total_xfailed = len(self.xfailed)
-        total = total_passed + total_failed + total_skipped + total_xfailed
-
-        # Build summary parts
-        parts = [f"{total_passed}/{total} passed"]
-        # Count errors + failures + xpassed as "failed" for summary (backward compat)
-        if len(self.failed) + len(self.errors) + len(self.xpassed) > 0:
-            parts.append(
-                f"{len(self.failed) + len(self.errors) + len(self.xpassed)} failed"
-            )
-        if total_skipped > 0:
-            parts.append(f"{total_skipped} skipped")
-        if total_xfailed > 0:
-            parts.append(f"{total_xfailed} xfail")
-
-        lines = [f"**Summary:** {', '.join(parts)}"]
+        lines = [f"**Summary:** {', '.join(self._summary_parts())}"]
+        if self.stop_reason:
+            lines.extend(["", f"**Stopped:** after {self.stop_reason}"])
+        if self.interrupted:
+            lines.extend(["", f"**Interrupted:** {self.interrupted}"])
 
+        total_failed = len(self.failed) + len(self.errors) + len(self.xpassed)
         if self.rerun_cmd and total_failed > 0:
             lines.extend(["", f"Re-run failed: `{self.rerun_cmd}`"])
 
         return lines
 
+    def _summary_parts(self) -> list[str]:
+        """Count outcomes for the summary line."""
+        return summary_parts(self._counts())
+
+    def _counts(self) -> dict[str, int]:
+        """Count tests per category, and flaky failures."""
+        counts = {
+            category: len(getattr(self, category)) + self.retired[category]
+            for category in CATEGORIES
+        }
+        counts["flaky"] = len(self.flaky)
+        counts["regressed"] = len(self.regressions)
+        return counts
+
     def _generate_failures(
-        self, *, show_xfailed: bool = True, show_failed: bool = True
+        self,
+        *,
+        show_xfailed: bool = True,
+        show_failed: bool = True,
+        hidden: set[str] | None = None,
     ) -> list[str]:
         """Generate failures section.
 
@@ -451,31 +1199,53 @@ class MarkdownReport:
             show_xfailed: Whether to include xfailed tests (expected failures).
             show_failed: Whether to include regular failed tests.
             Unexpected passes (xpassed) are always shown unless all are False.
+            hidden: Nodeids to leave out (already streamed by --markdown-live).
+                The section is omitted when nothing is left to show.
         """
+        hidden = hidden or set()
+        failed = [r for r in self.failed if r.nodeid not in hidden]
+        xfailed = [r for r in self.xfailed if r.nodeid not in hidden]
+        xpassed = [r for r in self.xpassed if r.nodeid not in hidden]
+        regressions = self.regressions if show_failed else []
+        if (
+            not ((failed and show_failed) or (xfailed and show_xfailed) or xpassed)
+            and not regressions
+        ):
+            return []
+
         lines = ["## Failures", ""]
 
         if show_failed:
-            for report in self.failed:
+            for report in failed:
                 lines.extend(self._format_failure(report))
+            for block in regressions:
+                lines.extend(block)
 
         if show_xfailed:
-            for report in self.xfailed:
+            for report in xfailed:
                 lines.extend(self._format_xfail(report))
 
         # Always show xpassed (unexpected passes are broken expectations)
-        for report in self.xpassed:
+        for report in xpassed:
             lines.extend(self._format_xpass(report))
 
         return lines
 
-    def _generate_errors(self) -> list[str]:
+    def _generate_errors(self, hidden: set[str] | None = None) -> list[str]:
         """Generate errors section (setup/teardown failures).
 
+        Args:
+            hidden: Nodeids to leave out (already streamed by --markdown-live)
+
         Returns:
             List of markdown lines for errors section
         """
+        hidden = hidden or set()
+        errors = [r for r in self.errors if r.nodeid not in hidden]
+        if not errors:
+            return []
         lines = ["## Errors", ""]
-        for report in self.errors:
+        for report in errors:
             lines.extend(self._format_failure(report, symbol="ERROR"))
         return lines
 
@@ -496,23 +1266,35 @@ class MarkdownReport:
             phase_suffix = f" in {report.when}"
 
         lines = [f"### {report.nodeid} {symbol}{phase_suffix}", ""]
+        lines.extend(self._metadata_lines(report))
+
+        record = self.subtests.get(report.nodeid)
+        if record:
+            lines.extend(record.format_lines())
 
         # Add traceback
         if report.longreprtext:
-            lines.extend(["```python", report.longreprtext.strip(), "```", ""])
+            lines.extend(["```python", self._traceback(report), "```", ""])
 
         return lines
 
+    def _traceback(self, report: TestReport) -> str:
+        """Get the traceback text of a report, normalized if enabled."""
+        text = report.longreprtext.strip()
+        return self.normalizer.normalize(text) if self.normalizer else text
+
     def _format_xpass(self, report: TestReport) -> list[str]:
         """Format an unexpected pass."""
         lines = [f"### {report.nodeid} XPASS"]
         lines.append("**Unexpected pass** (expected to fail)")
         lines.append("")
+        lines.extend(self._metadata_lines(report))
         return lines
 
     def _format_skip(self, report: TestReport) -> list[str]:
         """Format a skipped test."""
         lines = [f"### {report.nodeid} SKIPPED", ""]
+        lines.extend(self._metadata_lines(report))
         if hasattr(report, "longrepr") and report.longrepr:
             reason = (
                 str(report.longrepr[2])
@@ -528,6 +1310,7 @@ class MarkdownReport:
     def _format_xfail(self, report: TestReport) -> list[str]:
         """Format an expected failure."""
         lines = [f"### {report.nodeid} XFAIL", ""]
+        lines.extend(self._metadata_lines(report))
 
         # Extract xfail reason from wasxfail attribute
         if hasattr(report, "wasxfail") and report.wasxfail:
@@ -538,7 +1321,7 @@ class MarkdownReport:
                 lines.append("")
 
         if report.longreprtext:
-            lines.extend(["```python", report.longreprtext.strip(), "```", ""])
+            lines.extend(["```python", self._traceback(report), "```", ""])
 
         return lines
 
@@ -0,0 +1,157 @@
+"""Sampling profiler reporting where slow tests spend their time."""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Generator
+from pathlib import Path
+from types import CodeType, FrameType
+
+import pluggy
+import pytest
+
+# Seconds between stack samples of the thread running the test
+SAMPLE_INTERVAL = 0.005
+# Hot functions listed per slow test
+TOP_FUNCTIONS = 5
+
+# Frames of the test runner itself are on every stack and say nothing
+_RUNNER_DIRS = tuple(
+    str(Path(module.__file__).parent)
+    for module in (pytest, pluggy, sys.modules["_pytest"], sys.modules[__package__])
+)
+
+
+def _is_runner_code(code: CodeType) -> bool:
+    """Check whether code belongs to pytest, pluggy, this plugin or runpy."""
+    filename = code.co_filename
+    return filename.startswith(_RUNNER_DIRS) or "runpy" in filename
+
+
+class SlowTestProfiler:
+    """Sample the stack of running tests, keep digests of slow ones only.
+
+    One daemon thread samples the test thread every SAMPLE_INTERVAL. Only
+    samples inside project code (the test, its fixtures, what they call)
+    count: pytest's own work, such as formatting a failure, is left out with
+    the stdlib functions it calls. Each function on a sampled stack counts
+    once per sample, so its share of the samples is its share of cumulative
+    time in the test's code. Counts of tests faster than the threshold are
+    dropped as soon as the test ends.
+
+    Attributes:
+        threshold: Wall-clock seconds above which a test is profiled
+        profiles: ``(nodeid, seconds, [(function, share)])`` of slow tests
+    """
+
+    def __init__(self, threshold: float, rootpath: Path) -> None:
+        """Initialize the profiler.
+
+        Args:
+            threshold: Wall-clock seconds above which a test is profiled
+            rootpath: Directory locations are shown relative to
+        """
+        self.threshold = threshold
+        self.rootpath = rootpath
+        self._project_dir = str(rootpath) + os.sep
+        self.profiles: list[tuple[str, float, list[tuple[str, float]]]] = []
+        self._counts: Counter[CodeType] = Counter()
+        self._samples = 0
+        self._target: int | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def pytest_sessionstart(self) -> None:
+        """Start the sampling thread."""
+        self._thread = threading.Thread(
+            target=self._run, name="markdown-report-profiler", daemon=True
+        )
+        self._thread.start()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item: pytest.Item) -> Generator[None]:
+        """Sample the stack while the test runs, all phases included."""
+        self._counts = Counter()
+        self._samples = 0
+        start = time.perf_counter()
+        self._target = threading.get_ident()
+        yield
+        self._target = None
+        duration = time.perf_counter() - start
+        if duration >= self.threshold and self._samples:
+            self.profiles.append((item.nodeid, duration, self._top_functions()))
+        self._counts = Counter()
+
+    def pytest_sessionfinish(self) -> None:
+        """Stop the sampling thread."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def generate_section(self) -> list[str]:
+        """Generate the slow test profiles section."""
+        if not self.profiles:
+            return []
+        lines = ["## Slow test profiles", ""]
+        for nodeid, duration, functions in self.profiles:
+            lines.extend([f"### {nodeid} ({duration:.2f}s)", ""])
+            lines.extend(f"- {share:.0%} {function}" for function, share in functions)
+            lines.append("")
+        return lines
+
+    def _run(self) -> None:
+        """Sample the test thread until the session ends."""
+        while not self._stop.wait(SAMPLE_INTERVAL):
+            target = self._target
+            if target is None:
+                continue
+            frame = sys._current_frames().get(target)  # noqa: SLF001
+            if frame is not None:
+                self._sample(frame, self._counts)
+
+    def _sample(self, frame: FrameType | None, counts: Counter[CodeType]) -> None:
+        """Count each function on the stack once, from the project's code in."""
+        stack = []
+        while frame is not None:
+            stack.append(frame.f_code)
+            frame = frame.f_back
+        # Outermost first: frames below the project's code are the runner's
+        outer = len(stack)
+        while outer and not self._is_project_code(stack[outer - 1]):
+            outer -= 1
+        if not outer:
+            return
+        seen = set()
+        for code in stack[:outer]:
+            if code not in seen and not _is_runner_code(code):
+                seen.add(code)
+                counts[code] += 1
+        self._samples += 1
+
+    def _is_project_code(self, code: CodeType) -> bool:
+        """Check whether code belongs to the tested project, not to tools."""
+        filename = code.co_filename
+        return (
+            filename.startswith(self._project_dir)
+            and "site-packages" not in filename
+            and not _is_runner_code(code)
+        )
+
+    def _top_functions(self) -> list[tuple[str, float]]:
+        """Describe the functions found on the most samples."""
+        return [
+            (self._describe(code), count / self._samples)
+            for code, count in self._counts.most_common(TOP_FUNCTIONS)
+        ]
+
+    def _describe(self, code: CodeType) -> str:
+        """Name a function with its project-relative location."""
+        path = Path(code.co_filename)
+        try:
+            location = path.relative_to(self.rootpath).as_posix()
+        except ValueError:
+            location = path.name
+        return f"{code.co_qualname} ({location}:{code.co_firstlineno})"
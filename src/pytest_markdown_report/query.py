@@ -0,0 +1,177 @@
+"""Local query endpoint answering questions about a running session.
+
+The server runs in a daemon thread and speaks a line protocol: each request
+line gets one JSON line back.
+
+- ``counts``: number of tests per category, plus tests still running
+- ``failures``: nodeid and category of every failure, error and xpass so far
+- ``report <nodeid>``: markdown block for one finished test
+"""
+
+import contextlib
+import ipaddress
+import json
+import os
+import socketserver
+import stat
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pytest_markdown_report.plugin import MarkdownReport
+
+# Categories reported by the "failures" query, in report order
+FAILURE_CATEGORIES = ("errors", "failed", "xpassed")
+# Host of a TCP address given as ``:PORT``
+DEFAULT_HOST = "127.0.0.1"
+
+
+def loopback_host(host: str) -> str:
+    """Check that a TCP host only accepts local connections.
+
+    Args:
+        host: Host of a ``HOST:PORT`` address, empty for the default
+
+    Returns:
+        Host to bind
+
+    Raises:
+        ValueError: If the host is not a loopback name or address
+    """
+    if not host:
+        return DEFAULT_HOST
+    if host == "localhost":
+        return host
+    try:
+        if ipaddress.ip_address(host.strip("[]")).is_loopback:
+            return host.strip("[]")
+    except ValueError:
+        pass
+    msg = f"refusing non-loopback host {host!r}, test output would be exposed"
+    raise ValueError(msg)
+
+
+def remove_stale_socket(path: str) -> None:
+    """Remove the socket a previous session left at a path, if any.
+
+    Raises:
+        FileExistsError: If something other than a socket is at the path
+    """
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        msg = f"{path} exists and is not a socket"
+        raise FileExistsError(msg)
+    Path(path).unlink(missing_ok=True)
+
+
+class _QueryHandler(socketserver.StreamRequestHandler):
+    """Answer request lines until the client closes the connection."""
+
+    server: "_UnixQueryServer | _TCPQueryServer"
+
+    def handle(self) -> None:
+        for raw in self.rfile:
+            command, _, argument = raw.decode().strip().partition(" ")
+            if not command:
+                continue
+            answer = answer_query(self.server.report, command, argument.strip())
+            self.wfile.write(json.dumps(answer).encode() + b"\n")
+            self.wfile.flush()
+
+
+class _UnixQueryServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    report: "MarkdownReport"
+
+
+class _TCPQueryServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    report: "MarkdownReport"
+
+
+def answer_query(report: "MarkdownReport", command: str, argument: str) -> object:
+    """Answer one query from a snapshot of the report state.
+
+    Args:
+        report: Report collecting the running session
+        command: Query name (counts, failures, report)
+        argument: Query argument (nodeid for report)
+
+    Returns:
+        JSON-serializable answer, with an "error" key for bad queries
+    """
+    snapshot = report.snapshot()
+    if command == "counts":
+        counts = {category: len(reports) for category, reports in snapshot.items()}
+        counts["running"] = len(report.running)
+        return counts
+    if command == "failures":
+        return [
+            {"nodeid": r.nodeid, "category": category}
+            for category in FAILURE_CATEGORIES
+            for r in snapshot[category]
+        ]
+    if command == "report":
+        for category, reports in snapshot.items():
+            for r in reports:
+                if r.nodeid == argument:
+                    lines = report.format_block(r, category)
+                    return {"markdown": "\n".join(lines).strip() + "\n"}
+        return {"error": f"no finished test {argument}"}
+    return {"error": f"unknown query {command}"}
+
+
+class QueryServer:
+    """Serve report queries on a Unix socket or a localhost TCP port."""
+
+    def __init__(self, report: "MarkdownReport", address: str) -> None:
+        """Initialize the server without binding it.
+
+        Args:
+            report: Report collecting the running session
+            address: Unix socket path, or ``HOST:PORT`` for TCP
+        """
+        self.report = report
+        self.address = address
+        self._server: _UnixQueryServer | _TCPQueryServer | None = None
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Bind the socket and serve in a daemon thread.
+
+        Raises:
+            OSError: If the socket cannot be bound, or a file that is not a
+                socket is in the way
+            ValueError: If a TCP host is not a loopback one
+        """
+        host, sep, port = self.address.rpartition(":")
+        if sep and port.isdigit() and "/" not in self.address:
+            address = (loopback_host(host), int(port))
+            self._server = _TCPQueryServer(address, _QueryHandler)
+        else:
+            remove_stale_socket(self.address)
+            self._server = _UnixQueryServer(self.address, _QueryHandler)
+        self._server.report = self.report
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name="markdown-report-query",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving and remove the socket file."""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        if isinstance(self._server, _UnixQueryServer):
+            with contextlib.suppress(OSError):
+                Path(self.address).unlink()
+        self._server = None
+        self._thread = None
@@ -0,0 +1,21 @@
+"""Bounded rankings: the top entries of a stream, in a min-heap."""
+
+import heapq
+from typing import TypeVar
+
+# Entry tuple, ranked by its first item
+_Entry = TypeVar("_Entry", bound=tuple)
+
+
+def push_top(heap: list[_Entry], entry: _Entry, top: int) -> None:
+    """Keep an entry if it ranks among the ``top`` largest ones.
+
+    Args:
+        heap: Min-heap of the entries kept so far, smallest first
+        entry: Tuple whose first item is the ranked value
+        top: Maximum number of entries kept
+    """
+    if len(heap) < top:
+        heapq.heappush(heap, entry)
+    elif entry[0] > heap[0][0]:
+        heapq.heapreplace(heap, entry)
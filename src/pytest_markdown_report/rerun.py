@@ -0,0 +1,110 @@
+"""In-process rerun of failures to tell flaky tests from consistent failures."""
+
+from collections.abc import Generator, Sequence
+from typing import TYPE_CHECKING
+
+import pytest
+from _pytest.runner import runtestprotocol
+
+if TYPE_CHECKING:
+    from pytest_markdown_report.plugin import MarkdownReport
+
+
+class FailureRerunner:
+    """Rerun failed and errored tests after the main loop, in the same session.
+
+    Reruns go through ``runtestprotocol`` without logging, so they leave the
+    collected reports untouched and save a whole pytest startup compared to
+    ``pytest --lf``. Subtests log their reports regardless: the report hands
+    those of a rerun over instead of collecting them. A test passing on any
+    rerun, subtests included, is recorded in the report's ``flaky`` mapping
+    and counted as flaky in the roll-up.
+
+    Attributes:
+        report: Report whose failures are rerun
+        reruns: Maximum reruns per failing test
+        suspended: Plugins unregistered during the reruns, whose
+            measurements describe the main run only
+    """
+
+    def __init__(
+        self,
+        report: "MarkdownReport",
+        reruns: int,
+        suspended: Sequence[object] = (),
+    ) -> None:
+        """Initialize the rerunner.
+
+        Args:
+            report: Report whose failures are rerun
+            reruns: Maximum reruns per failing test
+            suspended: Plugins unregistered during the reruns
+        """
+        self.report = report
+        self.reruns = reruns
+        self.suspended = suspended
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtestloop(self, session: pytest.Session) -> Generator[None]:
+        """Rerun the failures once every test ran."""
+        outcome = yield
+        if outcome.excinfo or session.shouldfail or session.shouldstop:
+            # Interrupted, or asked to stop early (-x, --maxfail, saturation)
+            return
+        failing = {r.nodeid: "failed" for r in self.report.failed}
+        failing.update((r.nodeid, "errors") for r in self.report.errors)
+        items = [item for item in session.items if item.nodeid in failing]
+        if not items:
+            return
+        pluginmanager = session.config.pluginmanager
+        for plugin in self.suspended:
+            pluginmanager.unregister(plugin)
+        try:
+            for item in items:
+                if self._rerun(item):
+                    self._mark_flaky(item.nodeid, failing[item.nodeid])
+        finally:
+            for plugin in self.suspended:
+                pluginmanager.register(plugin)
+
+    def _mark_flaky(self, nodeid: str, category: str) -> None:
+        """Count a failure that passed on rerun as flaky in the roll-up."""
+        if self.report.rollup:
+            with self.report.lock:
+                self.report.rollup.mark_flaky(nodeid, category)
+
+    def _rerun(self, item: pytest.Item) -> bool:
+        """Rerun one test until it passes or reruns are exhausted.
+
+        Returns:
+            True if a rerun passed
+        """
+        for attempt in range(1, self.reruns + 1):
+            # Subtest reports are logged, the report hands them over
+            self.report.rerun_reports = subtests = []
+            try:
+                reports = runtestprotocol(item, log=False, nextitem=None)
+            finally:
+                self.report.rerun_reports = None
+            if all(report.passed for report in reports) and not any(
+                report.failed for report in subtests
+            ):
+                self.report.flaky[item.nodeid] = attempt
+                return True
+        return False
+
+    def generate_section(self) -> list[str]:
+        """Generate the flaky tests section."""
+        if not self.report.flaky:
+            return []
+        lines = ["## Flaky", ""]
+        for report in (*self.report.errors, *self.report.failed):
+            attempt = self.report.flaky.get(report.nodeid)
+            if attempt is None:
+                continue
+            crash = getattr(report.longrepr, "reprcrash", None)
+            message = crash.message.splitlines()[0] if crash and crash.message else ""
+            line = f"- {report.nodeid} (passed on rerun {attempt}/{self.reruns})"
+            lines.append(f"{line}: {message}" if message else line)
+        lines.append("")
+        return lines
@@ -0,0 +1,199 @@
+"""Per-directory/module roll-up of outcomes, maintained as tests finish."""
+
+import re
+from collections import Counter
+from collections.abc import Iterable
+
+# Report categories counted as failures in summaries (as in the summary line);
+# failures that passed on rerun are moved to "flaky"
+FAILING_CATEGORIES = ("failed", "errors", "xpassed")
+# Summary parts of a roll-up line after "N/M passed", and their category
+_PART_CATEGORIES = {
+    "failed": "failed",
+    "flaky": "flaky",
+    "skipped": "skipped",
+    "xfail": "xfailed",
+}
+_LINE = re.compile(r"( *)- (.+) (\d+)/(\d+) passed((?:, \d+ \w+)*)")
+_MORE = re.compile(r"( *)- (\d+) more without failures \((\d+) tests\)")
+
+
+def nodeid_parts(nodeid: str) -> list[str]:
+    """Split a nodeid into its containers, without the test itself.
+
+    ``tests/pkg/test_x.py::TestA::test_b[1]`` gives
+    ``["tests/", "pkg/", "test_x.py", "::TestA"]``.
+    """
+    path, *scopes = nodeid.split("::")
+    *dirs, filename = path.split("/")
+    return [f"{d}/" for d in dirs] + [filename] + [f"::{s}" for s in scopes[:-1]]
+
+
+class RollupNode:
+    """Outcome counts of one directory, module or class, and its children."""
+
+    def __init__(self) -> None:
+        """Initialize an empty node."""
+        self.counts: Counter[str] = Counter()
+        self.children: dict[str, RollupNode] = {}
+
+    @property
+    def failures(self) -> int:
+        """Number of failing tests in the subtree."""
+        return sum(self.counts[category] for category in FAILING_CATEGORIES)
+
+    def describe(self) -> str:
+        """Summarize the counts like the summary line."""
+        passed = self.counts["passed"]
+        parts = [f"{passed}/{self.counts.total()} passed"]
+        if self.failures:
+            parts.append(f"{self.failures} failed")
+        if self.counts["flaky"]:
+            parts.append(f"{self.counts['flaky']} flaky")
+        if self.counts["skipped"]:
+            parts.append(f"{self.counts['skipped']} skipped")
+        if self.counts["xfailed"]:
+            parts.append(f"{self.counts['xfailed']} xfail")
+        return ", ".join(parts)
+
+
+class RollupTree:
+    """Outcome counts keyed by nodeid path components.
+
+    Attributes:
+        depth: Levels expanded below the top when rendering
+        root: Node holding the totals
+    """
+
+    def __init__(self, depth: int) -> None:
+        """Initialize an empty tree.
+
+        Args:
+            depth: Levels expanded below the top when rendering
+        """
+        self.depth = depth
+        self.root = RollupNode()
+
+    def add(self, nodeid: str, category: str) -> None:
+        """Count a finished test in every container of its nodeid."""
+        node = self.root
+        node.counts[category] += 1
+        for part in nodeid_parts(nodeid):
+            node = node.children.setdefault(part, RollupNode())
+            node.counts[category] += 1
+
+    def mark_flaky(self, nodeid: str, category: str) -> None:
+        """Count a failing test that passed on rerun as flaky instead."""
+        node = self.root
+        node.counts[category] -= 1
+        node.counts["flaky"] += 1
+        for part in nodeid_parts(nodeid):
+            node = node.children[part]
+            node.counts[category] -= 1
+            node.counts["flaky"] += 1
+
+    def generate_section(self) -> list[str]:
+        """Generate the roll-up section, expanding failing subtrees only."""
+        if not self.root.failures:
+            return []
+        lines = ["## Roll-up", ""]
+        lines.extend(self._format_children(self.root, 0))
+        lines.append("")
+        return lines
+
+    def _format_children(self, node: RollupNode, level: int) -> list[str]:
+        """Format failing children one per line, passing ones as a total."""
+        indent = "  " * level
+        lines = []
+        passing_nodes = 0
+        passing_tests = 0
+        for name, child in node.children.items():
+            if not child.failures:
+                passing_nodes += 1
+                passing_tests += child.counts.total()
+                continue
+            label, shown = self._fold(name, child)
+            lines.append(f"{indent}- {label} {shown.describe()}")
+            if level + 1 < self.depth:
+                lines.extend(self._format_children(shown, level + 1))
+        if passing_nodes:
+            lines.append(
+                f"{indent}- {passing_nodes} more without failures "
+                f"({passing_tests} tests)"
+            )
+        return lines
+
+    @staticmethod
+    def _fold(name: str, node: RollupNode) -> tuple[str, RollupNode]:
+        """Fold single-child chains, such as ``tests/`` + ``pkg/``."""
+        while len(node.children) == 1:
+            ((child_name, node),) = node.children.items()
+            name += child_name
+        return name, node
+
+
+class _MergedNode(RollupNode):
+    """Node of roll-up sections parsed back, with their passing containers."""
+
+    def __init__(self) -> None:
+        """Initialize an empty node."""
+        super().__init__()
+        self.passing_nodes = 0
+        self.passing_tests = 0
+
+
+def merge_sections(sections: Iterable[Iterable[str]]) -> list[str]:
+    """Merge the roll-up sections of several reports, summing their counts.
+
+    Containers are matched by label at each level. Containers without
+    failures in a report are only counted in its "more" line, so a container
+    failing in one report and passing in another only counts the tests of
+    the reports it failed in.
+
+    Args:
+        sections: Lines of each report's roll-up section, heading excluded
+
+    Returns:
+        Lines of the merged list
+    """
+    root = _MergedNode()
+    for lines in sections:
+        # (indent, node) of the containers enclosing the current line
+        stack: list[tuple[int, _MergedNode]] = [(-1, root)]
+        for line in lines:
+            match = _LINE.fullmatch(line) or _MORE.fullmatch(line)
+            if not match:
+                continue
+            indent = len(match[1])
+            while stack[-1][0] >= indent:
+                stack.pop()
+            parent = stack[-1][1]
+            if match.re is _MORE:
+                parent.passing_nodes += int(match[2])
+                parent.passing_tests += int(match[3])
+                continue
+            node = parent.children.setdefault(match[2], _MergedNode())
+            counts = Counter({"passed": int(match[3])})
+            for part in match[5].split(", ")[1:]:
+                count, _, name = part.partition(" ")
+                counts[_PART_CATEGORIES.get(name, name)] += int(count)
+            # Counted in the total but not named on the line
+            counts["other"] = int(match[4]) - counts.total()
+            node.counts.update(counts)
+            stack.append((indent, node))
+    return _format_merged(root, 0)
+
+
+def _format_merged(node: _MergedNode, level: int) -> list[str]:
+    """Format merged containers by label, passing ones as a total."""
+    indent = "  " * level
+    lines = []
+    for label, child in sorted(node.children.items()):
+        lines.append(f"{indent}- {label} {child.describe()}")
+        lines.extend(_format_merged(child, level + 1))
+    if node.passing_nodes:
+        lines.append(
+            f"{indent}- {node.passing_nodes} more without failures "
+            f"({node.passing_tests} tests)"
+        )
+    return lines
@@ -0,0 +1,79 @@
+"""Failure fingerprinting and the stop-on-saturation policy."""
+
+import re
+
+from _pytest.reports import TestReport
+
+# Leading exception name of a crash message ("RuntimeError: ..." -> RuntimeError)
+_EXCEPTION_NAME = re.compile(r"^[A-Za-z_][\w.]*(?=:|$)")
+# Numbers vary between otherwise identical messages (values, ids, addresses)
+_NUMBER = re.compile(r"\d+")
+
+
+def failure_fingerprint(report: TestReport) -> str:
+    """Identify the root cause of a failure, independently of the test.
+
+    Failures raised at the same location with the same exception type share
+    a fingerprint, so one broken fixture or helper counts as a single cause.
+
+    Args:
+        report: Failed test report from any phase
+
+    Returns:
+        Stable string key for the failure's root cause
+    """
+    crash = getattr(report.longrepr, "reprcrash", None)
+    if crash is not None:
+        message = crash.message.strip().partition("\n")[0]
+        match = _EXCEPTION_NAME.match(message)
+        cause = match.group() if match else _NUMBER.sub("N", message)
+        return f"{crash.path}:{crash.lineno}: {cause}"
+    # No structured crash location: fall back to the last traceback line
+    lines = report.longreprtext.strip().splitlines()
+    return _NUMBER.sub("N", lines[-1]) if lines else report.nodeid
+
+
+class FailureSaturation:
+    """Decide when further failures stop bringing new information.
+
+    Attributes:
+        max_distinct: Stop once this many distinct causes were seen (0: never)
+        max_repeats: Stop after this many consecutive failures with no new
+            cause (0: never)
+        causes: Fingerprints of the distinct causes seen so far
+        repeats: Consecutive failures since the last new cause
+    """
+
+    def __init__(self, max_distinct: int, max_repeats: int) -> None:
+        """Initialize the policy.
+
+        Args:
+            max_distinct: Distinct cause limit, 0 to disable
+            max_repeats: Consecutive repeat limit, 0 to disable
+        """
+        self.max_distinct = max_distinct
+        self.max_repeats = max_repeats
+        self.causes: set[str] = set()
+        self.repeats = 0
+
+    def add(self, report: TestReport) -> str | None:
+        """Record a failure and check whether the session should stop.
+
+        Args:
+            report: Failed test report
+
+        Returns:
+            Reason to stop the session, or None to keep going
+        """
+        fingerprint = failure_fingerprint(report)
+        if fingerprint in self.causes:
+            self.repeats += 1
+        else:
+            self.causes.add(fingerprint)
+            self.repeats = 0
+
+        if self.max_distinct and len(self.causes) >= self.max_distinct:
+            return f"{len(self.causes)} distinct failure causes"
+        if self.max_repeats and self.repeats >= self.max_repeats:
+            return f"{self.repeats} consecutive failures with no new cause"
+        return None
@@ -0,0 +1,121 @@
+"""Third-party report sections, fitted in a global size limit.
+
+Sections are laid out by decreasing priority. Each one gets the smaller of
+its own budget and what is left of the limit: it is included whole,
+truncated at a line boundary, or dropped when too little room is left.
+Budgets are in bytes of UTF-8 markdown; token budgets are converted at
+about four bytes per token.
+"""
+
+from collections.abc import Callable, Iterable
+
+BYTES_PER_TOKEN = 4
+# Smallest room worth rendering a section in
+MIN_SECTION_BYTES = 128
+# Room kept for the truncation note and a closing code fence
+_TRUNCATION_RESERVE = 64
+
+
+class ReportSection:
+    """A section contributed through ``pytest_markdown_report_sections``.
+
+    Attributes:
+        title: Section heading, without the ``## `` prefix
+        render: Callable returning the section lines, heading excluded;
+            only called if the section is included
+        priority: Sections with a higher priority get room first
+        budget: Maximum bytes of the section, heading included, if any
+    """
+
+    def __init__(
+        self,
+        title: str,
+        render: Callable[[], Iterable[str]],
+        *,
+        priority: int = 0,
+        max_bytes: int | None = None,
+        max_tokens: int | None = None,
+    ) -> None:
+        """Declare a section.
+
+        Args:
+            title: Section heading, without the ``## `` prefix
+            render: Callable returning the section lines, heading excluded
+            priority: Sections with a higher priority get room first
+            max_bytes: Maximum bytes of the section, heading included
+            max_tokens: Maximum approximate tokens of the section
+        """
+        self.title = title
+        self.render = render
+        self.priority = priority
+        budgets = [max_bytes] if max_bytes is not None else []
+        if max_tokens is not None:
+            budgets.append(max_tokens * BYTES_PER_TOKEN)
+        self.budget = min(budgets) if budgets else None
+
+
+def _size(line: str) -> int:
+    """Bytes of a line in the report, newline included."""
+    return len(line.encode()) + 1
+
+
+def _render(section: ReportSection) -> list[str]:
+    """Render a section, reporting a failing render in its place."""
+    try:
+        lines = list(section.render())
+    except Exception as e:  # noqa: BLE001 - a plugin bug must not lose the report
+        return [f"Rendering failed: {type(e).__name__}: {e}"]
+    while lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+
+def _truncate(lines: list[str], room: int) -> list[str]:
+    """Keep the lines that fit in room bytes, closing an open code block."""
+    if sum(_size(line) for line in lines) <= room:
+        return lines
+    kept: list[str] = []
+    used = 0
+    in_fence = False
+    for line in lines:
+        used += _size(line)
+        if used > room - _TRUNCATION_RESERVE:
+            break
+        kept.append(line)
+        if line.startswith("```"):
+            in_fence = not in_fence
+    omitted = len(lines) - len(kept)
+    if in_fence:
+        kept.append("```")
+    kept.extend(["", f"*Truncated: {omitted} more lines*"])
+    return kept
+
+
+def layout_sections(sections: Iterable[ReportSection], limit: int) -> list[str]:
+    """Render the sections that fit in limit bytes.
+
+    Args:
+        sections: Declared sections, in hook call order
+        limit: Bytes available to all sections
+
+    Returns:
+        Report lines: sections by decreasing priority, then a note naming
+        the dropped ones
+    """
+    lines: list[str] = []
+    dropped = []
+    remaining = limit
+    for section in sorted(sections, key=lambda s: -s.priority):
+        room = remaining if section.budget is None else min(section.budget, remaining)
+        if room < MIN_SECTION_BYTES:
+            dropped.append(section.title)
+            continue
+        heading = [f"## {section.title}", ""]
+        room -= sum(_size(line) for line in heading)
+        body = _truncate(_render(section), room)
+        body.append("")
+        remaining -= sum(_size(line) for line in [*heading, *body])
+        lines.extend([*heading, *body])
+    if dropped:
+        lines.extend([f"*Omitted to fit the size limit: {', '.join(dropped)}*", ""])
+    return lines
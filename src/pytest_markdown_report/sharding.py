@@ -0,0 +1,199 @@
+"""Duration-aware split of the suite across CI nodes.
+
+Every session stores the duration of the tests it ran in the pytest cache,
+and drops the durations of tests that were deleted.
+``--markdown-shard=i/n`` partitions the collected tests with the greedy
+longest-processing-time rule: slowest first, each to the least loaded shard.
+Tests without a recorded duration are estimated at the median of the known
+ones. All nodes must see the same cache and collection, so they compute the
+same partition.
+"""
+
+import argparse
+import heapq
+import statistics
+from collections.abc import Collection, Mapping, Sequence
+from typing import TYPE_CHECKING
+
+import pytest
+from _pytest.config import Config
+
+if TYPE_CHECKING:
+    from pytest_markdown_report.plugin import MarkdownReport
+
+CACHE_KEY = "markdown_report/durations"
+# Estimate for every test when no duration was ever recorded
+DEFAULT_ESTIMATE = 0.1
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """Parse the ``--markdown-shard`` value.
+
+    Args:
+        value: ``i/n``, the 1-based shard index and the number of shards
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is not a valid shard
+    """
+    index, _, count = value.partition("/")
+    try:
+        shard = (int(index), int(count))
+    except ValueError:
+        shard = (0, 0)
+    if not 1 <= shard[0] <= shard[1]:
+        msg = f"invalid shard {value!r} (expected i/n with 1 <= i <= n)"
+        raise argparse.ArgumentTypeError(msg)
+    return shard
+
+
+def load_durations(config: Config) -> dict[str, float]:
+    """Load recorded durations from the pytest cache (empty if absent)."""
+    cache = getattr(config, "cache", None)  # None with -p no:cacheprovider
+    data = cache.get(CACHE_KEY, None) if cache else None
+    return data if isinstance(data, dict) else {}
+
+
+def save_durations(
+    config: Config,
+    durations: Mapping[str, float],
+    collected: Collection[str],
+    deselected: Collection[str],
+) -> None:
+    """Store the durations of the tests that ran, dropping deleted tests.
+
+    Durations of other tests are kept, except for tests of a file that no
+    longer exists, or that was collected whole without them. A file is not
+    collected whole when some of its tests were deselected, or when the
+    session selected tests (``file::test`` arguments, ``--lf``, ``-k``,
+    ``-m``, ``--deselect``).
+
+    Args:
+        config: pytest Config object
+        durations: Seconds per nodeid of the tests that ran
+        collected: Nodeids of all collected tests, deselected ones included
+        deselected: Nodeids of the deselected tests
+    """
+    cache = getattr(config, "cache", None)
+    if not cache or not durations:
+        return
+    collected = set(collected)
+    files = set()
+    if not _selects_tests(config):
+        files = {nodeid.partition("::")[0] for nodeid in collected}
+        files.difference_update(nodeid.partition("::")[0] for nodeid in deselected)
+    exists: dict[str, bool] = {}
+
+    def deleted(nodeid: str) -> bool:
+        path = nodeid.partition("::")[0]
+        if path in files:
+            return nodeid not in collected
+        if path not in exists:
+            exists[path] = (config.rootpath / path).exists()
+        return not exists[path]
+
+    data = {
+        nodeid: seconds
+        for nodeid, seconds in load_durations(config).items()
+        if not deleted(nodeid)
+    }
+    data.update((nodeid, round(seconds, 4)) for nodeid, seconds in durations.items())
+    cache.set(CACHE_KEY, data)
+
+
+def _selects_tests(config: Config) -> bool:
+    """Check whether the session may have left tests of a file uncollected."""
+    # --lf filters files while collecting them, before any deselection
+    return bool(
+        any("::" in str(arg) for arg in config.args)
+        or config.getoption("lf", default=False)
+        or config.getoption("keyword", default="")
+        or config.getoption("markexpr", default="")
+        or config.getoption("deselect", default=None)
+    )
+
+
+def plan_shards(
+    nodeids: Sequence[str], durations: Mapping[str, float], count: int
+) -> tuple[list[list[int]], list[float]]:
+    """Partition tests with the longest-processing-time rule.
+
+    Args:
+        nodeids: Collected tests, in collection order
+        durations: Recorded seconds per nodeid
+        count: Number of shards
+
+    Returns:
+        Test indexes of each shard (in collection order) and expected
+        seconds of each shard
+    """
+    known = [durations[nodeid] for nodeid in nodeids if nodeid in durations]
+    fallback = statistics.median(known) if known else DEFAULT_ESTIMATE
+    estimates = [durations.get(nodeid, fallback) for nodeid in nodeids]
+    # Slowest first, nodeid breaks ties so every node sorts alike
+    order = sorted(range(len(nodeids)), key=lambda i: (-estimates[i], nodeids[i]))
+    # (load, tests, shard): equal loads go to the shard with fewer tests
+    heap = [(0.0, 0, shard) for shard in range(count)]
+    assigned: list[list[int]] = [[] for _ in range(count)]
+    for i in order:
+        load, tests, shard = heap[0]
+        assigned[shard].append(i)
+        heapq.heapreplace(heap, (load + estimates[i], tests + 1, shard))
+    expected = [0.0] * count
+    for load, _, shard in heap:
+        expected[shard] = load
+    return [sorted(indexes) for indexes in assigned], expected
+
+
+class ShardSelector:
+    """Deselect every test outside of one shard (pytest plugin).
+
+    Attributes:
+        report: Report whose durations give the actual shard time
+        index: 1-based shard index
+        count: Number of shards
+        expected: Expected seconds of the selected tests, once planned
+        estimated: Selected tests without a recorded duration
+    """
+
+    def __init__(self, report: "MarkdownReport", index: int, count: int) -> None:
+        """Initialize the selector.
+
+        Args:
+            report: Report whose durations give the actual shard time
+            index: 1-based shard index
+            count: Number of shards
+        """
+        self.report = report
+        self.index = index
+        self.count = count
+        self.expected: float | None = None
+        self.estimated = 0
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(
+        self, config: Config, items: list[pytest.Item]
+    ) -> None:
+        """Keep the tests of this shard, after any other selection."""
+        nodeids = [item.nodeid for item in items]
+        durations = load_durations(config)
+        shards, expected = plan_shards(nodeids, durations, self.count)
+        selected = shards[self.index - 1]
+        self.expected = expected[self.index - 1]
+        self.estimated = sum(nodeids[i] not in durations for i in selected)
+        keep = set(selected)
+        deselected = [item for i, item in enumerate(items) if i not in keep]
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = [items[i] for i in selected]
+
+    def generate_section(self) -> list[str]:
+        """Generate the shard timing section."""
+        if self.expected is None:
+            return []
+        actual = sum(self.report.durations.values())
+        tests = len(self.report.durations)
+        line = f"**Expected:** {self.expected:.2f}s, **actual:** {actual:.2f}s"
+        details = f"{tests} tests"
+        if self.estimated:
+            details += f", {self.estimated} without recorded duration"
+        return [f"## Shard {self.index}/{self.count}", "", f"{line} ({details})", ""]
@@ -0,0 +1,201 @@
+"""Report file shared by several pytest processes (tox envs, matrix jobs).
+
+Each process contributes a section under its label, and the combined summary
+at the top is recomputed from per-section counts kept in a header comment, so
+sections are copied but never parsed. Updates are serialized with an
+``fcntl`` lock on a sidecar ``.lock`` file and published with an atomic
+rename: readers see the old file or the new one, never a mix.
+
+File layout::
+
+    <!-- pytest-markdown-report {"sections": [[label, counts, size], ...]} -->
+    # Test Report
+
+    **Summary:** ...
+
+    ## <label>
+    ...
+"""
+
+import contextlib
+import json
+import os
+import re
+import stat
+import tempfile
+from collections import Counter
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+from typing import BinaryIO
+
+_HEADER = re.compile(rb"<!-- pytest-markdown-report (.*) -->\n")
+# Lines after the header comment, before the first section
+_TITLE_LINES = 4
+_CHUNK_SIZE = 1 << 20
+
+
+def summary_parts(counts: Mapping[str, int]) -> list[str]:
+    """Format the summary line parts from outcome counts.
+
+    Args:
+        counts: Tests per category (CATEGORIES), plus ``flaky``,
+            ``regressed`` benchmarks and, for shared reports,
+            ``collection_errors``
+    """
+    total_passed = counts.get("passed", 0)
+    # Count errors + failures + xpassed as "failed" for summary (backward
+    # compat), except failures that passed on rerun
+    total_failed = sum(counts.get(c, 0) for c in ("failed", "errors", "xpassed"))
+    total_skipped = counts.get("skipped", 0)
+    total_xfailed = counts.get("xfailed", 0)
+    flaky = counts.get("flaky", 0)
+    total = total_passed + total_failed + total_skipped + total_xfailed
+
+    parts = [f"{total_passed}/{total} passed"]
+    if total_failed - flaky > 0:
+        parts.append(f"{total_failed - flaky} failed")
+    if flaky:
+        parts.append(f"{flaky} flaky")
+    if total_skipped > 0:
+        parts.append(f"{total_skipped} skipped")
+    if total_xfailed > 0:
+        parts.append(f"{total_xfailed} xfail")
+    if counts.get("regressed"):
+        parts.append(f"{counts['regressed']} regressed")
+    errors = counts.get("collection_errors", 0)
+    if errors:
+        parts.append(f"{errors} collection error{'s' if errors > 1 else ''}")
+    return parts
+
+
+def demote_headings(lines: list[str]) -> Iterator[str]:
+    """Nest a report under a section heading, dropping its title.
+
+    Headings inside code blocks are left alone.
+    """
+    in_fence = False
+    for line in lines:
+        if line.startswith("```"):
+            in_fence = not in_fence
+        if in_fence or not line.startswith("#"):
+            yield line
+        elif not line.startswith("# "):
+            yield f"#{line}"
+
+
+@contextlib.contextmanager
+def _locked(path: Path, *, blocking: bool = True) -> Iterator[None]:
+    """Hold an exclusive lock on the sidecar lock file of a report.
+
+    Raises:
+        BlockingIOError: If not blocking and another process holds the lock
+    """
+    try:
+        import fcntl  # noqa: PLC0415 - Unix only
+    except ImportError:
+        # The rename still keeps the file whole, concurrent updates may be lost
+        yield
+        return
+    with path.with_name(f"{path.name}.lock").open("a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _read_header(report: BinaryIO) -> list[list]:
+    """Read the section index of a shared report, skipping its title lines.
+
+    Returns:
+        ``[label, counts, size]`` of each section, empty for a file that is
+        not a shared report (its content is then replaced)
+    """
+    match = _HEADER.fullmatch(report.readline())
+    if not match:
+        return []
+    for _ in range(_TITLE_LINES):
+        report.readline()
+    try:
+        return json.loads(match[1])["sections"]
+    except (ValueError, KeyError):
+        return []
+
+
+def write_shared_report(
+    path: Path,
+    label: str,
+    counts: Mapping[str, int],
+    lines: list[str],
+    *,
+    blocking: bool = True,
+) -> None:
+    """Add or replace the section of one process in a shared report.
+
+    Args:
+        path: Shared report file
+        label: Section heading of this process, replacing a previous section
+            of the same label
+        counts: Outcome counts of this process, for the combined summary
+        lines: Report lines of this process
+        blocking: Wait for other processes to finish their update, else
+            raise BlockingIOError
+
+    Raises:
+        OSError: If the report cannot be written
+    """
+    body = "\n".join([f"## {label}", "", *demote_headings(lines)]).rstrip()
+    section = f"{body}\n\n".encode()
+    with _locked(path, blocking=blocking), contextlib.ExitStack() as stack:
+        try:
+            report = stack.enter_context(path.open("rb"))
+        except FileNotFoundError:
+            report = None
+        sections = _read_header(report) if report else []
+        index = [entry for entry in sections if entry[0] != label]
+        nonzero = {category: count for category, count in counts.items() if count}
+        index.append([label, nonzero, len(section)])
+        totals: Counter[str] = Counter()
+        for _, section_counts, _ in index:
+            totals.update(section_counts)
+        header = (
+            f"<!-- pytest-markdown-report {json.dumps({'sections': index})} -->\n"
+            f"# Test Report\n\n**Summary:** {', '.join(summary_parts(totals))}\n\n"
+        )
+        temp = tempfile.NamedTemporaryFile(  # noqa: SIM115 - renamed, not closed
+            "wb", dir=path.parent, prefix=f".{path.name}.", delete=False
+        )
+        try:
+            with temp:
+                temp.write(header.encode())
+                for old_label, _, size in sections:
+                    if old_label == label:
+                        report.seek(size, os.SEEK_CUR)
+                    else:
+                        _copy(report, temp, size)
+                temp.write(section)
+            # Temporary files are private, the report keeps a regular mode
+            Path(temp.name).chmod(_report_mode(report))
+            Path(temp.name).replace(path)
+        except BaseException:
+            Path(temp.name).unlink(missing_ok=True)
+            raise
+
+
+def _report_mode(report: BinaryIO | None) -> int:
+    """Get the mode of the existing report, or of a new file."""
+    if report is not None:
+        return stat.S_IMODE(os.fstat(report.fileno()).st_mode)
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def _copy(source: BinaryIO, target: BinaryIO, size: int) -> None:
+    """Copy size bytes between files in bounded chunks."""
+    while size > 0:
+        chunk = source.read(min(size, _CHUNK_SIZE))
+        if not chunk:
+            return
+        target.write(chunk)
+        size -= len(chunk)
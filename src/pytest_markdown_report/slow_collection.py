@@ -0,0 +1,120 @@
+"""Collection timing: which test modules and directories are slow to collect."""
+
+import time
+from collections.abc import Generator
+from pathlib import Path
+from types import ModuleType
+
+import pytest
+
+from pytest_markdown_report.ranking import push_top
+
+# Modules and directories collected faster than this are not worth a look,
+# whatever the number of slower ones
+MIN_SECONDS = 0.01
+
+# Directory collectors: pytest.Directory (pytest >= 8) and Package
+_DIRECTORY_TYPES = tuple(
+    cls for cls in (getattr(pytest, "Directory", None), pytest.Package) if cls
+)
+
+
+class CollectionTimer:
+    """Time the collection of each module, directory and conftest.
+
+    A module's collection includes importing it. A conftest is imported
+    around the collection of its directory, not always inside a collection
+    hook: its time runs from the previous collection event to its
+    registration, and is not counted again in the directory's time.
+    Conftests loaded before the session (rootdir and command line arguments)
+    are not measured. Only the top entries are kept, in a bounded min-heap.
+
+    Attributes:
+        top: Number of collectors listed
+        slowest: Min-heap of ``(seconds, label)``
+        total: Wall-clock seconds of the whole collection
+    """
+
+    def __init__(self, top: int, rootpath: Path) -> None:
+        """Initialize the timer.
+
+        Args:
+            top: Number of collectors listed
+            rootpath: Directory conftest paths are shown relative to
+        """
+        self.top = top
+        self.rootpath = rootpath
+        self.slowest: list[tuple[float, str]] = []
+        self.total = 0.0
+        # Time of the last collection event, None outside of collection
+        self._last_event: float | None = None
+        # Conftest seconds inside each collector being collected
+        self._conftest_time: list[float] = []
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_collection(self) -> Generator[None]:
+        """Time the whole collection."""
+        start = self._last_event = time.perf_counter()
+        yield
+        self.total = time.perf_counter() - start
+        self._last_event = None
+
+    def pytest_collectstart(self) -> None:
+        """Note the start of a collector, after its conftest was loaded."""
+        if self._last_event is not None:
+            self._last_event = time.perf_counter()
+
+    def pytest_plugin_registered(self, plugin: object) -> None:
+        """Time a conftest imported during collection."""
+        filename = getattr(plugin, "__file__", None) or ""
+        if (
+            self._last_event is None
+            or not isinstance(plugin, ModuleType)
+            or Path(filename).name != "conftest.py"
+        ):
+            return
+        now = time.perf_counter()
+        path = Path(filename)
+        try:
+            label = path.relative_to(self.rootpath).as_posix()
+        except ValueError:
+            label = str(path)
+        elapsed = now - self._last_event
+        self._conftest_time = [t + elapsed for t in self._conftest_time]
+        self._push(elapsed, label)
+        self._last_event = now
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_make_collect_report(
+        self, collector: pytest.Collector
+    ) -> Generator[None]:
+        """Time the collection of one module or directory."""
+        start = time.perf_counter()
+        self._conftest_time.append(0.0)
+        yield
+        self._last_event = time.perf_counter()
+        elapsed = self._last_event - start - self._conftest_time.pop()
+        if isinstance(collector, _DIRECTORY_TYPES):
+            label = f"{collector.nodeid or '.'}/ (directory)"
+        elif isinstance(collector, pytest.File):
+            label = collector.nodeid
+        else:
+            return
+        self._push(elapsed, label)
+
+    def generate_section(self) -> list[str]:
+        """Generate the slow collection section."""
+        if not self.slowest:
+            return []
+        lines = ["## Slow collection", "", f"**Collection:** {self.total:.2f}s", ""]
+        lines.extend(
+            f"- {elapsed:.2f}s {label}"
+            for elapsed, label in sorted(self.slowest, reverse=True)
+        )
+        lines.append("")
+        return lines
+
+    def _push(self, elapsed: float, label: str) -> None:
+        """Keep the entry if it is slow enough to rank among the top ones."""
+        if elapsed >= MIN_SECONDS:
+            push_top(self.slowest, (elapsed, label), self.top)
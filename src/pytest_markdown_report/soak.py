@@ -0,0 +1,207 @@
+"""Soak mode: rotated reports and flat memory for sessions lasting days.
+
+Every N tests or T minutes, the report is written to a numbered file next to
+``--markdown-report``, then the per-test detail of that window is dropped:
+category lists, captured output, warnings and durations, and the reports
+pytest's own terminal reporter accumulates. Tests left pending without a
+teardown are categorized first, so no per-test buffer outlives its window.
+Counts carry over as rolling totals, and the first occurrence of each distinct
+failure cause (see ``failure_fingerprint``) is kept, rendered, up to a fixed
+number of causes.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+from _pytest.config import Config
+from _pytest.reports import TestReport
+
+from pytest_markdown_report.collection import CATEGORIES
+from pytest_markdown_report.saturation import failure_fingerprint
+
+if TYPE_CHECKING:
+    from pytest_markdown_report.plugin import MarkdownReport
+
+# Failure causes whose first occurrence is kept, further causes are counted
+MAX_DISTINCT_FAILURES = 100
+# Categories whose first occurrences are kept past their window
+_FAILING = ("errors", "failed")
+
+
+def rotated_path(path: Path, window: int) -> Path:
+    """Name the file of a rotated window: ``report.md`` gives ``report.0001.md``."""
+    return path.with_name(f"{path.stem}.{window:04d}{path.suffix}")
+
+
+class SoakRotation:
+    """Rotate the report of a long session (pytest plugin).
+
+    Attributes:
+        report: Report whose lists are trimmed at each rotation
+        path: Report file rotated files are named after
+        every_tests: Tests per window, 0 for no limit
+        every_seconds: Duration of a window, 0 for no limit
+        keep: Rotated files kept, older ones are deleted; 0 keeps all
+        window: Number of the current window, from 1
+        tests: Tests finished in the current window
+        first_failures: ``(window, occurrences, block)`` of the first
+            occurrence of each failure cause of earlier windows, per
+            fingerprint
+        other_failures: Failures of earlier windows whose cause is not kept
+    """
+
+    def __init__(
+        self,
+        report: "MarkdownReport",
+        path: Path,
+        every_tests: int,
+        every_minutes: float,
+        keep: int,
+    ) -> None:
+        """Initialize the first window.
+
+        Args:
+            report: Report whose lists are trimmed at each rotation
+            path: Report file rotated files are named after
+            every_tests: Tests per window, 0 for no limit
+            every_minutes: Duration of a window, 0 for no limit
+            keep: Rotated files kept, 0 keeps all
+        """
+        self.report = report
+        self.path = path
+        self.every_tests = every_tests
+        self.every_seconds = every_minutes * 60
+        self.keep = keep
+        self.window = 1
+        self.tests = 0
+        self.first_failures: dict[str, tuple[int, int, list[str]]] = {}
+        self.other_failures = 0
+        self._window_start = time.monotonic()
+        self._window_started = time.strftime("%H:%M:%S")
+        # Held while rotating, a thread finding it taken skips the check
+        self._lock = threading.Lock()
+
+    def pytest_runtest_logfinish(self) -> None:
+        """Rotate once the window is full, after the test was categorized."""
+        self.tests += 1
+        full = self.every_tests and self.tests >= self.every_tests
+        expired = (
+            self.every_seconds
+            and time.monotonic() - self._window_start >= self.every_seconds
+        )
+        if (full or expired) and self._lock.acquire(blocking=False):
+            try:
+                self.rotate(self.report.config)
+            finally:
+                self._lock.release()
+
+    def rotate(self, config: Config) -> None:
+        """Write the window's report to its numbered file, then trim it."""
+        path = rotated_path(self.path, self.window)
+        try:
+            self.report.write_report_file(path)
+        except OSError as e:
+            sys.stderr.write(f"\nWarning: Could not write to {path}: {e}\n")
+        if self.keep and self.window > self.keep:
+            rotated_path(self.path, self.window - self.keep).unlink(missing_ok=True)
+        self._trim()
+        # pytest keeps every phase report for its terminal summary, which the
+        # redirected output discards anyway
+        reporter = config.pluginmanager.get_plugin("terminalreporter")
+        for reports in getattr(reporter, "stats", {}).values():
+            del reports[:]
+        self.window += 1
+        self.tests = 0
+        self._window_start = time.monotonic()
+        self._window_started = time.strftime("%H:%M:%S")
+
+    def _trim(self) -> None:
+        """Move the window's tests to the rolling counts.
+
+        Each list loses the items it had when trimming started: tests
+        finishing meanwhile in other threads move to the next window.
+        """
+        report = self.report
+        self._finalize_stale()
+        nodeids = set()
+        for shard in report.shards:
+            for category in CATEGORIES:
+                reports = getattr(shard, category)
+                window = reports[: len(reports)]
+                if category in _FAILING:
+                    for test_report in window:
+                        self._keep_first(test_report, category)
+                nodeids.update(test_report.nodeid for test_report in window)
+                del reports[: len(window)]
+                report.retired[category] += len(window)
+            del shard.passed_with_output[: len(shard.passed_with_output)]
+            del shard.warnings[: len(shard.warnings)]
+            for nodeid in list(shard.durations):
+                if nodeid not in shard.pending:
+                    shard.durations.pop(nodeid, None)
+        for nodeid in nodeids:
+            report.subtests.pop(nodeid, None)
+        report.live_emitted.difference_update(nodeids)
+
+    def _finalize_stale(self) -> None:
+        """Categorize pending tests that are no longer running.
+
+        A test whose teardown is never logged, or is logged from another
+        thread, would otherwise stay pending for the rest of the session.
+        Pending tests are listed before the running ones are read, so a test
+        starting meanwhile is not finalized early.
+        """
+        report = self.report
+        stale = [
+            (shard, nodeid)
+            for shard in report.shards
+            for nodeid in [*list(shard.pending), *list(shard.subtests)]
+        ]
+        running = {nodeid for nodeid, _ in list(report.running.values())}
+        for shard, nodeid in stale:
+            if nodeid not in running:
+                report.finalize_test(nodeid, shard)
+
+    def _keep_first(self, test_report: TestReport, category: str) -> None:
+        """Keep the block of a failure if its cause was not seen before."""
+        fingerprint = failure_fingerprint(test_report)
+        if fingerprint in self.first_failures:
+            window, occurrences, block = self.first_failures[fingerprint]
+            self.first_failures[fingerprint] = (window, occurrences + 1, block)
+        elif len(self.first_failures) < MAX_DISTINCT_FAILURES:
+            block = self.report.format_block(test_report, category)
+            self.first_failures[fingerprint] = (self.window, 1, block)
+        else:
+            self.other_failures += 1
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_sessionfinish(self) -> None:
+        """Stop rotating once the final report is being built."""
+        self.every_tests = 0
+        self.every_seconds = 0
+
+    def generate_section(self) -> list[str]:
+        """Generate the soak section: windows and earlier failure causes."""
+        earlier = self.window - 1
+        since = f"{self.tests} tests since {self._window_started}"
+        lines = ["## Soak", "", f"**Window:** {self.window} ({since})", ""]
+        if earlier:
+            oldest = max(1, self.window - self.keep) if self.keep else 1
+            names = rotated_path(self.path, earlier).name
+            if oldest < earlier:
+                names = f"{rotated_path(self.path, oldest).name} to {names}"
+            lines.extend([f"**Earlier windows:** {names}", ""])
+        if self.other_failures:
+            other = f"{self.other_failures} beyond the first {MAX_DISTINCT_FAILURES}"
+            lines.extend([f"**Other failures:** {other} causes", ""])
+        for window, occurrences, block in self.first_failures.values():
+            heading, *rest = block
+            lines.append(heading)
+            seen = f"**First seen:** window {window}, {occurrences} occurrences"
+            lines.extend(["", seen])
+            lines.extend(rest)
+        return lines
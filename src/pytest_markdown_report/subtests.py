@@ -0,0 +1,94 @@
+"""Streaming aggregation of subtest reports (pytest subtests, pytest-subtests)."""
+
+from collections import Counter
+
+from _pytest.reports import TestReport
+
+# Failing subtests listed under the parent, the rest are only counted
+MAX_LISTED_FAILURES = 20
+
+
+def is_subtest_report(report: TestReport) -> bool:
+    """Check whether a report comes from a subtest rather than its parent.
+
+    Both pytest's built-in subtests and the pytest-subtests plugin attach a
+    context with the subtest message and keyword arguments.
+    """
+    context = getattr(report, "context", None)
+    return hasattr(context, "msg") and hasattr(context, "kwargs")
+
+
+def subtest_description(report: TestReport) -> str:
+    """Describe a subtest like pytest does: ``[msg] (key=value, ...)``."""
+    parts = []
+    if report.context.msg is not None:
+        parts.append(f"[{report.context.msg}]")
+    if report.context.kwargs:
+        params = ", ".join(f"{k}={v}" for k, v in report.context.kwargs.items())
+        parts.append(f"({params})")
+    return " ".join(parts) or "(<subtest>)"
+
+
+def subtest_outcome(report: TestReport) -> str:
+    """Name a subtest outcome as used in the summary counts."""
+    if hasattr(report, "wasxfail"):
+        return "xpassed" if report.passed else "xfailed"
+    return report.outcome
+
+
+class SubtestRecord:
+    """Aggregate of the subtests of one test, with constant memory.
+
+    Only outcome counts, the first failing report (for its traceback) and a
+    capped list of one-line failure descriptions are retained.
+
+    Attributes:
+        counts: Number of subtests per outcome
+        first_failure: Report of the first failing subtest
+        failures: ``(description, message)`` of the first failing subtests
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty record."""
+        self.counts: Counter[str] = Counter()
+        self.first_failure: TestReport | None = None
+        self.failures: list[tuple[str, str]] = []
+
+    def add(self, report: TestReport) -> None:
+        """Fold a subtest report into the record."""
+        outcome = subtest_outcome(report)
+        self.counts[outcome] += 1
+        if outcome != "failed":
+            return
+        if self.first_failure is None:
+            self.first_failure = report
+        if len(self.failures) < MAX_LISTED_FAILURES:
+            self.failures.append((subtest_description(report), _crash_line(report)))
+
+    @property
+    def failed(self) -> int:
+        """Number of failed subtests."""
+        return self.counts["failed"]
+
+    def format_lines(self) -> list[str]:
+        """Format the counts and failing subtests under the parent test."""
+        order = ("passed", "failed", "skipped", "xfailed", "xpassed")
+        parts = [f"{self.counts[o]} {o}" for o in order if self.counts[o]]
+        lines = [f"**Subtests:** {', '.join(parts)}", ""]
+        if self.failures:
+            lines.extend(f"- {desc}: {message}" for desc, message in self.failures)
+            omitted = self.failed - len(self.failures)
+            if omitted > 0:
+                lines.append(f"- ... {omitted} more failed subtests")
+            lines.append("")
+        return lines
+
+
+def _crash_line(report: TestReport) -> str:
+    """Summarize a failure on one line: location and first message line."""
+    crash = getattr(report.longrepr, "reprcrash", None)
+    if crash is not None:
+        message = crash.message.strip().partition("\n")[0]
+        return f"{crash.path.rsplit('/', 1)[-1]}:{crash.lineno}: {message}"
+    lines = report.longreprtext.strip().splitlines()
+    return lines[-1] if lines else "failed"
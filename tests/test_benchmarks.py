@@ -0,0 +1,89 @@
+"""Test the compact rendering of pytest-benchmark results."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from pytest_markdown_report.benchmarks import format_seconds
+
+pytest.importorskip("pytest_benchmark")
+
+
+def run_pytest(cwd: Path, *args: str, delay: str = "0.001") -> str:
+    """Run pytest in a project directory and return output."""
+    cmd = [sys.executable, "-m", "pytest", "-p", "no:cacheprovider", *list(args)]
+    result = subprocess.run(
+        cmd,
+        check=False,
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+        env={**os.environ, "DELAY": delay},
+    )
+    return result.stdout + result.stderr
+
+
+BENCHMARK_MODULE = """
+import os
+import time
+
+
+def test_sum(benchmark):
+    benchmark.pedantic(sum, args=(range(100),), rounds=20)
+
+
+def test_sleep(benchmark):
+    benchmark.pedantic(time.sleep, args=(float(os.environ["DELAY"]),), rounds=5)
+
+
+def test_plain():
+    pass
+"""
+
+
+def test_table_without_baseline(tmp_path: Path) -> None:
+    """Results are rendered as a compact table."""
+    (tmp_path / "test_perf.py").write_text(BENCHMARK_MODULE)
+    output = run_pytest(tmp_path)
+    assert "**Summary:** 3/3 passed\n" in output
+    assert "## Benchmarks\n\n| Benchmark | Mean | StdDev | Ops/s |\n" in output
+    assert "| test_perf.py::test_sleep | 1." in output
+    assert "| test_perf.py::test_sum | " in output
+    assert "test_plain" not in output
+    # pytest-benchmark's own table is not printed
+    assert "benchmark:" not in output
+
+
+def test_regression_reported_as_failure(tmp_path: Path) -> None:
+    """A mean above the baseline by more than the threshold is a failure."""
+    (tmp_path / "test_perf.py").write_text(BENCHMARK_MODULE)
+    run_pytest(tmp_path, "--benchmark-autosave")
+    output = run_pytest(tmp_path, "--benchmark-compare", "-k", "sleep", delay="0.004")
+    assert "**Summary:** 1/1 passed, 1 regressed" in output
+    assert "## Failures\n\n### test_perf.py::test_sleep REGRESSED" in output
+    assert "baseline (+" in output
+    assert "threshold 10%)" in output
+    assert "| vs baseline |" in output
+
+    output = run_pytest(
+        tmp_path,
+        "--benchmark-compare",
+        "-k",
+        "sleep",
+        "--markdown-benchmark-threshold=1000",
+        delay="0.004",
+    )
+    assert "regressed" not in output
+    assert "## Failures" not in output
+
+
+@pytest.mark.parametrize(
+    ("seconds", "text"),
+    [(2.5, "2.50s"), (0.0125, "12.50ms"), (3e-6, "3.00µs"), (4e-8, "40.00ns")],
+)
+def test_format_seconds(seconds: float, text: str) -> None:
+    """Durations use the largest unit keeping a value of at least 1."""
+    assert format_seconds(seconds) == text
@@ -0,0 +1,123 @@
+"""Test the partial report written when pytest is terminated."""
+
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.skipif(
+    sys.platform == "win32", reason="POSIX signals are delivered to the process"
+)
+
+HANGING_MODULE = """
+import time
+from pathlib import Path
+
+
+def test_ok():
+    pass
+
+
+def test_bad():
+    assert 1 == 2
+
+
+def test_hang():
+    Path("started").write_text("")
+    try:
+        time.sleep(30)
+    except KeyboardInterrupt:
+        # Swallow the first interrupt, as a stuck test or teardown would
+        Path("ignored").write_text("")
+        time.sleep(30)
+"""
+
+
+def start_pytest(cwd: Path, *args: str) -> subprocess.Popen[str]:
+    """Start pytest in a project and wait until the hanging test runs."""
+    (cwd / "test_mod.py").write_text(HANGING_MODULE)
+    cmd = [sys.executable, "-m", "pytest", "-p", "no:cacheprovider", *args]
+    process = subprocess.Popen(
+        cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    )
+    wait_for(cwd / "started")
+    return process
+
+
+def wait_for(path: Path) -> None:
+    """Wait for a file the test writes."""
+    deadline = time.monotonic() + 20
+    while not path.exists():
+        assert time.monotonic() < deadline, f"{path.name} never written"
+        time.sleep(0.05)
+
+
+def test_sigterm_writes_partial_report(tmp_path: Path) -> None:
+    """SIGTERM writes counts, the running test and failures, then terminates."""
+    process = start_pytest(tmp_path, "--markdown-report=report.md")
+    process.send_signal(signal.SIGTERM)
+    output, _ = process.communicate(timeout=10)
+
+    assert process.returncode == -signal.SIGTERM
+    assert output.startswith("# Test Report (partial)")
+    assert "**Summary:** 1/2 passed, 1 failed" in output
+    assert "**Interrupted:** SIGTERM received" in output
+    assert "- test_mod.py::test_hang (running for " in output
+    assert "### test_mod.py::test_bad FAILED" in output
+    assert (tmp_path / "report.md").read_text() == output
+
+
+def test_failure_blocks_limited_by_budget(tmp_path: Path) -> None:
+    """Past the budget, failure blocks are counted instead of rendered."""
+    process = start_pytest(tmp_path, "--markdown-crash-budget=0.000001")
+    process.send_signal(signal.SIGTERM)
+    output, _ = process.communicate(timeout=10)
+
+    assert "**Summary:** 1/2 passed, 1 failed" in output
+    assert "### test_mod.py::test_bad" not in output
+    assert "1 more not shown (out of time)" in output
+
+
+def test_interrupt_names_running_test(tmp_path: Path) -> None:
+    """A first SIGINT ends the session normally, naming the stopped test."""
+    process = start_pytest(tmp_path, "-q")
+    process.send_signal(signal.SIGINT)
+    wait_for(tmp_path / "ignored")
+    # Swallowed by the test: a second SIGINT writes the partial report
+    process.send_signal(signal.SIGINT)
+    output, _ = process.communicate(timeout=10)
+
+    partial, _, final = output.partition("**Summary:**")[2].partition("**Summary:**")
+    assert "**Interrupted:** SIGINT received" in partial
+    assert "- test_mod.py::test_hang (running for " in partial
+    assert "**Interrupted:** KeyboardInterrupt during test_mod.py::test_hang" in final
+
+
+def test_disabled(tmp_path: Path) -> None:
+    """With a zero budget, SIGTERM keeps its default behavior."""
+    process = start_pytest(tmp_path, "--markdown-crash-budget=0")
+    process.send_signal(signal.SIGTERM)
+    output, _ = process.communicate(timeout=10)
+
+    assert process.returncode == -signal.SIGTERM
+    assert "Summary" not in output
+
+
+def test_shared_report_lock_does_not_block_flush(tmp_path: Path) -> None:
+    """A shared report locked by another process is skipped, not waited for."""
+    fcntl = pytest.importorskip("fcntl")
+    with (tmp_path / "report.md.lock").open("a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        process = start_pytest(
+            tmp_path, "--markdown-report=report.md", "--markdown-report-shared=env"
+        )
+        process.send_signal(signal.SIGTERM)
+        output, _ = process.communicate(timeout=10)
+
+    assert process.returncode == -signal.SIGTERM
+    assert output.startswith("# Test Report (partial)")
+    assert "Warning: Could not write to report.md" in output
+    assert not (tmp_path / "report.md").exists()
@@ -0,0 +1,88 @@
+"""Test fixture cost accounting (--markdown-fixture-costs)."""
+
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+
+def run_pytest(*args: str) -> str:
+    """Run pytest with given args and return output."""
+    cmd = [sys.executable, "-m", "pytest", *list(args)]
+    result = subprocess.run(
+        cmd,
+        check=False,
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).parent,
+    )
+    return result.stdout + result.stderr
+
+
+def test_fixture_costs_section() -> None:
+    """Test ranking, teardown timing and the wider scope hint."""
+    test_file = Path(__file__).parent / "test_fixture_costs_temp.py"
+    test_file.write_text("""
+import time
+import pytest
+
+@pytest.fixture
+def slow_setup():
+    time.sleep(0.05)
+
+@pytest.fixture
+def slow_teardown():
+    yield
+    time.sleep(0.1)
+
+@pytest.fixture(params=[1, 2])
+def distinct_params(request):
+    time.sleep(0.01)
+    return request.param
+
+@pytest.mark.parametrize("n", range(3))
+def test_setup(slow_setup, n):
+    pass
+
+def test_teardown(slow_teardown):
+    pass
+
+def test_params(distinct_params):
+    pass
+
+@pytest.fixture
+def uses_tmp_path(tmp_path):
+    time.sleep(0.01)
+    return tmp_path
+
+@pytest.mark.parametrize("n", range(2))
+def test_tmp_path(uses_tmp_path, n):
+    pass
+""")
+
+    try:
+        actual = run_pytest(str(test_file), "--markdown-fixture-costs=2")
+
+        assert "**Summary:** 8/8 passed" in actual
+        section = actual[actual.index("## Fixture costs") :]
+        lines = [line for line in section.splitlines() if line.startswith("- ")]
+        assert len(lines) == 2
+        assert re.match(
+            r"- 0\.1\ds slow_setup \(tests/test_fixture_costs_temp.py:5\), "
+            r"function scope, 3 setups \(\d+\.\dms avg\), candidate for wider scope",
+            lines[0],
+        )
+        # Teardown time counts, but one instance is no scope candidate
+        assert lines[1].startswith("- 0.1")
+        assert "slow_teardown" in lines[1]
+        assert "1 setups" in lines[1]
+        assert "candidate" not in lines[1]
+        assert "distinct_params" not in section
+
+        actual = run_pytest(str(test_file), "--markdown-fixture-costs=10")
+        section = actual[actual.index("## Fixture costs") :]
+        # Needs a function-scoped fixture, or comes with pytest
+        assert re.search(r"- \S+ uses_tmp_path .*2 setups[^,\n]*\n", section)
+        assert re.search(r"- \S+ tmp_path \(\w+\.py:\d+\).*setups[^,\n]*\n", section)
+    finally:
+        test_file.unlink(missing_ok=True)
@@ -0,0 +1,140 @@
+"""Test the SQLite history of outcomes and durations."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from pytest_markdown_report.history import (
+    connect,
+    duration_trends,
+    failure_trends,
+    main,
+    record_session,
+)
+
+
+def run_pytest(cwd: Path, *args: str) -> str:
+    """Run pytest in a project directory and return output."""
+    cmd = [sys.executable, "-m", "pytest", *list(args)]
+    result = subprocess.run(
+        cmd,
+        check=False,
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+    )
+    return result.stdout + result.stderr
+
+
+ALTERNATING_MODULE = """
+from pathlib import Path
+
+RUNS = Path(__file__).parent / "runs"
+
+
+def test_stable():
+    pass
+
+
+def test_alternating():
+    runs = int(RUNS.read_text()) + 1 if RUNS.exists() else 1
+    RUNS.write_text(str(runs))
+    assert runs % 2 == 0, "odd run"
+
+
+def test_broken():
+    assert False
+"""
+
+
+def test_sessions_recorded_and_queried(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Each session appends its outcomes, the CLI ranks tests by failure rate."""
+    (tmp_path / "test_mod.py").write_text(ALTERNATING_MODULE)
+    for _ in range(2):
+        run_pytest(tmp_path, "-p", "no:cacheprovider", "--markdown-history=hist.db")
+
+    assert main([str(tmp_path / "hist.db"), "failures"]) == 0
+    output = capsys.readouterr().out
+    assert "**Sessions:** 2" in output
+    lines = [line for line in output.splitlines() if "test_mod.py::" in line]
+    # Consistent failure first, then the one that failed once, never the stable one
+    assert lines[0].startswith("| test_mod.py::test_broken | 2 | 2 | 100% |")
+    assert lines[1].startswith("| test_mod.py::test_alternating | 2 | 1 | 50% |")
+    assert len(lines) == 2
+
+    assert main([str(tmp_path / "hist.db"), "durations", "--match", "stable"]) == 0
+    output = capsys.readouterr().out
+    assert "| Test | Runs | p50 | p90 | p99 |" in output
+    assert "| test_mod.py::test_stable | 2 |" in output
+    assert "test_broken" not in output
+
+
+def test_unwritable_history_warns(tmp_path: Path) -> None:
+    """A history that cannot be written only warns, the report is unaffected."""
+    (tmp_path / "test_mod.py").write_text("def test_ok():\n    pass\n")
+    (tmp_path / "blocker").write_text("")
+    output = run_pytest(tmp_path, "--markdown-history=blocker/hist.db")
+    assert "**Summary:** 1/1 passed" in output
+    assert "Warning: Could not record history in blocker/hist.db" in output
+
+
+def test_bulk_sessions(tmp_path: Path) -> None:
+    """Large sessions are written in batches and aggregated per test."""
+    path = tmp_path / "hist.db"
+    for session in range(3):
+        results = (
+            (
+                f"test_mod.py::test_{i}",
+                "failed" if i % 1000 == session else "passed",
+                i / 1000,
+            )
+            for i in range(25_000)
+        )
+        record_session(path, 1000.0 + session, results)
+
+    connection = connect(path)
+    try:
+        assert connection.execute("SELECT COUNT(*) FROM tests").fetchone() == (25_000,)
+        failures = failure_trends(connection, top=100)
+        # Tests i % 1000 in (0, 1, 2) failed in exactly one session each
+        assert len(failures) == 75
+        assert failures[0][1:3] == (3, 1)
+        assert {started for *_, started in failures} == {1000.0, 1001.0, 1002.0}
+        slowest = duration_trends(connection, top=2)
+        assert slowest[0] == ("test_mod.py::test_24999", 3, 24.999, 24.999, 24.999)
+        assert slowest[1][0] == "test_mod.py::test_24998"
+    finally:
+        connection.close()
+
+
+def test_match_is_literal(tmp_path: Path) -> None:
+    """Underscores and percent signs in --match are not wildcards."""
+    path = tmp_path / "hist.db"
+    results = [
+        ("test_mod.py::test_a", "failed", 0.1),
+        ("test_mod.py::testXa", "failed", 0.2),
+        ("test_mod.py::test_rate[100%]", "failed", 0.3),
+        ("test_mod.py::test_rate[100]", "failed", 0.4),
+    ]
+    record_session(path, 1000.0, results)
+
+    connection = connect(path)
+    try:
+        failures = failure_trends(connection, top=10, match="test_a")
+        assert [nodeid for nodeid, *_ in failures] == ["test_mod.py::test_a"]
+        slowest = duration_trends(connection, top=10, match="[100%")
+        assert [nodeid for nodeid, *_ in slowest] == ["test_mod.py::test_rate[100%]"]
+        assert len(failure_trends(connection, top=10)) == 4
+    finally:
+        connection.close()
+
+
+def test_missing_database(tmp_path: Path) -> None:
+    """The CLI refuses to create a database it was asked to read."""
+    with pytest.raises(SystemExit):
+        main([str(tmp_path / "missing.db"), "failures"])
+    assert not (tmp_path / "missing.db").exists()
@@ -0,0 +1,79 @@
+"""Test the ranking of tests by time spent waiting rather than computing."""
+
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+
+def run_pytest(cwd: Path, *args: str) -> str:
+    """Run pytest in a project directory and return output."""
+    cmd = [sys.executable, "-m", "pytest", "-p", "no:cacheprovider", *list(args)]
+    result = subprocess.run(cmd, check=False, capture_output=True, text=True, cwd=cwd)
+    return result.stdout + result.stderr
+
+
+IDLE_MODULE = """
+import subprocess
+import sys
+import time
+
+import pytest
+
+
+@pytest.fixture
+def slow_fixture():
+    time.sleep(0.1)
+    yield
+    time.sleep(0.1)
+
+
+def test_sleep():
+    time.sleep(0.3)
+
+
+def test_fixture_wait(slow_fixture):
+    pass
+
+
+def test_subprocess():
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+
+
+def test_compute():
+    end = time.perf_counter() + 0.3
+    while time.perf_counter() < end:
+        pass
+
+
+def test_fast():
+    pass
+"""
+
+
+def test_idle_ranking(tmp_path: Path) -> None:
+    """Waiting tests are ranked by idle time, busy ones are left out."""
+    (tmp_path / "test_idle.py").write_text(IDLE_MODULE)
+    output = run_pytest(tmp_path, "--markdown-idle-time=5")
+    assert "**Summary:** 5/5 passed\n" in output
+    assert "## Idle Time\n\n**Idle:** " in output
+    assert "| Test | Wall | CPU | Thread CPU | Idle |\n" in output
+    # Setup and teardown waits count, subprocess CPU time is not the test's
+    sleep = output.index("| test_idle.py::test_sleep | 0.3")
+    fixture = output.index("| test_idle.py::test_fixture_wait | 0.2")
+    assert sleep < fixture
+    assert "| test_idle.py::test_subprocess |" in output
+    # Busy tests wait little, if at all
+    assert "test_compute" not in output[:fixture]
+    assert "test_fast" not in output
+
+
+def test_idle_top(tmp_path: Path) -> None:
+    """Only the top tests are listed, totals cover all of them."""
+    (tmp_path / "test_idle.py").write_text(IDLE_MODULE)
+    output = run_pytest(tmp_path, "--markdown-idle-time=1")
+    assert "| test_idle.py::test_sleep |" in output
+    assert "test_fixture_wait" not in output
+    idle_total = re.search(r"\*\*Idle:\*\* ([\d.]+)s of", output)
+    assert idle_total
+    assert float(idle_total[1]) >= 0.5
@@ -0,0 +1,130 @@
+"""Test dependency recording and affected-test selection."""
+
+import subprocess
+import sys
+from pathlib import Path
+from types import CodeType, SimpleNamespace
+
+import pytest
+
+from pytest_markdown_report.impact import ImpactMap, ImpactRecorder, file_digest
+
+
+def run_pytest(cwd: Path, *args: str) -> str:
+    """Run pytest in a project directory and return output."""
+    cmd = [sys.executable, "-m", "pytest", *list(args)]
+    result = subprocess.run(
+        cmd,
+        check=False,
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+    )
+    return result.stdout + result.stderr
+
+
+def write_project(root: Path) -> None:
+    """Write two library modules and tests depending on one each."""
+    (root / "lib_a.py").write_text("def value():\n    return 1\n")
+    (root / "lib_b.py").write_text("def value():\n    return 2\n")
+    (root / "test_libs.py").write_text("""
+import lib_a
+import lib_b
+
+def test_uses_a():
+    assert lib_a.value() == 1
+
+def test_uses_b():
+    assert lib_b.value() == 2
+
+def test_fails_on_b():
+    assert lib_b.value() == 3
+""")
+
+
+def test_affected_selects_changed_dependencies(tmp_path: Path) -> None:
+    """Test that only tests depending on an edited file are rerun."""
+    write_project(tmp_path)
+    recorded = run_pytest(tmp_path, "--markdown-record-impact", "-q")
+    assert "**Summary:** 2/3 passed, 1 failed" in recorded
+    assert "Re-run failed: `pytest --markdown-affected`" in recorded
+
+    # Unchanged tree: only the last failure is selected again
+    unchanged = run_pytest(tmp_path, "--markdown-affected", "-v")
+    assert "**Summary:** 0/1 passed, 1 failed" in unchanged
+
+    (tmp_path / "lib_a.py").write_text("def value():\n    return 10\n")
+    edited = run_pytest(tmp_path, "--markdown-affected", "-v")
+
+    assert "**Summary:** 0/2 passed, 2 failed" in edited
+    assert "test_uses_a FAILED" in edited
+    assert "test_fails_on_b FAILED" in edited
+    assert "test_uses_b" not in edited
+
+
+def test_map_keeps_versions_of_tests_not_rerun(tmp_path: Path) -> None:
+    """Test that a partial rerun does not refresh other tests' versions."""
+    lib = tmp_path / "lib.py"
+    lib.write_text("old")
+    old = file_digest(lib)
+    impact_map = ImpactMap()
+    impact_map.update({"t::a": {"lib.py": old}, "t::b": {"lib.py": old}}, set())
+
+    lib.write_text("new")
+    impact_map.update({"t::a": {"lib.py": file_digest(lib)}}, set())
+
+    assert impact_map.affected(["t::a", "t::b", "t::new"], tmp_path) == {
+        "t::b",
+        "t::new",
+    }
+    assert len(impact_map.files) == 2
+
+
+@pytest.mark.skipif(sys.version_info < (3, 12), reason="sys.monitoring")
+def test_other_tools_events_stay_disabled(tmp_path: Path) -> None:
+    """Recording re-arms its own events only, not another tool's (coverage)."""
+    monitoring = sys.monitoring
+    tool_id = monitoring.COVERAGE_ID
+    if monitoring.get_tool(tool_id) is not None:
+        pytest.skip("coverage runs on sys.monitoring")
+    config = SimpleNamespace(rootpath=tmp_path)
+    recorder = ImpactRecorder(config, select_affected=False)
+    calls = []
+
+    def on_py_start(code: object, _offset: int) -> object:
+        calls.append(code)
+        return monitoring.DISABLE
+
+    def work() -> None:
+        pass
+
+    # Wrapped before the recorder registers its callback
+    on_recorder_start = recorder._on_py_start
+    recorded = []
+
+    def counting(code: CodeType, offset: int) -> object:
+        recorded.append(code)
+        return on_recorder_start(code, offset)
+
+    recorder._on_py_start = counting
+    monitoring.use_tool_id(tool_id, "other")
+    monitoring.register_callback(tool_id, monitoring.events.PY_START, on_py_start)
+    monitoring.set_events(tool_id, monitoring.events.PY_START)
+    recorder.pytest_sessionstart()
+    try:
+        for _ in range(3):
+            recorder._filenames = set()
+            recorder._start()
+            work()
+            work()
+            recorder._stop()
+            # Each test records the function again
+            assert __file__ in recorder._filenames
+    finally:
+        recorder.pytest_sessionfinish()
+        monitoring.set_events(tool_id, 0)
+        monitoring.register_callback(tool_id, monitoring.events.PY_START, None)
+        monitoring.free_tool_id(tool_id)
+    assert sum(code is work.__code__ for code in calls) == 1
+    # Once per test, not once per call
+    assert sum(code is work.__code__ for code in recorded) == 3
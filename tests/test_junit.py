@@ -0,0 +1,99 @@
+"""Test the streaming JUnit XML writer."""
+
+import subprocess
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from pytest_markdown_report.junit import junit_names
+
+
+def run_pytest(cwd: Path, *args: str) -> str:
+    """Run pytest in a project directory and return output."""
+    cmd = [sys.executable, "-m", "pytest", *list(args)]
+    result = subprocess.run(
+        cmd,
+        check=False,
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+    )
+    return result.stdout + result.stderr
+
+
+def test_junit_names() -> None:
+    """Test that nodeids map to JUnit classnames like pytest's own."""
+    assert junit_names("tests/test_x.py::TestA::test_b[1]") == (
+        "tests.test_x.TestA",
+        "test_b[1]",
+    )
+    assert junit_names("test_x.py::test_a") == ("test_x", "test_a")
+    assert junit_names("tests/test_x.py") == ("", "tests.test_x")
+
+
+def test_junit_matches_markdown_categories(tmp_path: Path) -> None:
+    """Test that xpass is a failure, setup errors errors, and counts add up."""
+    (tmp_path / "test_mixed.py").write_text("""
+import pytest
+
+@pytest.fixture
+def broken():
+    raise RuntimeError("setup <boom>")
+
+def test_pass():
+    pass
+
+def test_fail():
+    assert 1 == 2, "bad \\x1b[31m value"
+
+def test_error(broken):
+    pass
+
+@pytest.mark.skip(reason="not now")
+def test_skip():
+    pass
+
+@pytest.mark.xfail(reason="known")
+def test_xfail():
+    assert False
+
+@pytest.mark.xfail(reason="fixed?")
+def test_xpass():
+    pass
+""")
+    xml_path = tmp_path / "reports" / "junit.xml"
+
+    output = run_pytest(tmp_path, f"--markdown-junitxml={xml_path}")
+
+    assert "**Summary:** 1/6 passed, 3 failed, 1 skipped, 1 xfail" in output
+    suite = ET.parse(xml_path).getroot().find("testsuite")  # noqa: S314 - own output
+    assert suite is not None
+    assert {key: suite.get(key) for key in ("tests", "failures", "errors")} == {
+        "tests": "6",
+        "failures": "2",
+        "errors": "1",
+    }
+    assert suite.get("skipped") == "2"
+    outcomes = {case.get("name"): [child.tag for child in case] for case in suite}
+    assert outcomes == {
+        "test_pass": [],
+        "test_fail": ["failure"],
+        "test_error": ["error"],
+        "test_skip": ["skipped"],
+        "test_xfail": ["skipped"],
+        "test_xpass": ["failure"],
+    }
+    error = suite.find("testcase[@name='test_error']/error")
+    assert error is not None
+    assert error.get("message") == "RuntimeError: setup <boom>"
+
+
+def test_junit_unwritable_path_warns(tmp_path: Path) -> None:
+    """A JUnit file that cannot be created is reported, not silently skipped."""
+    (tmp_path / "test_x.py").write_text("def test_pass():\n    pass\n")
+    (tmp_path / "not_a_dir").write_text("")
+
+    output = run_pytest(tmp_path, "--markdown-junitxml=not_a_dir/out.xml")
+
+    assert "Warning: Could not write to not_a_dir/out.xml" in output
+    assert "**Summary:** 1/1 passed" in output
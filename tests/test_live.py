@@ -0,0 +1,91 @@
+"""Test live failure streaming (--markdown-live)."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+LIVE_TESTS = """
+import pytest
+
+@pytest.fixture
+def broken_fixture():
+    raise RuntimeError("Setup failed")
+
+def test_fails():
+    assert 1 == 2
+
+def test_setup_error(broken_fixture):
+    pass
+
+def test_passes():
+    assert True
+"""
+
+
+def run_pytest(*args: str) -> str:
+    """Run pytest with given args and return output."""
+    cmd = [sys.executable, "-m", "pytest", *list(args)]
+    result = subprocess.run(
+        cmd,
+        check=False,
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).parent,
+    )
+    return result.stdout + result.stderr
+
+
+def test_live_blocks_precede_summary() -> None:
+    """Test that failure blocks are streamed before the final report."""
+    test_file = Path(__file__).parent / "test_live_temp.py"
+    test_file.write_text(LIVE_TESTS)
+
+    try:
+        actual = run_pytest(str(test_file), "--markdown-live")
+
+        report_idx = actual.index("# Test Report")
+        assert actual.index("test_fails FAILED") < report_idx
+        assert actual.index("test_setup_error ERROR in setup") < report_idx
+
+        # Each block appears exactly once, empty sections are dropped
+        assert actual.count("test_fails FAILED") == 1
+        assert actual.count("RuntimeError: Setup failed") == 1
+        assert "## Failures" not in actual
+        assert "## Errors" not in actual
+        assert "**Summary:** 1/3 passed, 2 failed" in actual
+    finally:
+        test_file.unlink(missing_ok=True)
+
+
+def test_live_respects_report_flags() -> None:
+    """Test that hidden sections are neither streamed nor reported."""
+    test_file = Path(__file__).parent / "test_live_flags_temp.py"
+    test_file.write_text(LIVE_TESTS)
+
+    try:
+        actual = run_pytest(str(test_file), "--markdown-live", "-rf")
+
+        assert actual.index("test_fails FAILED") < actual.index("# Test Report")
+        assert "test_setup_error" not in actual
+    finally:
+        test_file.unlink(missing_ok=True)
+
+
+def test_live_report_file_is_complete(tmp_path: Path) -> None:
+    """Test that the report file keeps the streamed failure blocks."""
+    test_file = Path(__file__).parent / "test_live_file_temp.py"
+    test_file.write_text(LIVE_TESTS)
+    report_file = tmp_path / "report.md"
+
+    try:
+        run_pytest(
+            str(test_file), "--markdown-live", f"--markdown-report={report_file}"
+        )
+
+        content = report_file.read_text()
+        assert content.startswith("# Test Report")
+        assert "## Errors" in content
+        assert "## Failures" in content
+        assert "test_fails FAILED" in content
+    finally:
+        test_file.unlink(missing_ok=True)
@@ -0,0 +1,88 @@
+"""Test per-test memory tracking (--markdown-memory)."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+from pytest_markdown_report.memory import MemoryTracker, format_bytes
+from pytest_markdown_report.ranking import push_top
+
+
+def run_pytest(*args: str) -> str:
+    """Run pytest with given args and return output."""
+    cmd = [sys.executable, "-m", "pytest", *list(args)]
+    result = subprocess.run(
+        cmd,
+        check=False,
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).parent,
+    )
+    return result.stdout + result.stderr
+
+
+def test_format_bytes() -> None:
+    """Test byte counts are shown with binary units."""
+    assert format_bytes(512) == "512 B"
+    assert format_bytes(1536) == "1.5 KiB"
+    assert format_bytes(3 * 1024**3) == "3.0 GiB"
+
+
+def test_rankings_keep_top_entries() -> None:
+    """Test that only the largest entries are kept, largest first."""
+    tracker = MemoryTracker(top=2)
+    for size, nodeid in [(10, "a"), (30, "b"), (20, "c"), (5, "d")]:
+        push_top(tracker.peaks, (size, nodeid), tracker.top)
+
+    assert tracker._format_ranking(tracker.peaks) == ["- 30 B b", "- 20 B c", ""]
+
+
+def test_memory_section() -> None:
+    """Test that peak and retained memory are attributed to their tests."""
+    test_file = Path(__file__).parent / "test_memory_temp.py"
+    test_file.write_text("""
+LEAKED = []
+
+def test_big_peak():
+    data = bytearray(8 * 1024 * 1024)
+    del data
+
+def test_leaks():
+    LEAKED.append(bytearray(2 * 1024 * 1024))
+
+def test_small():
+    assert True
+""")
+
+    try:
+        actual = run_pytest(str(test_file), "--markdown-memory=2")
+
+        assert "**Summary:** 3/3 passed" in actual
+        peaks, _, retained = actual.partition("**Retained after teardown:**")
+        assert "MiB tests/test_memory_temp.py::test_big_peak" in peaks
+        assert "MiB tests/test_memory_temp.py::test_leaks" in peaks
+        assert "test_small" not in peaks
+        assert "MiB tests/test_memory_temp.py::test_leaks" in retained
+        assert "test_big_peak" not in retained
+    finally:
+        test_file.unlink(missing_ok=True)
+
+
+def test_rss_source() -> None:
+    """Test that the cheap RSS source attributes a large peak."""
+    test_file = Path(__file__).parent / "test_memory_rss_temp.py"
+    test_file.write_text("""
+def test_big_peak():
+    data = bytearray(64 * 1024 * 1024)
+    data[::4096] = b"x" * len(data[::4096])
+""")
+
+    try:
+        actual = run_pytest(
+            str(test_file), "--markdown-memory=2", "--markdown-memory-source=rss"
+        )
+
+        assert "**Summary:** 1/1 passed" in actual
+        assert "MiB tests/test_memory_rss_temp.py::test_big_peak" in actual
+    finally:
+        test_file.unlink(missing_ok=True)
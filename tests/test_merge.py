@@ -0,0 +1,265 @@
+"""Test merging the reports of several shards."""
+
+import subprocess
+import sys
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from pytest_markdown_report.merge import ShardReport, main, write_merged
+
+
+def run_pytest(cwd: Path, *args: str) -> str:
+    """Run pytest in a project directory and return output."""
+    cmd = [sys.executable, "-m", "pytest", *list(args)]
+    result = subprocess.run(
+        cmd,
+        check=False,
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+    )
+    return result.stdout + result.stderr
+
+
+SUITE = """
+import warnings
+
+import pytest
+
+warnings.warn("deprecated module", DeprecationWarning)
+
+
+@pytest.mark.parametrize("n", range(6))
+def test_value(n):
+    assert n % 3, "multiple of three"
+
+
+@pytest.mark.skip(reason="not supported")
+def test_skipped():
+    pass
+"""
+
+
+def shard_report(title: str, summary: str, *sections: str) -> str:
+    """Build a report in the plugin's format."""
+    return "\n\n".join([f"# {title}", f"**Summary:** {summary}", *sections]) + "\n"
+
+
+def test_merged_shards_match_full_run(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Merging the shards of a suite gives the report of the whole suite."""
+    (tmp_path / "test_mod.py").write_text(SUITE)
+    full = run_pytest(tmp_path, "-p", "no:cacheprovider", "-rA")
+    for index in (1, 2, 3):
+        run_pytest(
+            tmp_path,
+            "-p",
+            "no:cacheprovider",
+            "-rA",
+            f"--markdown-shard={index}/3",
+            f"--markdown-report=shard{index}.md",
+        )
+
+    paths = [str(tmp_path / f"shard{index}.md") for index in (1, 2, 3)]
+    assert main(paths) == 0
+    merged = capsys.readouterr().out
+
+    assert "**Summary:** 4/7 passed, 2 failed, 1 skipped" in full
+    assert "**Summary:** 4/7 passed, 2 failed, 1 skipped" in merged
+    assert "**Merged:** 3 reports" in merged
+    for heading in ("## Failures", "## Skipped", "## Passes", "## Warnings"):
+        assert merged.count(heading) == 1
+    assert merged.index("test_value[0] FAILED") < merged.index("test_value[3] FAILED")
+    # Each shard collected the module and recorded its warning
+    assert merged.count("deprecated module") == 1
+    assert merged.endswith("\n")
+    assert not merged.endswith("\n\n")
+
+
+def test_code_blocks_are_not_parsed(tmp_path: Path) -> None:
+    """Headings and list items inside tracebacks belong to their block."""
+    traceback = "```python\n## not a section\n- not an item\nE   assert 0\n```"
+    (tmp_path / "a.md").write_text(
+        shard_report(
+            "Test Report",
+            "0/1 passed, 1 failed",
+            "## Failures",
+            f"### test_a.py::test_one FAILED\n\n{traceback}",
+        )
+    )
+    report = ShardReport(tmp_path / "a.md")
+    try:
+        assert list(report.sections) == ["Failures"]
+        entries = list(report.iter_entries("Failures"))
+    finally:
+        report.close()
+    assert len(entries) == 1
+    assert entries[0][1].endswith(b"E   assert 0\n```")
+
+
+def test_subtest_lists_stay_in_their_block(tmp_path: Path) -> None:
+    """List items inside a failure block are not merged as entries."""
+    (tmp_path / "a.md").write_text(
+        shard_report(
+            "Test Report",
+            "0/1 passed, 1 failed",
+            "## Failures",
+            "### tests/test_a.py::test_a FAILED\n\n"
+            "**Subtests:** 1 passed, 2 failed\n\n"
+            "- [x=1]: assert 1 == 0\n- [x=2]: assert 2 == 0\n\n"
+            "```python\nE   assert 1 == 0\n```",
+        )
+    )
+    (tmp_path / "b.md").write_text(
+        shard_report(
+            "Test Report",
+            "0/1 passed, 1 failed",
+            "## Failures",
+            "### tests/test_b.py::test_b FAILED\n\n```python\nE   assert 0\n```",
+        )
+    )
+    output = tmp_path / "merged.md"
+    assert (
+        main([str(tmp_path / "a.md"), str(tmp_path / "b.md"), "-o", str(output)]) == 0
+    )
+    merged = output.read_text()
+    test_a = merged.index("### tests/test_a.py::test_a FAILED")
+    subtests = merged.index("- [x=2]: assert 2 == 0\n\n```python\nE   assert 1 == 0")
+    test_b = merged.index("### tests/test_b.py::test_b FAILED")
+    assert test_a < subtests < test_b
+    assert "**Summary:** 0/2 passed, 2 failed" in merged
+
+
+def test_collection_errors_and_notes(tmp_path: Path) -> None:
+    """Collection error reports become a section, notes are kept once."""
+    (tmp_path / "a.md").write_text(
+        "# Collection Errors\n\n**1 collection error**\n\n### test_c.py\n\n"
+        "```python\nE   ImportError\n```\n"
+    )
+    (tmp_path / "b.md").write_text(
+        "**Summary:** 1/2 passed, 1 failed\n\nRe-run failed: `pytest --lf`\n"
+    )
+    (tmp_path / "c.md").write_text(
+        "**Summary:** 0/1 passed, 1 failed\n\nRe-run failed: `pytest --lf`\n"
+    )
+    output = tmp_path / "merged.md"
+    assert (
+        main(
+            [str(tmp_path / name) for name in ("a.md", "b.md", "c.md")]
+            + [
+                "-o",
+                str(output),
+            ]
+        )
+        == 0
+    )
+    merged = output.read_text()
+    assert "**Summary:** 1/3 passed, 2 failed, 1 collection error" in merged
+    assert merged.count("Re-run failed") == 1
+    assert "## Collection Errors\n\n### test_c.py" in merged
+    assert "**1 collection error**" not in merged
+
+
+def test_memory_bounded_by_entry_size(tmp_path: Path) -> None:
+    """Merging many large reports holds one entry per report in memory."""
+    traceback = "```python\n" + "E   assert 0\n" * 50 + "```"
+    for shard in range(100):
+        blocks = "\n\n".join(
+            f"### test_{shard:03}.py::test_{n:04} FAILED\n\n{traceback}"
+            for n in range(300)
+        )
+        (tmp_path / f"{shard}.md").write_text(
+            shard_report(
+                "Test Report", "0/300 passed, 300 failed", "## Failures", blocks
+            )
+        )
+
+    reports = [ShardReport(tmp_path / f"{shard}.md") for shard in range(100)]
+    output = tmp_path / "merged.md"
+    tracemalloc.start()
+    try:
+        with output.open("wb") as out:
+            write_merged(reports, out)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        for report in reports:
+            report.close()
+
+    merged = output.read_text()
+    assert "**Summary:** 0/30000 passed, 30000 failed" in merged
+    assert merged.count(" FAILED") == 30_000
+    # About 20 MB merged, far from being held in memory
+    assert output.stat().st_size > 20_000_000
+    assert peak < 2_000_000
+
+
+def test_rankings_and_rollup_merged_by_value(tmp_path: Path) -> None:
+    """Rankings keep largest first, roll-up counts add up per container."""
+    (tmp_path / "a.md").write_text(
+        shard_report(
+            "Test Report",
+            "1/3 passed, 2 failed",
+            "## Roll-up",
+            "- tests/ 1/3 passed, 2 failed\n  - test_a.py 0/2 passed, 2 failed\n"
+            "  - 1 more without failures (1 tests)",
+            "## Memory",
+            "**Peak allocation:**\n\n- 2.0 MiB test_a.py::test_big\n"
+            "- 900 B test_a.py::test_small\n\n**Retained after teardown:**\n\n"
+            "- 10.0 KiB test_a.py::test_big",
+            "## Slow collection",
+            "**Collection:** 0.40s\n\n- 0.30s tests/test_a.py\n- 0.05s tests/test_b.py",
+        )
+    )
+    (tmp_path / "b.md").write_text(
+        shard_report(
+            "Test Report",
+            "2/3 passed, 1 failed",
+            "## Roll-up",
+            "- tests/ 2/3 passed, 1 failed\n  - test_a.py 1/2 passed, 1 failed\n"
+            "  - 1 more without failures (1 tests)",
+            "## Memory",
+            "**Peak allocation:**\n\n- 1.5 KiB test_a.py::test_mid",
+            "## Slow collection",
+            "**Collection:** 0.40s\n\n- 0.20s tests/test_a.py\n- 0.10s tests/test_b.py",
+        )
+    )
+    output = tmp_path / "merged.md"
+    assert (
+        main([str(tmp_path / "a.md"), str(tmp_path / "b.md"), "-o", str(output)]) == 0
+    )
+    merged = output.read_text()
+    assert (
+        "## Roll-up\n\n- tests/ 3/6 passed, 3 failed\n"
+        "  - test_a.py 1/4 passed, 3 failed\n"
+        "  - 2 more without failures (2 tests)\n\n"
+    ) in merged
+    assert (
+        "## Memory\n\n**Peak allocation:**\n\n- 2.0 MiB test_a.py::test_big\n"
+        "- 1.5 KiB test_a.py::test_mid\n- 900 B test_a.py::test_small\n\n"
+        "**Retained after teardown:**\n\n- 10.0 KiB test_a.py::test_big\n\n"
+    ) in merged
+    # Every shard collects every file: each is listed once, at its slowest
+    assert (
+        "## Slow collection\n\n**Collection:** 0.40s\n\n- 0.30s tests/test_a.py\n"
+        "- 0.10s tests/test_b.py\n"
+    ) in merged
+
+
+def test_collection_errors_counted_once(tmp_path: Path) -> None:
+    """The same collection error reported by every shard is counted once."""
+    for name in ("a.md", "b.md"):
+        (tmp_path / name).write_text(
+            "# Collection Errors\n\n**1 collection error**\n\n### test_c.py\n\n"
+            "```python\nE   ImportError\n```\n"
+        )
+    output = tmp_path / "merged.md"
+    assert (
+        main([str(tmp_path / "a.md"), str(tmp_path / "b.md"), "-o", str(output)]) == 0
+    )
+    merged = output.read_text()
+    assert "1 collection error\n" in merged
+    assert merged.count("### test_c.py") == 1
@@ -0,0 +1,87 @@
+"""Test traceback normalization."""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from pytest_markdown_report.normalize import (
+    NORMALIZE_RULES,
+    TracebackNormalizer,
+    parse_rules,
+)
+
+ROOT = Path("/work/project")
+TRACEBACK = """\
+/work/project/tests/test_api.py:12: in test_get
+    response = client.get(url)
+/home/ci/.venv/lib/python3.12/site-packages/httpx/_client.py:1054: in get
+    return self.request("GET", url)
+E   \x1b[31mValueError\x1b[0m: <Client object at 0x7f3a2b1c0d10> rejected 0xdeadbeef
+E   path: '/tmp/pytest-of-ci/pytest-42/test_get0/config.toml'
+"""
+
+
+def run_pytest(cwd: Path, *args: str) -> str:
+    """Run pytest in a project directory and return output."""
+    cmd = [sys.executable, "-m", "pytest", *list(args)]
+    result = subprocess.run(
+        cmd,
+        check=False,
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+    )
+    return result.stdout + result.stderr
+
+
+def test_all_rules_in_one_pass() -> None:
+    """Test that every kind of noise becomes a stable placeholder."""
+    normalizer = TracebackNormalizer(NORMALIZE_RULES, ROOT)
+
+    assert normalizer.normalize(TRACEBACK) == (
+        "tests/test_api.py:12: in test_get\n"
+        "    response = client.get(url)\n"
+        "<site-packages>/httpx/_client.py:1054: in get\n"
+        '    return self.request("GET", url)\n'
+        "E   ValueError: <Client object at 0x…> rejected 0xdeadbeef\n"
+        "E   path: '<tmp>/config.toml'\n"
+    )
+
+
+def test_rules_are_selectable() -> None:
+    """Test that disabled rules leave their noise untouched."""
+    normalizer = TracebackNormalizer(parse_rules("ansi,addresses"), ROOT)
+    text = normalizer.normalize(TRACEBACK)
+
+    assert "\x1b[" not in text
+    assert "0x7f3a2b1c0d10" not in text
+    assert "/work/project/tests" in text
+    assert "pytest-of-ci/pytest-42" in text
+    assert TracebackNormalizer((), ROOT).normalize(TRACEBACK) == TRACEBACK
+
+
+def test_parse_rules() -> None:
+    """Test the all/none shortcuts and unknown names."""
+    assert parse_rules("all") == NORMALIZE_RULES
+    assert parse_rules("none") == ()
+    assert parse_rules("tmp, paths") == ("tmp", "paths")
+    with pytest.raises(argparse.ArgumentTypeError, match="unknown rule colors"):
+        parse_rules("ansi,colors")
+
+
+def test_report_shows_normalized_tmp_path(tmp_path: Path) -> None:
+    """Test that tracebacks in the report are normalized by default."""
+    (tmp_path / "test_tmp.py").write_text("""
+def test_reads(tmp_path):
+    assert not tmp_path.exists(), str(tmp_path / "data.txt")
+""")
+
+    normalized = run_pytest(tmp_path)
+    raw = run_pytest(tmp_path, "--markdown-normalize=none")
+
+    assert "AssertionError: <tmp>/data.txt" in normalized
+    assert "pytest-of-" not in normalized
+    assert "pytest-of-" in raw
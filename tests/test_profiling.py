@@ -0,0 +1,96 @@
+"""Test slow test profiles (--markdown-profile-slow)."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+
+def run_pytest(*args: str) -> str:
+    """Run pytest with given args and return output."""
+    cmd = [sys.executable, "-m", "pytest", *list(args)]
+    result = subprocess.run(
+        cmd,
+        check=False,
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).parent,
+    )
+    return result.stdout + result.stderr
+
+
+def test_profiles_only_slow_tests() -> None:
+    """Test that slow tests get a hot function digest, fast ones none."""
+    test_file = Path(__file__).parent / "test_profiling_temp.py"
+    test_file.write_text("""
+import time
+
+def spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+def test_slow():
+    spin(0.3)
+
+def test_fast():
+    assert True
+""")
+
+    try:
+        actual = run_pytest(str(test_file), "--markdown-profile-slow=0.2")
+
+        assert "**Summary:** 2/2 passed" in actual
+        assert "## Slow test profiles" in actual
+        assert "### tests/test_profiling_temp.py::test_slow (0." in actual
+        assert "spin (tests/test_profiling_temp.py:4)" in actual
+        assert "test_fast" not in actual
+        # Runner frames are on every stack and are filtered out
+        assert "pytest_runtest_call" not in actual
+    finally:
+        test_file.unlink(missing_ok=True)
+
+
+def test_failure_formatting_not_profiled() -> None:
+    """Test that pytest formatting a failure does not count as the test's time."""
+    test_file = Path(__file__).parent / "test_profiling_failure_temp.py"
+    test_file.write_text("""
+import time
+
+def spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+def recurse(depth):
+    if depth == 0:
+        assert False
+    recurse(depth - 1)
+
+def test_deep_failure():
+    spin(0.1)
+    recurse(300)
+""")
+
+    try:
+        actual = run_pytest(str(test_file), "--markdown-profile-slow=0")
+
+        assert "spin (tests/test_profiling_failure_temp.py:4)" in actual
+        # The traceback of 300 frames takes longer to format than to raise
+        assert "traceback.py" not in actual
+        assert "linecache.py" not in actual
+        assert "inspect.py" not in actual
+    finally:
+        test_file.unlink(missing_ok=True)
+
+
+def test_no_section_without_slow_tests() -> None:
+    """Test that the section is omitted when no test reaches the threshold."""
+    test_file = Path(__file__).parent / "test_profiling_fast_temp.py"
+    test_file.write_text("def test_fast():\n    assert True\n")
+
+    try:
+        actual = run_pytest(str(test_file), "--markdown-profile-slow=5")
+
+        assert actual == "# Test Report\n\n**Summary:** 1/1 passed\n"
+    finally:
+        test_file.unlink(missing_ok=True)
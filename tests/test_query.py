@@ -0,0 +1,151 @@
+"""Test the mid-run query endpoint (--markdown-query-socket)."""
+
+import json
+import socket
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+from _pytest.reports import TestReport
+
+from pytest_markdown_report.plugin import MarkdownReport
+from pytest_markdown_report.query import (
+    QueryServer,
+    loopback_host,
+    remove_stale_socket,
+)
+
+
+def run_pytest(*args: str) -> str:
+    """Run pytest with given args and return output."""
+    cmd = [sys.executable, "-m", "pytest", *list(args)]
+    result = subprocess.run(
+        cmd,
+        check=False,
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).parent,
+    )
+    return result.stdout + result.stderr
+
+
+def query(address: str, *commands: str) -> list[object]:
+    """Send queries on a Unix socket and decode the JSON answers."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(address)
+        stream = client.makefile("rwb")
+        answers = []
+        for command in commands:
+            stream.write(command.encode() + b"\n")
+            stream.flush()
+            answers.append(json.loads(stream.readline()))
+        return answers
+
+
+def test_query_answers_from_running_state(tmp_path: Path) -> None:
+    """Test counts, failures and per-test markdown through the socket."""
+    config = Mock()
+    config.getoption.side_effect = lambda x: None if x == "markdown_report_path" else 0
+    config.option.verbose = 0
+    reporter = MarkdownReport(config)
+    reporter.pytest_runtest_logstart("t.py::test_a")
+    for when, outcome in [("setup", "passed"), ("call", "failed")]:
+        reporter.pytest_runtest_logreport(
+            TestReport("t.py::test_a", ("t.py", 0, ""), {}, outcome, "E boom", when)
+        )
+    reporter.pytest_runtest_logreport(
+        TestReport("t.py::test_a", ("t.py", 0, ""), {}, "passed", None, "teardown")
+    )
+    reporter.pytest_runtest_logfinish()
+    # Still in its setup phase, nothing logged yet
+    reporter.pytest_runtest_logstart("t.py::test_b")
+
+    address = str(tmp_path / "query.sock")
+    server = QueryServer(reporter, address)
+    server.start()
+    try:
+        counts, failures, block, missing = query(
+            address, "counts", "failures", "report t.py::test_a", "report nope"
+        )
+    finally:
+        server.stop()
+
+    assert counts["failed"] == 1
+    assert counts["passed"] == 0
+    assert counts["running"] == 1
+    assert failures == [{"nodeid": "t.py::test_a", "category": "failed"}]
+    assert block == {"markdown": "### t.py::test_a FAILED\n\n```python\nE boom\n```\n"}
+    assert "error" in missing
+    assert not Path(address).exists()
+
+
+def test_query_socket_during_session(tmp_path: Path) -> None:
+    """Test that a test can query failures of earlier tests mid-run."""
+    address = tmp_path / "query.sock"
+    test_file = Path(__file__).parent / "test_query_temp.py"
+    test_file.write_text(f"""
+import json
+import socket
+
+def test_first_fails():
+    assert False
+
+def test_queries_running_session():
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect({str(address)!r})
+        client.sendall(b"failures\\n")
+        answer = json.loads(client.makefile("rb").readline())
+    assert [f["nodeid"].rsplit("::")[-1] for f in answer] == ["test_first_fails"]
+""")
+
+    try:
+        actual = run_pytest(str(test_file), f"--markdown-query-socket={address}")
+
+        assert "**Summary:** 1/2 passed, 1 failed" in actual
+        assert "test_queries_running_session" not in actual
+        assert not address.exists()
+    finally:
+        test_file.unlink(missing_ok=True)
+
+
+def test_query_socket_bind_failure(tmp_path: Path) -> None:
+    """A socket that cannot be bound is reported, the session still runs."""
+    address = tmp_path / "missing" / "query.sock"
+    (tmp_path / "test_ok.py").write_text("def test_ok():\n    pass\n")
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", f"--markdown-query-socket={address}"],
+        check=False,
+        capture_output=True,
+        text=True,
+        cwd=tmp_path,
+    )
+    assert result.returncode == 0
+    assert "**Summary:** 1/1 passed" in result.stdout
+    assert f"Warning: Could not serve queries on {address}: " in result.stderr
+
+
+def test_tcp_host_is_loopback() -> None:
+    """TCP addresses only bind local interfaces."""
+    assert loopback_host("") == "127.0.0.1"
+    assert loopback_host("localhost") == "localhost"
+    assert loopback_host("127.0.0.2") == "127.0.0.2"
+    for host in ("0.0.0.0", "192.168.1.10", "example.com"):  # noqa: S104
+        with pytest.raises(ValueError, match="non-loopback"):
+            loopback_host(host)
+
+
+def test_stale_socket_removed_other_files_kept(tmp_path: Path) -> None:
+    """Only a leftover socket is replaced, never a file of the user."""
+    address = tmp_path / "query.sock"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+        stale.bind(str(address))
+    remove_stale_socket(str(address))
+    assert not address.exists()
+    remove_stale_socket(str(address))
+
+    address.write_text("notes")
+    with pytest.raises(FileExistsError, match="not a socket"):
+        QueryServer(Mock(), str(address)).start()
+    assert address.read_text() == "notes"
@@ -0,0 +1,152 @@
+"""Test in-process reruns classifying flaky failures."""
+
+import subprocess
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+
+def run_pytest(cwd: Path, *args: str) -> str:
+    """Run pytest in a project directory and return output."""
+    cmd = [sys.executable, "-m", "pytest", *list(args)]
+    result = subprocess.run(
+        cmd,
+        check=False,
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+    )
+    return result.stdout + result.stderr
+
+
+FLAKY_MODULE = """
+from pathlib import Path
+
+import pytest
+
+COUNTER = Path(__file__).parent / "runs"
+
+
+def bump(name):
+    path = COUNTER / name
+    path.parent.mkdir(exist_ok=True)
+    runs = int(path.read_text()) + 1 if path.exists() else 1
+    path.write_text(str(runs))
+    return runs
+
+
+@pytest.fixture
+def flaky_resource():
+    if bump("resource") == 1:
+        raise ConnectionError("resource busy")
+
+
+def test_passes_second_time():
+    assert bump("second") >= 2, "race lost"
+
+
+def test_setup_flaky(flaky_resource):
+    pass
+
+
+def test_always_fails():
+    assert bump("always") == 0, "real bug"
+
+
+def test_ok():
+    pass
+"""
+
+
+def test_flaky_failures_get_own_section(tmp_path: Path) -> None:
+    """Test that failures passing on rerun leave Failures for Flaky."""
+    (tmp_path / "test_flaky.py").write_text(FLAKY_MODULE)
+
+    output = run_pytest(tmp_path, "--markdown-auto-rerun=2")
+
+    assert "**Summary:** 1/4 passed, 1 failed, 2 flaky" in output
+    assert "### test_flaky.py::test_always_fails FAILED" in output
+    assert "test_passes_second_time FAILED" not in output
+    assert "## Errors" not in output
+    assert "## Flaky\n\n" in output
+    assert (
+        "- test_flaky.py::test_setup_flaky (passed on rerun 1/2): "
+        "ConnectionError: resource busy"
+    ) in output
+    assert (
+        "- test_flaky.py::test_passes_second_time (passed on rerun 1/2): "
+        "AssertionError: race lost"
+    ) in output
+    # The consistent failure was rerun twice
+    assert (tmp_path / "runs" / "always").read_text() == "3"
+
+
+def test_no_rerun_after_maxfail(tmp_path: Path) -> None:
+    """Test that stopping early skips the reruns."""
+    (tmp_path / "test_flaky.py").write_text(FLAKY_MODULE)
+
+    output = run_pytest(tmp_path, "--markdown-auto-rerun=2", "-x", "-q")
+
+    assert "flaky" not in output
+    assert (tmp_path / "runs" / "second").read_text() == "1"
+
+
+SUBTESTS_MODULE = """
+from pathlib import Path
+
+COUNTER = Path(__file__).parent / "runs"
+
+
+def test_subtest_always_fails(subtests):
+    for i in range(3):
+        with subtests.test(i=i):
+            assert i != 1
+
+
+def test_subtest_flaky(subtests):
+    COUNTER.write_text(str(int(COUNTER.read_text()) + 1) if COUNTER.exists() else "1")
+    with subtests.test(msg="race"):
+        assert COUNTER.read_text() != "1"
+"""
+
+
+def test_failing_subtest_fails_rerun(tmp_path: Path) -> None:
+    """Test that a rerun counts the failures of its subtests."""
+    (tmp_path / "test_subtests.py").write_text(SUBTESTS_MODULE)
+
+    output = run_pytest(tmp_path, "--markdown-auto-rerun=3")
+
+    assert "**Summary:** 0/2 passed, 1 failed, 1 flaky" in output
+    assert "### test_subtests.py::test_subtest_always_fails FAILED" in output
+    assert "**Subtests:** 2 passed, 1 failed\n" in output
+    assert "- test_subtests.py::test_subtest_flaky (passed on rerun 1/3)" in output
+
+
+def test_flaky_failures_in_rollup_junit_and_measurements(tmp_path: Path) -> None:
+    """Test that reruns are not measured and flaky tests are not failures."""
+    (tmp_path / "test_flaky.py").write_text(FLAKY_MODULE)
+    xml_path = tmp_path / "junit.xml"
+
+    output = run_pytest(
+        tmp_path,
+        "--markdown-auto-rerun=2",
+        "--markdown-rollup=1",
+        "--markdown-fixture-costs=5",
+        "--markdown-idle-time=5",
+        f"--markdown-junitxml={xml_path}",
+    )
+
+    assert "**Summary:** 1/4 passed, 1 failed, 2 flaky" in output
+    assert "- test_flaky.py 1/4 passed, 1 failed, 2 flaky\n" in output
+    # The rerun set the fixture up again, unmeasured
+    assert "flaky_resource (test_flaky.py:17), function scope, 1 setups (" in output
+    suite = ET.parse(xml_path).getroot().find("testsuite")  # noqa: S314 - own output
+    assert suite is not None
+    assert (suite.get("failures"), suite.get("errors")) == ("1", "0")
+    outcomes = {case.get("name"): [child.tag for child in case] for case in suite}
+    assert outcomes == {
+        "test_passes_second_time": ["flakyFailure"],
+        "test_setup_flaky": ["flakyError"],
+        "test_always_fails": ["failure"],
+        "test_ok": [],
+    }
@@ -0,0 +1,78 @@
+"""Test the per-directory/module roll-up section."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+from pytest_markdown_report.rollup import RollupTree, nodeid_parts
+
+
+def run_pytest(cwd: Path, *args: str) -> str:
+    """Run pytest in a project directory and return output."""
+    cmd = [sys.executable, "-m", "pytest", *list(args)]
+    result = subprocess.run(
+        cmd,
+        check=False,
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+    )
+    return result.stdout + result.stderr
+
+
+def test_nodeid_parts() -> None:
+    """Test that a nodeid splits into directories, module and classes."""
+    assert nodeid_parts("tests/pkg/test_x.py::TestA::test_b[1]") == [
+        "tests/",
+        "pkg/",
+        "test_x.py",
+        "::TestA",
+    ]
+    assert nodeid_parts("test_x.py::test_a") == ["test_x.py"]
+
+
+def test_expands_failing_subtrees_only() -> None:
+    """Test that passing subtrees collapse and the depth limit applies."""
+    tree = RollupTree(depth=2)
+    tree.add("tests/api/test_users.py::test_create", "passed")
+    tree.add("tests/api/test_users.py::test_delete", "failed")
+    tree.add("tests/api/test_items.py::test_list", "passed")
+    tree.add("tests/db/test_models.py::TestUser::test_save", "errors")
+    tree.add("tests/db/test_models.py::TestUser::test_load", "passed")
+    tree.add("tests/ui/test_pages.py::test_home", "passed")
+    tree.add("tests/ui/test_pages.py::test_about", "skipped")
+
+    assert tree.generate_section() == [
+        "## Roll-up",
+        "",
+        "- tests/ 4/7 passed, 2 failed, 1 skipped",
+        "  - api/ 2/3 passed, 1 failed",
+        "  - db/test_models.py::TestUser 1/2 passed, 1 failed",
+        "  - 1 more without failures (2 tests)",
+        "",
+    ]
+
+
+def test_no_section_without_failures() -> None:
+    """Test that an all-passing run adds nothing."""
+    tree = RollupTree(depth=3)
+    tree.add("test_a.py::test_one", "passed")
+    assert tree.generate_section() == []
+
+
+def test_rollup_in_report(tmp_path: Path) -> None:
+    """Test that the roll-up follows the summary of a real run."""
+    for package, body in (("good", "assert True"), ("bad", "assert False")):
+        (tmp_path / package).mkdir()
+        (tmp_path / package / f"test_{package}.py").write_text(
+            f"def test_one():\n    assert True\n\ndef test_two():\n    {body}\n"
+        )
+
+    output = run_pytest(tmp_path, "--markdown-rollup=3")
+
+    assert (
+        "**Summary:** 3/4 passed, 1 failed\n\n"
+        "## Roll-up\n\n"
+        "- bad/test_bad.py 1/2 passed, 1 failed\n"
+        "- 1 more without failures (2 tests)\n"
+    ) in output
@@ -0,0 +1,99 @@
+"""Test stop-on-saturation (--markdown-stop-after-distinct/-repeats)."""
+
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+from pytest_markdown_report.saturation import FailureSaturation, failure_fingerprint
+
+SATURATED_TESTS = """
+import pytest
+
+@pytest.fixture
+def broken_fixture():
+    raise RuntimeError("database down")
+
+@pytest.mark.parametrize("n", range(20))
+def test_uses_broken_fixture(broken_fixture, n):
+    pass
+
+def test_other_cause():
+    assert 1 == 2
+
+def test_third_cause():
+    raise KeyError("missing")
+"""
+
+
+def run_pytest(*args: str) -> str:
+    """Run pytest with given args and return output."""
+    cmd = [sys.executable, "-m", "pytest", *list(args)]
+    result = subprocess.run(
+        cmd,
+        check=False,
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).parent,
+    )
+    return result.stdout + result.stderr
+
+
+def failed_report(path: str, lineno: int, message: str) -> Mock:
+    """Build a failed report with a crash location."""
+    report = Mock()
+    report.longrepr.reprcrash.path = path
+    report.longrepr.reprcrash.lineno = lineno
+    report.longrepr.reprcrash.message = message
+    return report
+
+
+def test_fingerprint_ignores_message_details() -> None:
+    """Test that same location and exception type share a fingerprint."""
+    first = failed_report("conftest.py", 5, "RuntimeError: connection 1 refused")
+    second = failed_report("conftest.py", 5, "RuntimeError: connection 2 refused")
+    elsewhere = failed_report("conftest.py", 9, "RuntimeError: connection 1 refused")
+
+    assert failure_fingerprint(first) == failure_fingerprint(second)
+    assert failure_fingerprint(first) != failure_fingerprint(elsewhere)
+
+
+def test_policy_counts_consecutive_repeats() -> None:
+    """Test that a new cause resets the repeat counter."""
+    policy = FailureSaturation(max_distinct=0, max_repeats=2)
+    same = failed_report("a.py", 1, "ValueError: x")
+
+    assert policy.add(same) is None
+    assert policy.add(same) is None
+    assert policy.add(failed_report("b.py", 2, "KeyError: y")) is None
+    assert policy.add(same) is None
+    assert policy.add(same) == "2 consecutive failures with no new cause"
+
+
+def test_stop_after_repeats_ends_session() -> None:
+    """Test that identical failures stop the run early."""
+    test_file = Path(__file__).parent / "test_saturation_temp.py"
+    test_file.write_text(SATURATED_TESTS)
+
+    try:
+        actual = run_pytest(str(test_file), "--markdown-stop-after-repeats=3")
+
+        assert "**Summary:** 0/4 passed, 4 failed" in actual
+        assert "**Stopped:** after 3 consecutive failures with no new cause" in actual
+        assert "test_other_cause" not in actual
+    finally:
+        test_file.unlink(missing_ok=True)
+
+
+def test_stop_after_distinct_ends_session() -> None:
+    """Test that the run stops once enough distinct causes were seen."""
+    test_file = Path(__file__).parent / "test_saturation_distinct_temp.py"
+    test_file.write_text(SATURATED_TESTS)
+
+    try:
+        actual = run_pytest(str(test_file), "--markdown-stop-after-distinct=2", "-q")
+
+        assert "**Summary:** 0/21 passed, 21 failed" in actual
+        assert "**Stopped:** after 2 distinct failure causes" in actual
+    finally:
+        test_file.unlink(missing_ok=True)
@@ -0,0 +1,129 @@
+"""Test how the plugin's memory and render time scale with the suite size.
+
+100k synthetic tests are logged through ``pytest_runtest_logreport``, as
+pytest would: 1% failing with a large traceback, 10% passing with captured
+output. The memory budget leaves room for interpreter differences, but storing
+a copy of tracebacks or output, or an extra container per test, exceeds it.
+"""
+
+import gc
+import time
+import tracemalloc
+from unittest.mock import Mock
+
+import pytest
+
+from pytest_markdown_report.plugin import MarkdownReport
+
+TESTS = 100_000
+# Bytes the plugin keeps per test, the logged report object included (about
+# 240 on CPython 3.11 and 3.12)
+RETAINED_PER_TEST = 300
+RENDER_SECONDS = 2.0
+
+TRACEBACK = "test_mod.py:1: in test\n" + "E   assert 0\n" * 1500
+OUTPUT = "line of output\n" * 50
+
+
+class SyntheticReport:
+    """The TestReport attributes the plugin reads, in a compact object."""
+
+    __slots__ = (
+        "capstderr",
+        "capstdout",
+        "duration",
+        "longrepr",
+        "nodeid",
+        "outcome",
+        "when",
+    )
+
+    def __init__(
+        self,
+        nodeid: str,
+        when: str,
+        outcome: str = "passed",
+        longrepr: str | None = None,
+        capstdout: str = "",
+    ) -> None:
+        """Create a report of one test phase."""
+        self.nodeid = nodeid
+        self.when = when
+        self.outcome = outcome
+        self.longrepr = longrepr
+        self.duration = 0.001
+        self.capstdout = capstdout
+        self.capstderr = ""
+
+    @property
+    def passed(self) -> bool:
+        """Whether the phase passed."""
+        return self.outcome == "passed"
+
+    @property
+    def failed(self) -> bool:
+        """Whether the phase failed."""
+        return self.outcome == "failed"
+
+    @property
+    def skipped(self) -> bool:
+        """Whether the phase was skipped."""
+        return self.outcome == "skipped"
+
+    @property
+    def longreprtext(self) -> str:
+        """Traceback text, as pytest renders it."""
+        return self.longrepr or ""
+
+
+def make_reporter(verbose: int) -> MarkdownReport:
+    """Create a reporter showing failures, errors and passes with output."""
+    config = Mock()
+    config.getoption.side_effect = lambda x: None if x == "markdown_report_path" else 0
+    config.option.verbose = verbose
+    config.option.reportchars = "fEP"
+    return MarkdownReport(config)
+
+
+def log_tests(reporter: MarkdownReport) -> None:
+    """Log the setup, call and teardown phases of every test."""
+    log = reporter.pytest_runtest_logreport
+    for index in range(TESTS):
+        nodeid = f"tests/test_m{index // 100}.py::test_{index}"
+        log(SyntheticReport(nodeid, "setup"))
+        if index % 100 == 0:
+            log(SyntheticReport(nodeid, "call", "failed", TRACEBACK))
+        else:
+            output = OUTPUT if index % 10 == 5 else ""
+            log(SyntheticReport(nodeid, "call", capstdout=output))
+        log(SyntheticReport(nodeid, "teardown"))
+
+
+@pytest.mark.parametrize("verbose", [0, 1])
+def test_memory_and_render_time_per_test(verbose: int) -> None:
+    """Collection keeps little per test, rendering stays well under budget."""
+    reporter = make_reporter(verbose)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        log_tests(reporter)
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert retained / TESTS < RETAINED_PER_TEST
+    assert not reporter.pending
+
+    start = time.perf_counter()
+    reporter._categorize_reports()
+    reporter.shards.freeze()
+    report = reporter._join_lines(reporter._build_report_lines())
+    elapsed = time.perf_counter() - start
+    assert elapsed < RENDER_SECONDS
+
+    assert (
+        f"**Summary:** {TESTS * 99 // 100}/{TESTS} passed, {TESTS // 100} failed"
+        in report
+    )
+    assert report.count(" FAILED\n") == TESTS // 100
+    assert report.count("  stdout: line of output") == TESTS // 10
@@ -0,0 +1,111 @@
+"""Test the hooks other plugins use to add sections and test metadata."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+from pytest_markdown_report.sections import ReportSection, layout_sections
+
+
+def run_pytest(cwd: Path, *args: str) -> str:
+    """Run pytest in a project directory and return output."""
+    cmd = [sys.executable, "-m", "pytest", "-p", "no:cacheprovider", *list(args)]
+    result = subprocess.run(cmd, check=False, capture_output=True, text=True, cwd=cwd)
+    return result.stdout + result.stderr
+
+
+def test_sections_ordered_by_priority() -> None:
+    """Higher priority sections come first, whatever the declaration order."""
+    sections = [
+        ReportSection("Low", lambda: ["low"]),
+        ReportSection("High", lambda: ["high"], priority=10),
+    ]
+    assert layout_sections(sections, 4096) == [
+        "## High",
+        "",
+        "high",
+        "",
+        "## Low",
+        "",
+        "low",
+        "",
+    ]
+
+
+def test_section_truncated_closes_code_block() -> None:
+    """A truncated section keeps whole lines and a balanced code fence."""
+    body = ["Output:", "```", *(f"line {i}" for i in range(500)), "```"]
+    section = ReportSection("Logs", lambda: body, max_tokens=100)
+    lines = layout_sections([section], 4096)
+    assert sum(len(line) + 1 for line in lines) <= 400
+    assert lines[:4] == ["## Logs", "", "Output:", "```"]
+    assert lines[-4] == "```"
+    assert lines[-2].startswith("*Truncated: ")
+    kept = len(lines) - 8
+    assert lines[-2] == f"*Truncated: {len(body) - 2 - kept} more lines*"
+
+
+def test_sections_dropped_when_out_of_room() -> None:
+    """Sections without room are never rendered, only named."""
+    rendered = []
+
+    def render(name: str) -> list[str]:
+        rendered.append(name)
+        return ["x" * 200]
+
+    sections = [
+        ReportSection("First", lambda: render("First"), priority=2),
+        ReportSection("Second", lambda: render("Second"), priority=1),
+    ]
+    lines = layout_sections(sections, 300)
+    assert rendered == ["First"]
+    assert lines[-2] == "*Omitted to fit the size limit: Second*"
+    assert layout_sections(sections, 0) == [
+        "*Omitted to fit the size limit: First, Second*",
+        "",
+    ]
+
+
+def test_failing_render_reported() -> None:
+    """A section whose rendering raises reports the error in its place."""
+
+    def render() -> list[str]:
+        raise RuntimeError("no data")
+
+    lines = layout_sections([ReportSection("Broken", render)], 4096)
+    assert lines == ["## Broken", "", "Rendering failed: RuntimeError: no data", ""]
+
+
+CONFTEST = """
+from pytest_markdown_report import ReportSection
+
+
+def pytest_markdown_report_sections(config):
+    return [
+        ReportSection("Environment", lambda: ["- **db:** sqlite"], priority=1),
+        ReportSection("Huge", lambda: ["y" * 100] * 1000),
+    ]
+
+
+def pytest_markdown_report_test_metadata(report):
+    return {"owner": "storage", "shard": "2"}
+"""
+
+
+def test_plugin_sections_and_metadata(tmp_path: Path) -> None:
+    """Hook implementations add sections and metadata to the report."""
+    (tmp_path / "conftest.py").write_text(CONFTEST)
+    (tmp_path / "test_x.py").write_text(
+        "def test_pass():\n    pass\n\ndef test_fail():\n    assert False\n"
+    )
+    output = run_pytest(tmp_path, "--markdown-section-limit=2048")
+    assert "### test_x.py::test_fail FAILED\n\n**Metadata:** owner=storage" in output
+    assert output.count("**Metadata:**") == 1
+    assert output.index("## Environment\n\n- **db:** sqlite\n") < output.index(
+        "## Huge"
+    )
+    assert "*Truncated: " in output
+
+    output = run_pytest(tmp_path, "--markdown-section-limit=0")
+    assert "*Omitted to fit the size limit: Environment, Huge*" in output
+    assert "## Environment" not in output
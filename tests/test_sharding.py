@@ -0,0 +1,144 @@
+"""Test the duration-aware shard planner."""
+
+import argparse
+import json
+import re
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from pytest_markdown_report.sharding import DEFAULT_ESTIMATE, parse_shard, plan_shards
+
+
+def run_pytest(cwd: Path, *args: str) -> str:
+    """Run pytest in a project directory and return output."""
+    cmd = [sys.executable, "-m", "pytest", *list(args)]
+    result = subprocess.run(
+        cmd,
+        check=False,
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+    )
+    return result.stdout + result.stderr
+
+
+SLEEPING_MODULE = """
+import time
+
+import pytest
+
+
+@pytest.mark.parametrize(
+    "seconds", [0.3, 0.2, 0.1, 0.1, 0.05, 0.05], ids=["a", "b", "c", "d", "e", "f"]
+)
+def test_sleep(seconds):
+    time.sleep(seconds)
+"""
+
+
+def test_longest_processing_time_balances_loads() -> None:
+    """Slow tests are spread first, short ones fill the gaps."""
+    durations = {"a": 5.0, "b": 4.0, "c": 3.0, "d": 3.0, "e": 2.0, "f": 1.0}
+    shards, expected = plan_shards(list(durations), durations, 2)
+    assert sorted(i for shard in shards for i in shard) == list(range(6))
+    assert expected == [9.0, 9.0]
+    assert shards[0] == [0, 3, 5]  # a, d, f
+    assert shards[1] == [1, 2, 4]  # b, c, e
+
+
+def test_unseen_tests_estimated_at_median() -> None:
+    """Tests without a duration count as the median of the known ones."""
+    durations = {"a": 1.0, "b": 2.0, "c": 9.0}
+    _, expected = plan_shards(["a", "b", "c", "new1", "new2"], durations, 2)
+    assert sorted(expected) == [7.0, 9.0]
+
+
+def test_no_durations_splits_by_count() -> None:
+    """Without any recorded duration, shards get the same number of tests."""
+    shards, expected = plan_shards([f"t{i}" for i in range(7)], {}, 3)
+    assert sorted(len(shard) for shard in shards) == [2, 2, 3]
+    assert max(expected) == pytest.approx(3 * DEFAULT_ESTIMATE)
+
+
+@pytest.mark.parametrize("value", ["0/2", "3/2", "1", "a/b", "1/0"])
+def test_invalid_shard(value: str) -> None:
+    """Shard values must be i/n with i between 1 and n."""
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_shard(value)
+
+
+def test_shards_partition_suite(tmp_path: Path) -> None:
+    """Shards planned from recorded durations cover the suite exactly once."""
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "test_mod.py").write_text(SLEEPING_MODULE)
+    run_pytest(project)  # Records durations in the cache
+
+    ran = []
+    for index in (1, 2):
+        # Each CI node restores the same cache, and records into its own copy
+        node = shutil.copytree(tmp_path / "project", tmp_path / f"node{index}")
+        output = run_pytest(node, "-v", f"--markdown-shard={index}/2")
+        assert f"## Shard {index}/2" in output
+        match = re.search(
+            r"\*\*Expected:\*\* ([\d.]+)s, \*\*actual:\*\* ([\d.]+)s", output
+        )
+        assert match
+        # 0.8s of sleep split in two: 0.4s each
+        assert float(match[1]) == pytest.approx(0.4, abs=0.05)
+        assert float(match[2]) == pytest.approx(0.4, abs=0.1)
+        assert "without recorded duration" not in output
+        ran.extend(re.findall(r"test_sleep\[\w\]", output))
+    assert len(ran) == 6
+    assert len(set(ran)) == 6
+
+
+def test_shard_without_cache(tmp_path: Path) -> None:
+    """The first sharded run falls back to estimates."""
+    (tmp_path / "test_mod.py").write_text(SLEEPING_MODULE)
+    output = run_pytest(tmp_path, "--markdown-shard=2/3")
+    assert "**Summary:** 2/2 passed" in output
+    assert "(2 tests, 2 without recorded duration)" in output
+
+
+def test_durations_of_deleted_tests_dropped(tmp_path: Path) -> None:
+    """Recorded durations do not outlive the tests they belong to."""
+    (tmp_path / "test_a.py").write_text(
+        "def test_one():\n    pass\n\n\ndef test_two():\n    pass\n"
+    )
+    (tmp_path / "test_b.py").write_text("def test_three():\n    pass\n")
+    (tmp_path / "test_c.py").write_text("def test_four():\n    pass\n")
+    cache = tmp_path / ".pytest_cache" / "v" / "markdown_report" / "durations"
+    run_pytest(tmp_path)
+    assert len(json.loads(cache.read_text())) == 4
+
+    (tmp_path / "test_a.py").write_text("def test_one():\n    pass\n")
+    (tmp_path / "test_b.py").unlink()
+    run_pytest(tmp_path, "test_a.py")
+    # test_c.py was not collected, but still exists
+    assert sorted(json.loads(cache.read_text())) == [
+        "test_a.py::test_one",
+        "test_c.py::test_four",
+    ]
+
+
+def test_durations_kept_after_last_failed(tmp_path: Path) -> None:
+    """Tests left out by --lf keep their recorded durations."""
+    (tmp_path / "test_a.py").write_text(
+        "def test_pass1():\n    pass\n\n\ndef test_pass2():\n    pass\n\n\n"
+        "def test_fail():\n    assert False\n"
+    )
+    cache = tmp_path / ".pytest_cache" / "v" / "markdown_report" / "durations"
+    run_pytest(tmp_path)
+    run_pytest(tmp_path, "--lf")
+    run_pytest(tmp_path, "-k", "fail")
+    run_pytest(tmp_path, "--deselect", "test_a.py::test_pass1")
+    assert sorted(json.loads(cache.read_text())) == [
+        "test_a.py::test_fail",
+        "test_a.py::test_pass1",
+        "test_a.py::test_pass2",
+    ]
@@ -0,0 +1,103 @@
+"""Test the report file shared by several pytest processes."""
+
+import os
+import stat
+import subprocess
+import sys
+from pathlib import Path
+
+from pytest_markdown_report.shared_report import demote_headings, write_shared_report
+
+
+def start_pytest(cwd: Path, *args: str) -> subprocess.Popen[str]:
+    """Start pytest in a project directory."""
+    cmd = [sys.executable, "-m", "pytest", "-p", "no:cacheprovider", *args]
+    return subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.DEVNULL)
+
+
+SUITE = """
+import pytest
+
+
+@pytest.mark.parametrize("n", range(10))
+def test_value(n):
+    assert n % 5, "multiple of five"
+"""
+
+
+def test_concurrent_processes_each_add_a_section(tmp_path: Path) -> None:
+    """Processes writing at once all end up in the file, counted once."""
+    (tmp_path / "test_mod.py").write_text(SUITE)
+    processes = [
+        start_pytest(
+            tmp_path, "--markdown-report=report.md", f"--markdown-report-shared=env{i}"
+        )
+        for i in range(8)
+    ]
+    for process in processes:
+        process.wait(timeout=60)
+
+    report = (tmp_path / "report.md").read_text()
+    assert "\n# Test Report\n\n**Summary:** 64/80 passed, 16 failed\n" in report
+    assert sorted(line for line in report.splitlines() if line.startswith("## ")) == [
+        f"## env{i}" for i in range(8)
+    ]
+    assert report.count("### Failures") == 8
+    assert report.count("#### test_mod.py::test_value[5] FAILED") == 8
+    # Temporary files were all renamed over the report
+    assert sorted(path.name for path in tmp_path.iterdir() if path.is_file()) == [
+        "report.md",
+        "report.md.lock",
+        "test_mod.py",
+    ]
+
+
+def test_same_label_replaces_its_section(tmp_path: Path) -> None:
+    """A process rerun under the same label replaces its previous section."""
+    path = tmp_path / "report.md"
+    write_shared_report(path, "py311", {"passed": 1, "failed": 1}, ["first run"])
+    write_shared_report(path, "py312", {"passed": 2}, ["other env"])
+    write_shared_report(path, "py311", {"passed": 2}, ["second run"])
+
+    report = path.read_text()
+    assert "**Summary:** 4/4 passed\n" in report
+    assert "first run" not in report
+    assert report.index("## py312\n\nother env") < report.index(
+        "## py311\n\nsecond run"
+    )
+
+
+def test_existing_plain_report_replaced(tmp_path: Path) -> None:
+    """A report left by a non-shared run is replaced, not counted."""
+    path = tmp_path / "report.md"
+    path.write_text("# Test Report\n\n**Summary:** 9/9 passed\n")
+    write_shared_report(path, "env", {"skipped": 1}, ["**Summary:** 0/1 passed"])
+    report = path.read_text()
+    assert "**Summary:** 0/1 passed, 1 skipped\n" in report
+    assert "9/9" not in report
+
+
+def test_report_file_mode(tmp_path: Path) -> None:
+    """The report gets the mode of a regular file, then keeps its own."""
+    path = tmp_path / "report.md"
+    umask = os.umask(0o022)
+    try:
+        write_shared_report(path, "a", {"passed": 1}, ["# Test Report"])
+    finally:
+        os.umask(umask)
+    assert stat.S_IMODE(path.stat().st_mode) == 0o644
+    path.chmod(0o640)
+    write_shared_report(path, "b", {"passed": 1}, ["# Test Report"])
+    assert stat.S_IMODE(path.stat().st_mode) == 0o640
+
+
+def test_headings_nested_outside_code_blocks() -> None:
+    """The title is dropped and headings move one level down."""
+    lines = ["# Test Report", "## Failures", "### t FAILED", "```", "## out", "```"]
+    assert list(demote_headings(lines)) == [
+        "### Failures",
+        "#### t FAILED",
+        "```",
+        "## out",
+        "```",
+    ]
@@ -0,0 +1,39 @@
+"""Test the slow collection section."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+
+def run_pytest(cwd: Path, *args: str) -> str:
+    """Run pytest in a project directory and return output."""
+    cmd = [sys.executable, "-m", "pytest", *list(args)]
+    result = subprocess.run(
+        cmd,
+        check=False,
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+    )
+    return result.stdout + result.stderr
+
+
+def test_slow_imports_and_conftests_ranked(tmp_path: Path) -> None:
+    """Test that slow module imports and conftests top the section."""
+    (tmp_path / "test_heavy.py").write_text(
+        "import time\ntime.sleep(0.3)\n\ndef test_a():\n    pass\n"
+    )
+    (tmp_path / "test_light.py").write_text("def test_b():\n    pass\n")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "conftest.py").write_text("import time\ntime.sleep(0.2)\n")
+    (tmp_path / "sub" / "test_sub.py").write_text("def test_c():\n    pass\n")
+
+    output = run_pytest(tmp_path, "--markdown-slow-collection=2")
+
+    assert "## Slow collection" in output
+    section = output.split("## Slow collection")[1].strip().splitlines()
+    assert section[0].startswith("**Collection:** ")
+    assert float(section[0].split()[1].rstrip("s")) >= 0.5
+    assert section[2].endswith("s test_heavy.py")
+    assert section[3].endswith("s sub/conftest.py")
+    assert len(section) == 4
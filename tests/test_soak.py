@@ -0,0 +1,144 @@
+"""Test soak mode: rotated reports and memory that stays flat."""
+
+import gc
+import subprocess
+import sys
+import threading
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+from pytest_markdown_report.plugin import MarkdownReport
+from pytest_markdown_report.soak import SoakRotation
+from tests.test_scaling import SyntheticReport
+
+
+def run_pytest(cwd: Path, *args: str) -> str:
+    """Run pytest in a project directory and return output."""
+    cmd = [sys.executable, "-m", "pytest", "-p", "no:cacheprovider", *list(args)]
+    result = subprocess.run(cmd, check=False, capture_output=True, text=True, cwd=cwd)
+    return result.stdout + result.stderr
+
+
+SOAK_MODULE = """
+import pytest
+
+
+@pytest.mark.parametrize("i", range(25))
+def test_repeat(i):
+    assert i % 5 != 3
+"""
+
+
+def test_rotated_reports(tmp_path: Path) -> None:
+    """Windows are written to numbered files, the final report keeps totals."""
+    (tmp_path / "test_soak.py").write_text(SOAK_MODULE)
+    output = run_pytest(
+        tmp_path,
+        "--markdown-report=report.md",
+        "--markdown-soak-tests=10",
+        "--markdown-soak-keep=1",
+    )
+    # Window 1 was rotated out by window 2
+    assert not (tmp_path / "report.0001.md").exists()
+    window = (tmp_path / "report.0002.md").read_text()
+    assert "**Summary:** 16/20 passed, 4 failed\n" in window
+    assert "### test_soak.py::test_repeat[13] FAILED" in window
+    assert "test_repeat[3] FAILED\n\n**First seen:** window 1, 2 occurrences" in window
+
+    assert "**Summary:** 20/25 passed, 5 failed\n" in output
+    assert "**Window:** 3 (5 tests since " in output
+    assert "**Earlier windows:** report.0002.md\n" in output
+    # Only the current window and the first occurrence of the cause remain
+    assert output.count(" FAILED\n") == 2
+    assert "test_repeat[23] FAILED\n\n```" in output
+    assert "test_repeat[3] FAILED\n\n**First seen:** window 1, 4 occurrences" in output
+    assert output == (tmp_path / "report.md").read_text()
+
+
+def test_requires_report_file(tmp_path: Path) -> None:
+    """Rotated files are named after the report file, which is required."""
+    (tmp_path / "test_soak.py").write_text(SOAK_MODULE)
+    output = run_pytest(tmp_path, "--markdown-soak-minutes=5")
+    assert "need --markdown-report" in output
+
+
+def test_memory_stays_flat(tmp_path: Path) -> None:
+    """Memory after many windows is the same as after the first ones."""
+    # Not a Mock, which would record every call
+    config = SimpleNamespace(
+        getoption=lambda x: None if x == "markdown_report_path" else 0,
+        option=SimpleNamespace(verbose=0, reportchars="fEP"),
+        pluginmanager=SimpleNamespace(get_plugin=lambda _: None),
+    )
+    reporter = MarkdownReport(config)
+    soak = SoakRotation(reporter, tmp_path / "report.md", 500, 0, 2)
+    reporter.feature_plugins.append(soak)
+
+    def log_tests(start: int, stop: int) -> None:
+        log = reporter.pytest_runtest_logreport
+        for index in range(start, stop):
+            nodeid = f"tests/test_soak.py::test_repeat[{index}]"
+            log(SyntheticReport(nodeid, "setup"))
+            if index % 50 == 0:
+                traceback = "test_soak.py:1: in test\nE   assert 0\n" * 100
+                log(SyntheticReport(nodeid, "call", "failed", traceback))
+            else:
+                log(SyntheticReport(nodeid, "call", capstdout="output\n" * 10))
+            log(SyntheticReport(nodeid, "teardown"))
+            soak.pytest_runtest_logfinish()
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        log_tests(0, 2_000)
+        gc.collect()
+        early, _ = tracemalloc.get_traced_memory()
+        log_tests(2_000, 22_000)
+        gc.collect()
+        late, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert late - early < 20_000
+    assert soak.window == 45
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "report.0043.md",
+        "report.0044.md",
+    ]
+    assert reporter._counts()["failed"] == 440
+    assert next(iter(soak.first_failures.values()))[:2] == (1, 440)
+
+
+def test_pending_tests_rotated(tmp_path: Path) -> None:
+    """Tests whose teardown was never logged do not stay pending past a window."""
+    config = SimpleNamespace(
+        getoption=lambda x: None if x == "markdown_report_path" else 0,
+        option=SimpleNamespace(verbose=0, reportchars="fEP"),
+        pluginmanager=SimpleNamespace(get_plugin=lambda _: None),
+    )
+    reporter = MarkdownReport(config)
+    soak = SoakRotation(reporter, tmp_path / "report.md", 10, 0, 0)
+    log = reporter.pytest_runtest_logreport
+
+    def start_running() -> None:
+        # Still running in its thread when the window rotates
+        reporter.pytest_runtest_logstart("tests/test_soak.py::test_running")
+        log(SyntheticReport("tests/test_soak.py::test_running", "call"))
+
+    thread = threading.Thread(target=start_running)
+    thread.start()
+    thread.join()
+    # Teardowns never logged: the tests stay pending until the rotation
+    for index in range(10):
+        nodeid = f"tests/test_soak.py::test_repeat[{index}]"
+        reporter.pytest_runtest_logstart(nodeid)
+        log(SyntheticReport(nodeid, "setup"))
+        log(SyntheticReport(nodeid, "call", "failed", "E   assert 0\n"))
+        reporter.pytest_runtest_logfinish()
+        soak.pytest_runtest_logfinish()
+
+    assert soak.window == 2
+    assert list(reporter.pending) == ["tests/test_soak.py::test_running"]
+    assert list(reporter.durations) == ["tests/test_soak.py::test_running"]
+    assert reporter._counts()["failed"] == 10
+    assert next(iter(soak.first_failures.values()))[:2] == (1, 10)
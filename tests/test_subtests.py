@@ -0,0 +1,109 @@
+"""Test subtest-aware aggregation."""
+
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+from _pytest.reports import TestReport
+
+from pytest_markdown_report.plugin import MarkdownReport
+from pytest_markdown_report.subtests import MAX_LISTED_FAILURES
+
+NODEID = "test_data.py::test_cases"
+
+
+def run_pytest(*args: str) -> str:
+    """Run pytest with given args and return output."""
+    cmd = [sys.executable, "-m", "pytest", *list(args)]
+    result = subprocess.run(
+        cmd,
+        check=False,
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).parent,
+    )
+    return result.stdout + result.stderr
+
+
+def make_reporter() -> MarkdownReport:
+    """Create a reporter with default options."""
+    config = Mock()
+    config.getoption.side_effect = lambda x: None if x == "markdown_report_path" else 0
+    config.option.verbose = 0
+    config.option.reportchars = "fE"
+    return MarkdownReport(config)
+
+
+def make_report(when: str, outcome: str, longrepr: object = None) -> TestReport:
+    """Create a parent test report."""
+    return TestReport(
+        NODEID, ("test_data.py", 0, "test_cases"), {}, outcome, longrepr, when
+    )
+
+
+def make_subtest_report(index: int, outcome: str) -> TestReport:
+    """Create a subtest report attached to the parent test."""
+    longrepr = f"test_data.py:5: AssertionError: case {index}"
+    report = make_report("call", outcome, longrepr if outcome == "failed" else None)
+    report.context = SimpleNamespace(msg=None, kwargs={"i": index})
+    return report
+
+
+def test_subtests_aggregated_under_parent() -> None:
+    """Test that many subtests collapse into counts and a capped list."""
+    reporter = make_reporter()
+    reporter.pytest_runtest_logreport(make_report("setup", "passed"))
+    for index in range(1000):
+        outcome = "failed" if index % 10 == 0 else "passed"
+        reporter.pytest_runtest_logreport(make_subtest_report(index, outcome))
+    # pytest-subtests style: the parent passes despite failing subtests
+    reporter.pytest_runtest_logreport(make_report("call", "passed"))
+    reporter.pytest_runtest_logreport(make_report("teardown", "passed"))
+
+    assert len(reporter.failed) == 1
+    assert not reporter.passed
+    record = reporter.subtests[NODEID]
+    assert len(record.failures) == MAX_LISTED_FAILURES
+
+    text = "\n".join(reporter._format_failure(reporter.failed[0]))
+    assert "**Subtests:** 900 passed, 100 failed" in text
+    assert "- (i=0): test_data.py:5: AssertionError: case 0" in text
+    assert f"- ... {100 - MAX_LISTED_FAILURES} more failed subtests" in text
+
+
+def test_passing_subtests_are_discarded() -> None:
+    """Test that records of passing tests are dropped at teardown."""
+    reporter = make_reporter()
+    for index in range(5):
+        reporter.pytest_runtest_logreport(make_subtest_report(index, "passed"))
+    reporter.pytest_runtest_logreport(make_report("call", "passed"))
+    reporter.pytest_runtest_logreport(make_report("teardown", "passed"))
+
+    assert len(reporter.passed) == 1
+    assert reporter.subtests == {}
+
+
+@pytest.mark.skipif(pytest.version_tuple < (9,), reason="built-in subtests")
+def test_builtin_subtests_report() -> None:
+    """Test the report for pytest's built-in subtests fixture."""
+    test_file = Path(__file__).parent / "test_subtests_temp.py"
+    test_file.write_text("""
+def test_cases(subtests):
+    for i in range(4):
+        with subtests.test(msg="case", i=i):
+            assert i % 2 == 0
+""")
+
+    try:
+        actual = run_pytest(str(test_file))
+
+        assert "**Summary:** 0/1 passed, 1 failed" in actual
+        assert "test_cases FAILED" in actual
+        assert "**Subtests:** 2 passed, 2 failed" in actual
+        assert "- [case] (i=3): test_subtests_temp.py:5: assert (3 % 2) == 0" in actual
+        assert "contains 2 failed subtests" not in actual
+    finally:
+        test_file.unlink(missing_ok=True)
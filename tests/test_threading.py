@@ -0,0 +1,77 @@
+"""Test report collection from concurrently running threads."""
+
+import threading
+from unittest.mock import Mock
+
+from _pytest.reports import TestReport
+
+from pytest_markdown_report.plugin import MarkdownReport
+
+THREADS = 16
+TESTS_PER_THREAD = 500
+
+
+def make_reporter() -> MarkdownReport:
+    """Create a reporter with default options."""
+    config = Mock()
+    config.getoption.side_effect = lambda x: None if x == "markdown_report_path" else 0
+    config.option.verbose = 0
+    config.option.reportchars = "fE"
+    return MarkdownReport(config)
+
+
+def run_tests(reporter: MarkdownReport, worker: int) -> None:
+    """Log all phases of this worker's tests, every third one failing."""
+    for index in range(TESTS_PER_THREAD):
+        nodeid = f"test_w{worker}.py::test_{index}"
+        outcome = "failed" if index % 3 == 0 else "passed"
+        for when, phase_outcome in [
+            ("setup", "passed"),
+            ("call", outcome),
+            ("teardown", "passed"),
+        ]:
+            reporter.pytest_runtest_logreport(
+                TestReport(nodeid, (nodeid, 0, ""), {}, phase_outcome, "E boom", when)
+            )
+
+
+def test_concurrent_logreport_loses_nothing() -> None:
+    """Test that threads logging at once, while snapshots are taken, add up."""
+    reporter = make_reporter()
+    done = threading.Event()
+    snapshot_counts = []
+    running_counts = []
+
+    def take_snapshots() -> None:
+        while not done.is_set():
+            snapshot = reporter.snapshot()
+            snapshot_counts.append(sum(len(r) for r in snapshot.values()))
+            running_counts.append(len(reporter.pending))
+
+    reader = threading.Thread(target=take_snapshots)
+    reader.start()
+    workers = [
+        threading.Thread(target=run_tests, args=(reporter, worker))
+        for worker in range(THREADS)
+    ]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    done.set()
+    reader.join()
+
+    reporter._categorize_reports()
+    reporter.shards.freeze()
+
+    total = THREADS * TESTS_PER_THREAD
+    failed = THREADS * len(range(0, TESTS_PER_THREAD, 3))
+    assert len(reporter.failed) == failed
+    assert len(reporter.passed) == total - failed
+    assert len({r.nodeid for r in reporter.passed + reporter.failed}) == total
+    assert not reporter.pending
+    assert all(count <= total for count in snapshot_counts)
+    # Each thread has at most one test between setup and teardown
+    assert all(count <= THREADS for count in running_counts)
+    summary = reporter._generate_summary()
+    assert f"**Summary:** {total - failed}/{total} passed, {failed} failed" in summary
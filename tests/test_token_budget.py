@@ -0,0 +1,145 @@
+"""Golden token budgets: fail when a formatter change inflates the report.
+
+Each scenario module runs through every verbosity mode and the report is
+measured with an in-process token approximation, compared against
+``expected/token-budget.json``. After an intended change, refresh the
+baseline with::
+
+    UPDATE_TOKEN_BUDGET=1 pytest tests/test_token_budget.py
+"""
+
+import json
+import math
+import os
+import re
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+BUDGET_FILE = Path(__file__).parent / "expected" / "token-budget.json"
+UPDATE = os.environ.get("UPDATE_TOKEN_BUDGET") == "1"
+
+# Allowed growth before failing: the larger of the two
+RELATIVE_TOLERANCE = 0.02
+ABSOLUTE_TOLERANCE = 3
+
+MODES = {
+    "default": [],
+    "verbose": ["-v"],
+    "quiet": ["-q"],
+    "all-sections": ["-rA"],
+}
+
+EDGE_CASES = """
+import pytest
+
+@pytest.fixture
+def broken_setup():
+    raise RuntimeError("setup failed")
+
+@pytest.fixture
+def broken_teardown():
+    yield
+    raise RuntimeError("teardown failed")
+
+def test_pass():
+    print("captured output")
+
+def test_fail():
+    assert {"id": 1, "tags": ["a", "b"]} == {"id": 2, "tags": ["a"]}
+
+def test_setup_error(broken_setup):
+    pass
+
+def test_teardown_error(broken_teardown):
+    pass
+
+@pytest.mark.parametrize("value", ["a*b", "under_score", "[brackets]"])
+def test_special_chars(value):
+    assert value
+
+@pytest.mark.skip(reason="not implemented")
+def test_skip():
+    pass
+
+@pytest.mark.xfail(reason="known bug")
+def test_xfail():
+    raise ValueError("known")
+
+@pytest.mark.xfail(reason="maybe fixed")
+def test_xpass():
+    pass
+"""
+
+# Words split every few letters, numbers every three digits, symbols and
+# line breaks count one each: close enough to BPE counts to catch growth
+_TOKEN = re.compile(r"[A-Za-z]+|\d+|\n+|[^\sA-Za-z\d]")
+
+
+def approximate_tokens(text: str) -> int:
+    """Approximate the number of LLM tokens in text."""
+    count = 0
+    for piece in _TOKEN.findall(text):
+        if piece[0].isalpha():
+            count += math.ceil(len(piece) / 6)
+        elif piece[0].isdigit():
+            count += math.ceil(len(piece) / 3)
+        else:
+            count += 1
+    return count
+
+
+def write_scenario(name: str, directory: Path) -> str:
+    """Write a scenario module into directory, return its file name."""
+    if name == "examples.py":
+        shutil.copy(Path(__file__).parent / "examples.py", directory)
+    else:
+        (directory / name).write_text(EDGE_CASES)
+    return name
+
+
+def run_pytest(cwd: Path, *args: str) -> str:
+    """Run pytest in a project directory and return output."""
+    cmd = [sys.executable, "-m", "pytest", *list(args)]
+    result = subprocess.run(
+        cmd,
+        check=False,
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+    )
+    return result.stdout + result.stderr
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("scenario", ["examples.py", "test_edge_cases_scenario.py"])
+def test_token_budget(scenario: str, mode: str, tmp_path: Path) -> None:
+    """Test that the report stays within its recorded token budget."""
+    module = write_scenario(scenario, tmp_path)
+    tokens = approximate_tokens(run_pytest(tmp_path, module, *MODES[mode]))
+    key = f"{scenario}/{mode}"
+    budgets = json.loads(BUDGET_FILE.read_text()) if BUDGET_FILE.exists() else {}
+
+    if UPDATE:
+        budgets[key] = tokens
+        BUDGET_FILE.write_text(json.dumps(budgets, indent=2, sort_keys=True) + "\n")
+        return
+
+    assert key in budgets, f"No budget for {key}, run with UPDATE_TOKEN_BUDGET=1"
+    allowed = budgets[key] + max(
+        ABSOLUTE_TOLERANCE, math.ceil(budgets[key] * RELATIVE_TOLERANCE)
+    )
+    assert tokens <= allowed, (
+        f"{key} report grew to {tokens} tokens (budget {budgets[key]}, "
+        f"allowed {allowed}); run with UPDATE_TOKEN_BUDGET=1 if intended"
+    )
+
+
+def test_approximate_tokens() -> None:
+    """Test the approximation on words, numbers and symbols."""
+    assert approximate_tokens("") == 0
+    assert approximate_tokens("**Summary:** 7/11 passed") == 11
+    assert approximate_tokens("internationalization") == 4